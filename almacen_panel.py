@@ -0,0 +1,358 @@
+import logging
+import os
+import sqlite3
+
+import pandas as pd
+
+# Copia local del panel en SQLite, con índices para los filtros habituales de scouting. La
+# escribe clean_data.py junto con el CSV; el Google Sheet pasa a ser solo un destino de
+# exportación y las consultas se hacen sobre esta base.
+
+ARCHIVO_ALMACEN = "panel.sqlite"
+
+TABLA_PANEL = "panel"
+TABLA_TEMPORADAS = "temporadas"
+
+# Columnas indexadas de cada tabla (un índice por columna o grupo de columnas)
+INDICES = {
+    TABLA_PANEL: [["soccerway_pk"], ["Equipo"], ["2025_Liga"], ["Posición"], ["ELO"]],
+    TABLA_TEMPORADAS: [["soccerway_pk", "Temporada"], ["Liga", "Temporada"], ["Equipo", "Temporada"]],
+}
+
+# Sufijo de las tablas que se cargan antes de reemplazar a las publicadas
+SUFIJO_CARGA = "_carga"
+
+# Agregados materializados: tabla -> columnas de agrupación. Se publican junto al panel y se
+# actualizan solo con los jugadores que cambiaron desde la publicación anterior.
+ROLLUPS = {
+    "rollup_equipo": ["Equipo"],
+    "rollup_liga": ["2025_Liga"],
+    "rollup_posicion": ["Posición"],
+}
+
+# Columnas del panel que se agregan en cada rollup (suma, cantidad con dato y promedio)
+METRICAS_ROLLUP = ["ELO", "Valor de Mercado", "Edad", "2025_Minutos Jugados", "2025_Gol", "2025_Apariciones"]
+
+def nombre_sql(nombre):
+    """
+    Cita un nombre de tabla o columna para SQLite (los nombres del panel tienen espacios y tildes).
+
+    Parámetros:
+    nombre (str): Nombre a citar.
+
+    Retorna:
+    str: El nombre entre comillas dobles.
+    """
+    return '"' + str(nombre).replace('"', '""') + '"'
+
+def preparar_para_sql(df):
+    """
+    Convierte las columnas de fecha a texto ISO (AAAA-MM-DD), que SQLite compara y ordena bien.
+
+    Parámetros:
+    df (pd.DataFrame): DataFrame a guardar.
+
+    Retorna:
+    pd.DataFrame: Copia con las fechas como texto.
+    """
+    df = df.copy()
+    for columna in df.columns:
+        if pd.api.types.is_datetime64_any_dtype(df[columna]):
+            df[columna] = df[columna].dt.strftime("%Y-%m-%d")
+    return df
+
+def abrir_carga(archivo=ARCHIVO_ALMACEN):
+    """
+    Abre la base y prepara tablas de carga vacías, sin tocar las tablas publicadas.
+
+    Parámetros:
+    archivo (str): Archivo SQLite.
+
+    Retorna:
+    sqlite3.Connection: Conexión para 'agregar_a_carga' y 'cerrar_carga'.
+    """
+    con = sqlite3.connect(archivo)
+    for tabla in INDICES:
+        con.execute(f"DROP TABLE IF EXISTS {nombre_sql(tabla + SUFIJO_CARGA)}")
+    con.commit()
+    return con
+
+def agregar_a_carga(con, df_panel, df_temporadas=None):
+    """
+    Agrega filas del panel (y sus temporadas) a las tablas de carga. Se puede llamar una vez
+    con todo el panel o una vez por partición en el modo por bloques.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'abrir_carga'.
+    df_panel (pd.DataFrame): Filas del panel consolidado.
+    df_temporadas (pd.DataFrame): Temporadas en formato largo de esos jugadores.
+    """
+    preparar_para_sql(df_panel).to_sql(TABLA_PANEL + SUFIJO_CARGA, con, if_exists="append", index=False)
+    if df_temporadas is not None:
+        preparar_para_sql(df_temporadas).to_sql(TABLA_TEMPORADAS + SUFIJO_CARGA, con, if_exists="append", index=False)
+
+def columnas_tabla(con, tabla):
+    """
+    Lista las columnas de una tabla de la base.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión abierta.
+    tabla (str): Nombre de la tabla.
+
+    Retorna:
+    list: Nombres de las columnas (vacía si la tabla no existe).
+    """
+    return [fila[1] for fila in con.execute(f"PRAGMA table_info({nombre_sql(tabla)})")]
+
+def columnas_aditivas(metricas):
+    """
+    Columnas de un rollup que se pueden sumar entre publicaciones: cantidad de jugadores y,
+    por métrica, su suma y la cantidad de jugadores con dato.
+
+    Parámetros:
+    metricas (list): Métricas agregadas.
+
+    Retorna:
+    list: Nombres de las columnas.
+    """
+    columnas = ["jugadores"]
+    for metrica in metricas:
+        columnas += [f"suma_{metrica}", f"n_{metrica}"]
+    return columnas
+
+def cargar_rollups(con):
+    """
+    Crea las tablas de carga de los rollups sumando a los publicados la diferencia entre el
+    panel publicado y el de carga: los jugadores que cambiaron (o salieron) restan su aporte
+    anterior y suman el nuevo, así solo se agregan las filas que cambiaron. Si un rollup
+    publicado no es compatible (otras métricas) o no existe, se calcula desde cero.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión con la tabla de carga del panel, dentro de una transacción.
+    """
+    panel_carga = TABLA_PANEL + SUFIJO_CARGA
+    columnas_carga = set(columnas_tabla(con, panel_carga))
+    metricas = [metrica for metrica in METRICAS_ROLLUP if metrica in columnas_carga]
+    aditivas = columnas_aditivas(metricas)
+    grupos = {tabla: grupo for tabla, grupo in ROLLUPS.items() if set(grupo) <= columnas_carga}
+    for tabla in set(ROLLUPS) - set(grupos):
+        logging.warning(f"No se carga el rollup {tabla}: faltan las columnas {ROLLUPS[tabla]}.")
+
+    usadas = list(dict.fromkeys(["soccerway_pk"] + [c for grupo in grupos.values() for c in grupo] + metricas))
+    seleccion = ", ".join(nombre_sql(c) for c in usadas)
+
+    # Diferencia entre los paneles, una sola vez para todos los rollups. EXCEPT compara las
+    # filas completas (y trata los nulos como iguales): un jugador sin cambios en las columnas
+    # agregadas no aparece en ninguna de las dos partes.
+    hay_diferencia = set(usadas) <= set(columnas_tabla(con, TABLA_PANEL))
+    if hay_diferencia:
+        con.execute("DROP TABLE IF EXISTS temp.cambios_rollup")
+        con.execute(
+            f"CREATE TEMP TABLE cambios_rollup AS "
+            f"SELECT -1 AS signo, * FROM (SELECT {seleccion} FROM {nombre_sql(TABLA_PANEL)} EXCEPT SELECT {seleccion} FROM {nombre_sql(panel_carga)}) "
+            f"UNION ALL SELECT 1 AS signo, * FROM (SELECT {seleccion} FROM {nombre_sql(panel_carga)} EXCEPT SELECT {seleccion} FROM {nombre_sql(TABLA_PANEL)})"
+        )
+        n_cambios = con.execute("SELECT COUNT(*) FROM temp.cambios_rollup").fetchone()[0]
+
+    aportes = ["SUM(signo) AS jugadores"]
+    for metrica in metricas:
+        aportes.append(f"SUM(signo * {nombre_sql(metrica)}) AS {nombre_sql('suma_' + metrica)}")
+        aportes.append(f"SUM(signo * ({nombre_sql(metrica)} IS NOT NULL)) AS {nombre_sql('n_' + metrica)}")
+    # Las cantidades quedan enteras; las sumas, como número real
+    totales = [
+        f"CAST(TOTAL({nombre_sql(c)}) AS INTEGER) AS {nombre_sql(c)}" if not c.startswith("suma_") else f"TOTAL({nombre_sql(c)}) AS {nombre_sql(c)}"
+        for c in aditivas
+    ]
+    promedios = [
+        f"TOTAL({nombre_sql('suma_' + metrica)}) / NULLIF(TOTAL({nombre_sql('n_' + metrica)}), 0) AS {nombre_sql('prom_' + metrica)}"
+        for metrica in metricas
+    ]
+
+    for tabla, grupo in grupos.items():
+        claves = ", ".join(nombre_sql(c) for c in grupo)
+        incremental = hay_diferencia and columnas_tabla(con, tabla) == grupo + aditivas + [f"prom_{metrica}" for metrica in metricas]
+        if incremental:
+            base = f"SELECT {claves}, {', '.join(nombre_sql(c) for c in aditivas)} FROM {nombre_sql(tabla)}"
+            delta = f"SELECT {claves}, {', '.join(aportes)} FROM temp.cambios_rollup GROUP BY {claves}"
+            origen = f"{base} UNION ALL {delta}"
+        else:
+            origen = f"SELECT {claves}, {', '.join(aportes)} FROM (SELECT 1 AS signo, * FROM {nombre_sql(panel_carga)}) GROUP BY {claves}"
+
+        carga = nombre_sql(tabla + SUFIJO_CARGA)
+        con.execute(f"DROP TABLE IF EXISTS {carga}")
+        con.execute(
+            f"CREATE TABLE {carga} AS SELECT {claves}, {', '.join(totales + promedios)} FROM ({origen}) "
+            f"GROUP BY {claves} HAVING TOTAL(jugadores) > 0 ORDER BY {claves}"
+        )
+        detalle = f"{n_cambios} filas de diferencia" if incremental else "calculado desde cero"
+        logging.info(f"Rollup {tabla} cargado ({detalle}).")
+
+    con.execute("DROP TABLE IF EXISTS temp.cambios_rollup")
+
+def cerrar_carga(con, publicar=True):
+    """
+    Crea los índices y reemplaza las tablas publicadas por las de carga en una sola
+    transacción, así quien consulta ve el panel anterior o el nuevo, nunca uno a medias.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'abrir_carga'.
+    publicar (bool): Si es False (por ejemplo, el panel no pasó la validación) se descartan
+    las tablas de carga y las publicadas quedan como estaban.
+    """
+    try:
+        existentes = {fila[0] for fila in con.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        cargadas = [tabla for tabla in INDICES if tabla + SUFIJO_CARGA in existentes]
+
+        if not publicar:
+            for tabla in cargadas:
+                con.execute(f"DROP TABLE {nombre_sql(tabla + SUFIJO_CARGA)}")
+            con.commit()
+            logging.info("No se publica el almacén local; se mantienen las tablas anteriores.")
+            return
+
+        with con:
+            if TABLA_PANEL in cargadas:
+                cargar_rollups(con)
+                cargadas += [tabla for tabla in ROLLUPS if columnas_tabla(con, tabla + SUFIJO_CARGA)]
+            for tabla in cargadas:
+                con.execute(f"DROP TABLE IF EXISTS {nombre_sql(tabla)}")
+                con.execute(f"ALTER TABLE {nombre_sql(tabla + SUFIJO_CARGA)} RENAME TO {nombre_sql(tabla)}")
+                columnas = {fila[1] for fila in con.execute(f"PRAGMA table_info({nombre_sql(tabla)})")}
+                for indice in INDICES.get(tabla, []):
+                    if not set(indice) <= columnas:
+                        logging.warning(f"No se crea el índice {indice} en {tabla}: faltan columnas.")
+                        continue
+                    nombre = nombre_sql("idx_" + tabla + "_" + "_".join(indice))
+                    con.execute(f"CREATE INDEX {nombre} ON {nombre_sql(tabla)} ({', '.join(nombre_sql(c) for c in indice)})")
+
+        # Estadísticas para que el planificador elija los índices
+        con.execute("ANALYZE")
+        con.commit()
+        logging.info(f"Almacén local publicado con las tablas {cargadas}.")
+    finally:
+        con.close()
+
+def publicar_panel(df_panel, df_temporadas=None, archivo=ARCHIVO_ALMACEN, publicar=True):
+    """
+    Publica el panel completo en el almacén local.
+
+    Parámetros:
+    df_panel (pd.DataFrame): Panel consolidado.
+    df_temporadas (pd.DataFrame): Temporadas en formato largo.
+    archivo (str): Archivo SQLite.
+    publicar (bool): Si es False se descarta la carga.
+    """
+    con = abrir_carga(archivo)
+    try:
+        agregar_a_carga(con, df_panel, df_temporadas)
+    except Exception:
+        con.close()
+        raise
+    cerrar_carga(con, publicar)
+
+# Consultas -------------------------------------------------------------------------
+
+def conectar(archivo=ARCHIVO_ALMACEN):
+    """
+    Abre el almacén local en modo solo lectura.
+
+    Parámetros:
+    archivo (str): Archivo SQLite.
+
+    Retorna:
+    sqlite3.Connection: Conexión de solo lectura.
+    """
+    if not os.path.exists(archivo):
+        raise FileNotFoundError(f"No existe el almacén local {archivo}; ejecute clean_data.py primero.")
+    return sqlite3.connect(f"file:{archivo}?mode=ro", uri=True)
+
+def buscar_jugadores(con, liga=None, equipo=None, posicion=None, elo_min=None, elo_max=None, columnas=None, limite=None):
+    """
+    Filtra jugadores del panel por los criterios habituales de scouting. Los filtros vacíos
+    no se aplican; los de liga, equipo y posición aceptan un valor o una lista.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    liga (str | list): Liga de la temporada 2025 ('2025_Liga').
+    equipo (str | list): Equipo actual.
+    posicion (str | list): Posición.
+    elo_min (int): ELO mínimo.
+    elo_max (int): ELO máximo.
+    columnas (list): Columnas a devolver; por defecto todas.
+    limite (int): Cantidad máxima de jugadores.
+
+    Retorna:
+    pd.DataFrame: Jugadores que cumplen los filtros, ordenados por ELO de mayor a menor.
+    """
+    condiciones = []
+    parametros = []
+    for columna, valor in [("2025_Liga", liga), ("Equipo", equipo), ("Posición", posicion)]:
+        if valor is None:
+            continue
+        valores = [valor] if isinstance(valor, str) else list(valor)
+        condiciones.append(f"{nombre_sql(columna)} IN ({', '.join('?' * len(valores))})")
+        parametros.extend(valores)
+    if elo_min is not None:
+        condiciones.append('"ELO" >= ?')
+        parametros.append(elo_min)
+    if elo_max is not None:
+        condiciones.append('"ELO" <= ?')
+        parametros.append(elo_max)
+
+    seleccion = ", ".join(nombre_sql(c) for c in columnas) if columnas else "*"
+    consulta = f"SELECT {seleccion} FROM {nombre_sql(TABLA_PANEL)}"
+    if condiciones:
+        consulta += " WHERE " + " AND ".join(condiciones)
+    consulta += ' ORDER BY "ELO" DESC'
+    if limite is not None:
+        consulta += " LIMIT ?"
+        parametros.append(int(limite))
+    return pd.read_sql_query(consulta, con, params=parametros)
+
+def obtener_jugador(con, soccerway_pk):
+    """
+    Busca un jugador por su llave.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    soccerway_pk (str): Llave del jugador.
+
+    Retorna:
+    dict: Fila del jugador, o None si no existe.
+    """
+    cursor = con.execute(f'SELECT * FROM {nombre_sql(TABLA_PANEL)} WHERE "soccerway_pk" = ? LIMIT 1', (soccerway_pk,))
+    fila = cursor.fetchone()
+    if fila is None:
+        return None
+    return dict(zip([descripcion[0] for descripcion in cursor.description], fila))
+
+def temporadas_de_jugador(con, soccerway_pk):
+    """
+    Devuelve la carrera completa de un jugador desde la tabla de temporadas.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    soccerway_pk (str): Llave del jugador.
+
+    Retorna:
+    pd.DataFrame: Una fila por temporada, de la más reciente a la más antigua.
+    """
+    consulta = f'SELECT * FROM {nombre_sql(TABLA_TEMPORADAS)} WHERE "soccerway_pk" = ? ORDER BY "Temporada" DESC'
+    return pd.read_sql_query(consulta, con, params=(soccerway_pk,))
+
+def leer_rollup(con, tabla, columnas=None):
+    """
+    Lee un rollup publicado (una fila por grupo).
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    tabla (str): Tabla de ROLLUPS ("rollup_equipo", "rollup_liga" o "rollup_posicion").
+    columnas (list): Columnas a devolver; por defecto todas.
+
+    Retorna:
+    pd.DataFrame: Agregados del rollup.
+    """
+    if tabla not in ROLLUPS:
+        raise ValueError(f"Rollup desconocido: {tabla}. Opciones: {list(ROLLUPS)}")
+    seleccion = ", ".join(nombre_sql(c) for c in columnas) if columnas else "*"
+    return pd.read_sql_query(f"SELECT {seleccion} FROM {nombre_sql(tabla)}", con)
@@ -0,0 +1,32 @@
+import os
+
+# Archivos crudos de cada fuente que consolida clean_data.py y archivo del panel resultante.
+# Están en un módulo aparte, sin dependencias, para que etlconcon.py pueda revisar si
+# cambiaron sin importar pandas. Si es una liga nueva, se agrega su archivo a la lista.
+
+archivos_ligas_soccerway = ["raw_soccerway_primera_cl.csv","raw_soccerway_primera_b_cl.csv","raw_soccerway_segunda_cl.csv","raw_soccerway_primera_b_arg.csv","raw_soccerway_primera_c_arg.csv","raw_soccerway_tfa_arg_1.csv","raw_soccerway_tfa_arg_2.csv","raw_soccerway_tfa_arg_3.csv","raw_soccerway_tfa_arg_4.csv"]
+archivos_ligas_transfermarkt = ["raw_transfermarkt_primera_cl.csv","raw_transfermarkt_primera_b_cl.csv","raw_transfermarkt_primera_b_arg.csv"]
+archivos_ligas_besoccer = ["raw_besoccer_primera_cl.csv","raw_besoccer_primera_b_cl.csv","raw_besoccer_segunda_cl.csv"]
+
+archivo_csv = "clean_data_final_4.csv"
+
+# Campos de la tabla de carrera de soccerway, en el orden de sus columnas. El scraper guarda
+# cada temporada como una fila en '<archivo>_temporadas.csv' (archivo_temporadas) en lugar de
+# columnas '<temporada>_<campo>'.
+CAMPOS_TEMPORADA = [
+    "Temporada", "Equipo", "Liga", "Minutos Jugados", "Apariciones", "Alineaciones", "Entra",
+    "Sale", "Comenzó de suplente", "Gol", "Amarilla", "Segunda Amarilla", "Roja"
+]
+
+def archivo_temporadas(archivo):
+    """
+    Devuelve el archivo de temporadas que el scraper de soccerway escribe junto a un archivo crudo.
+
+    Parámetros:
+    archivo (str): Archivo crudo de soccerway, por ejemplo 'raw_soccerway_primera_cl.csv'.
+
+    Retorna:
+    str: Archivo de temporadas, por ejemplo 'raw_soccerway_primera_cl_temporadas.csv'.
+    """
+    base, extension = os.path.splitext(archivo)
+    return f"{base}_temporadas{extension or '.csv'}"
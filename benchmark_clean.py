@@ -0,0 +1,175 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import datos_sinteticos
+import registro
+
+# Benchmark de la limpieza y consolidación (clean_data.ejecutar) con datos sintéticos de
+# datos_sinteticos.py a 1, 10 y 100 veces el tamaño del panel actual. Cada escala se ejecuta
+# en un proceso aparte y en un directorio temporal (los stg_*.csv, panel.sqlite e historial
+# no tocan los del repositorio); el tiempo y el pico de memoria (RSS) se toman del reporte de
+# perfilado.py.
+#
+# Los resultados se comparan con los guardados en ARCHIVO_REFERENCIA: si el tiempo o la
+# memoria de una escala superan la referencia en más de TOLERANCIA, se informa la regresión
+# y el comando termina con código 1. Con --guardar-referencia los resultados pasan a ser la
+# nueva referencia (las referencias dependen del equipo, conviene guardarlas en el mismo
+# equipo donde se compara).
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+ESCALAS = [1, 10, 100]
+DIRECTORIO_DATOS = "benchmark_datos"
+ARCHIVO_REFERENCIA = "benchmark_referencia.json"
+
+# Aumento relativo máximo sobre la referencia antes de considerarlo una regresión
+TOLERANCIA = {"segundos": 0.25, "rss_pico_mb": 0.20}
+
+CODIGO_EJECUCION = """
+import json, logging, sys
+sys.path.insert(0, {directorio!r})
+import registro
+registro.configurar(archivo=None, nivel="WARNING")
+import clean_data
+archivos = json.loads({archivos!r})
+clean_data.ejecutar(archivos["soccerway"], archivos["transfermarkt"], archivos["besoccer"], archivo_salida="panel.csv", por_bloques={por_bloques!r})
+"""
+
+def datos_de_escala(escala, regenerar=False, directorio=DIRECTORIO_DATOS):
+    """
+    Devuelve los archivos sintéticos de una escala, generándolos si no existen.
+
+    Parámetros:
+    escala (float): Escala de datos_sinteticos.generar.
+    regenerar (bool): Volver a generarlos aunque existan.
+    directorio (str): Directorio donde se guardan los datos de cada escala.
+
+    Retorna:
+    dict: Fuente -> rutas de los archivos crudos.
+    """
+    destino = os.path.abspath(os.path.join(directorio, f"escala_{escala:g}"))
+    indice = os.path.join(destino, "archivos.json")
+    if not regenerar and os.path.exists(indice):
+        with open(indice, encoding="utf-8") as file:
+            return json.load(file)
+
+    shutil.rmtree(destino, ignore_errors=True)
+    archivos = datos_sinteticos.generar(destino, escala)
+    with open(indice, "w", encoding="utf-8") as file:
+        json.dump(archivos, file, ensure_ascii=False, indent=1)
+    return archivos
+
+def medir(archivos, por_bloques=False):
+    """
+    Ejecuta la limpieza en un proceso aparte y lee su reporte de perfilado.
+
+    Parámetros:
+    archivos (dict): Fuente -> rutas de los archivos crudos.
+    por_bloques (bool): Usar el modo por bloques de clean_data.
+
+    Retorna:
+    dict: {"segundos", "rss_pico_mb", "filas", "valido", "etapas_mas_lentas"}.
+    """
+    directorio = tempfile.mkdtemp(prefix="benchmark_clean_")
+    try:
+        codigo = CODIGO_EJECUCION.format(directorio=DIRECTORIO, archivos=json.dumps(archivos), por_bloques=por_bloques)
+        proceso = subprocess.run([sys.executable, "-c", codigo], cwd=directorio, capture_output=True, text=True)
+        if proceso.returncode != 0:
+            raise RuntimeError(f"La limpieza terminó con error:\n{proceso.stderr[-2000:]}")
+
+        with open(os.path.join(directorio, "panel.perfil.json"), encoding="utf-8") as file:
+            perfil = json.load(file)
+        with open(os.path.join(directorio, "panel.validacion.json"), encoding="utf-8") as file:
+            validacion = json.load(file)
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    return {
+        "segundos": perfil["segundos_totales"],
+        "rss_pico_mb": perfil["rss_pico_mb"],
+        "filas": validacion["filas"],
+        "valido": validacion["valido"],
+        "etapas_mas_lentas": {etapa["etapa"]: etapa["segundos"] for etapa in perfil["etapas"][:5]},
+    }
+
+def comparar(resultado, referencia, tolerancia=TOLERANCIA):
+    """
+    Compara un resultado con su referencia.
+
+    Retorna:
+    list: Descripción de cada regresión (vacía si no hay).
+    """
+    regresiones = []
+    for medida, maximo in tolerancia.items():
+        anterior, actual = referencia.get(medida), resultado.get(medida)
+        if anterior and actual is not None and actual > anterior * (1 + maximo):
+            regresiones.append(f"{medida}: {actual} contra {anterior} de referencia (+{actual / anterior - 1:.0%}, máximo +{maximo:.0%})")
+    return regresiones
+
+def cargar_referencia(archivo=ARCHIVO_REFERENCIA):
+    if not os.path.exists(archivo):
+        return {}
+    with open(archivo, encoding="utf-8") as file:
+        return json.load(file)
+
+def ejecutar(escalas=ESCALAS, por_bloques=False, guardar_referencia=False, regenerar=False, archivo_referencia=ARCHIVO_REFERENCIA):
+    """
+    Ejecuta el benchmark en cada escala y lo compara con la referencia.
+
+    Parámetros:
+    escalas (list): Escalas a medir.
+    por_bloques (bool): Usar el modo por bloques de clean_data.
+    guardar_referencia (bool): Guardar los resultados como nueva referencia.
+    regenerar (bool): Volver a generar los datos sintéticos.
+    archivo_referencia (str): Archivo JSON de referencias.
+
+    Retorna:
+    bool: True si no hubo regresiones.
+    """
+    referencia = cargar_referencia(archivo_referencia)
+    modo = "por_bloques" if por_bloques else "en_memoria"
+    sin_regresiones = True
+
+    for escala in escalas:
+        nombre = f"{modo}:{escala:g}"
+        resultado = medir(datos_de_escala(escala, regenerar), por_bloques)
+        logging.info(f"{nombre}: {resultado['filas']} filas en {resultado['segundos']:.2f}s, pico {resultado['rss_pico_mb']} MB; etapas más lentas {resultado['etapas_mas_lentas']}.")
+        if not resultado["valido"]:
+            logging.warning(f"{nombre}: el panel sintético no pasó la validación; no se midieron similares ni historial.")
+
+        if nombre in referencia:
+            regresiones = comparar(resultado, referencia[nombre])
+            for regresion in regresiones:
+                logging.error(f"{nombre}: regresión en {regresion}.")
+            sin_regresiones = sin_regresiones and not regresiones
+        elif not guardar_referencia:
+            logging.info(f"{nombre}: sin referencia; usar --guardar-referencia para crearla.")
+
+        if guardar_referencia:
+            referencia[nombre] = {**resultado, "python": platform.python_version(), "equipo": platform.node()}
+
+    if guardar_referencia:
+        with open(archivo_referencia, "w", encoding="utf-8") as file:
+            json.dump(referencia, file, ensure_ascii=False, indent=2)
+        logging.info(f"Referencias guardadas en {archivo_referencia}.")
+    return sin_regresiones
+
+
+if __name__ == "__main__":
+    registro.configurar(archivo=None)
+
+    parser = argparse.ArgumentParser(description="Benchmark de clean_data con datos sintéticos.")
+    parser.add_argument("--escala", type=float, action="append", help="Escala a medir (se puede repetir); por defecto 1, 10 y 100.")
+    parser.add_argument("--por-bloques", action="store_true", help="Medir el modo por bloques.")
+    parser.add_argument("--guardar-referencia", action="store_true", help="Guardar los resultados como referencia.")
+    parser.add_argument("--regenerar", action="store_true", help="Volver a generar los datos sintéticos.")
+    args = parser.parse_args()
+
+    correcto = ejecutar(args.escala or ESCALAS, args.por_bloques, args.guardar_referencia, args.regenerar)
+    sys.exit(0 if correcto else 1)
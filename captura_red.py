@@ -0,0 +1,398 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import sys
+
+# Captura de las respuestas JSON (XHR/fetch) con que Soccerway y BeSoccer llenan sus tablas de
+# plantilla, carrera y atributos. Si llega una respuesta reconocible se extraen los datos de ahí,
+# sin esperar a que la tabla se dibuje ni recorrer el DOM celda por celda; si no, los scrapers
+# siguen usando sus selectores de siempre.
+#
+# Como el formato exacto de cada respuesta puede cambiar, cada esquema no fija una estructura:
+# indica, para cada dato, los nombres de clave posibles, y se toma la lista de objetos (o el
+# objeto) del JSON que mejor coincide.
+#
+# Modos (MODO_RED):
+# - "desactivado": solo DOM, como antes (por defecto).
+# - "grabar": solo DOM, y además guarda en DIRECTORIO_FIXTURES cada respuesta JSON cuya URL
+#   coincide con el patrón amplio del esquema, se reconozca o no; sirve para conocer los
+#   endpoints y formatos reales.
+# - "activo": usa las respuestas cuando llegan y el DOM como respaldo, pero solo en los
+#   esquemas con "endpoint" fijado (ver abajo).
+# - "reproducir": responde las llamadas reconocidas con las respuestas grabadas (sin pedirlas al sitio).
+#
+# Los patrones "url" y las claves de cada esquema son supuestos (los ejemplo.json de
+# DIRECTORIO_FIXTURES están armados a mano), y un patrón amplio puede coincidir con listas de
+# partidos o publicidad que pasarían a las columnas de carrera o atributos. Por eso un esquema
+# solo se usa en modo "activo" cuando su "endpoint" (patrón de la ruta exacta, sacado de una
+# respuesta grabada con "grabar") está fijado; mientras sea None se usa el DOM.
+#
+# Los archivos de DIRECTORIO_FIXTURES se pueden revisar sin navegador:
+#   python captura_red.py [directorio]
+
+MODO_RED = "desactivado"
+
+DIRECTORIO_FIXTURES = "fixtures_red"
+
+# Segundos que se espera una respuesta antes de pasar al DOM, y cantidad de páginas seguidas sin
+# respuesta reconocible después de las cuales se deja de esperar en ese esquema
+ESPERA_RED_SEGUNDOS = 3
+FALLOS_ANTES_DE_DESISTIR = 3
+
+# Esquema -> patrón de URL amplio (para grabar), patrón del endpoint real (None mientras no se
+# haya confirmado con una respuesta grabada), forma ("lista" de registros u "objeto"), datos
+# con sus claves posibles (se comparan sin mayúsculas; "a.b" entra en objetos anidados) y
+# mínimo de datos que deben coincidir para aceptar la respuesta.
+ESQUEMAS = {
+    "soccerway_plantilla": {
+        "url": r"soccerway\.com/.*(squad|team).*",
+        "endpoint": None,
+        "forma": "lista",
+        "campos": {
+            "nombre": ["name", "player_name", "full_name", "player.name"],
+            "link": ["url", "link", "href", "player_url", "player.url"],
+            "posicion": ["position", "pos", "player.position"],
+        },
+        "minimo": 2,
+        "obligatorios": ["link"],
+    },
+    "soccerway_carrera": {
+        "url": r"soccerway\.com/.*(career|player).*",
+        "endpoint": None,
+        "forma": "lista",
+        "campos": {
+            "Temporada": ["season", "season_name", "season.name"],
+            "Equipo": ["team", "team_name", "team.name", "club"],
+            "Liga": ["competition", "competition_name", "competition.name", "league"],
+            "Minutos Jugados": ["minutes", "minutes_played", "mins"],
+            "Apariciones": ["appearances", "apps", "matches"],
+            "Alineaciones": ["lineups", "starts", "line_ups"],
+            "Entra": ["subs_in", "sub_in", "substitute_in"],
+            "Sale": ["subs_out", "sub_out", "substitute_out"],
+            "Comenzó de suplente": ["subs_on_bench", "bench", "on_bench"],
+            "Gol": ["goals", "goal"],
+            "Amarilla": ["yellow_cards", "yellow", "yellowcards"],
+            "Segunda Amarilla": ["second_yellow", "yellow2", "second_yellow_cards"],
+            "Roja": ["red_cards", "red", "redcards"],
+        },
+        "minimo": 5,
+        "obligatorios": ["Temporada"],
+    },
+    "besoccer_plantilla": {
+        "url": r"besoccer\.com/.*(squad|plantilla|team).*",
+        "endpoint": None,
+        "forma": "lista",
+        "campos": {
+            "name": ["name", "nick", "player_name", "player.name"],
+            "link": ["url", "link", "href", "player_url", "player.url"],
+        },
+        "minimo": 2,
+        "obligatorios": ["name", "link"],
+    },
+    "besoccer_atributos": {
+        "url": r"besoccer\.com/.*(player|jugador|skills|attributes).*",
+        "endpoint": None,
+        "forma": "objeto",
+        "campos": {
+            "Ritmo": ["ritmo", "pace", "pac"],
+            "Tiro": ["tiro", "shooting", "sho"],
+            "Pase": ["pase", "passing", "pas"],
+            "Regate": ["regate", "dribbling", "dri"],
+            "Defensa": ["defensa", "defending", "def"],
+            "Físico": ["físico", "fisico", "physical", "phy"],
+            "Salto": ["salto", "diving_jump", "jumping"],
+            "Estirada": ["estirada", "diving", "div"],
+            "Paradas": ["paradas", "handling", "han"],
+            "Saques": ["saques", "kicking", "kic"],
+            "Colocación": ["colocación", "colocacion", "positioning", "pos"],
+            "Reflejos": ["reflejos", "reflexes", "ref"],
+        },
+        "minimo": 4,
+        "obligatorios": [],
+    },
+}
+
+# Páginas seguidas sin respuesta reconocible, por esquema. Es del módulo y no de cada captura
+# porque algunos scrapers abren un navegador nuevo por jugador.
+fallos_por_esquema = {}
+
+def valor_por_clave(objeto, claves):
+    """
+    Busca en un objeto JSON el valor de la primera clave posible que exista.
+
+    Parámetros:
+    objeto (dict): Objeto JSON.
+    claves (list): Claves posibles; "a.b" entra en el objeto anidado "a".
+
+    Retorna:
+    tuple: (encontrado, valor).
+    """
+    minusculas = {str(clave).lower(): valor for clave, valor in objeto.items()}
+    for clave in claves:
+        actual = minusculas
+        encontrado = True
+        for parte in clave.lower().split("."):
+            if isinstance(actual, dict) and parte in actual:
+                actual = actual[parte]
+                actual = {str(k).lower(): v for k, v in actual.items()} if isinstance(actual, dict) else actual
+            else:
+                encontrado = False
+                break
+        if encontrado and not isinstance(actual, (dict, list)):
+            return True, actual
+    return False, None
+
+def mapear_objeto(objeto, campos):
+    """
+    Traduce un objeto JSON a los datos del esquema.
+
+    Parámetros:
+    objeto (dict): Objeto JSON.
+    campos (dict): Dato -> claves posibles.
+
+    Retorna:
+    dict: Datos encontrados (como texto; None se deja como cadena vacía).
+    """
+    registro = {}
+    for campo, claves in campos.items():
+        encontrado, valor = valor_por_clave(objeto, claves)
+        if encontrado:
+            registro[campo] = "" if valor is None else str(valor)
+    return registro
+
+def candidatos(payload):
+    """
+    Recorre un JSON y entrega cada lista de objetos y cada objeto que contiene.
+
+    Parámetros:
+    payload: JSON ya decodificado.
+
+    Retorna:
+    generator: Pares ("lista", list) u ("objeto", dict).
+    """
+    pendientes = [payload]
+    while pendientes:
+        actual = pendientes.pop()
+        if isinstance(actual, dict):
+            yield "objeto", actual
+            pendientes.extend(actual.values())
+        elif isinstance(actual, list):
+            objetos = [elemento for elemento in actual if isinstance(elemento, dict)]
+            if objetos:
+                yield "lista", objetos
+            pendientes.extend(actual)
+
+def extraer_registros(payload, esquema):
+    """
+    Extrae los registros de un esquema desde una respuesta JSON, tomando la parte del JSON que
+    más datos del esquema tiene.
+
+    Parámetros:
+    payload: JSON ya decodificado.
+    esquema (dict): Esquema de ESQUEMAS.
+
+    Retorna:
+    list: Registros (uno solo para la forma "objeto"), o None si ninguna parte coincide con
+    al menos 'minimo' datos y los 'obligatorios'.
+    """
+    mejor = None
+    mejor_puntaje = 0
+    for forma, candidato in candidatos(payload):
+        if forma != esquema["forma"]:
+            continue
+        registros = [mapear_objeto(objeto, esquema["campos"]) for objeto in (candidato if forma == "lista" else [candidato])]
+        registros = [r for r in registros if all(r.get(campo) for campo in esquema["obligatorios"])]
+        if not registros:
+            continue
+        puntaje = max(len(r) for r in registros)
+        if puntaje >= esquema["minimo"] and (puntaje, len(registros)) > (mejor_puntaje, len(mejor or [])):
+            mejor, mejor_puntaje = registros, puntaje
+    return mejor
+
+def patron_url(nombre, modo):
+    """
+    Patrón de las URL que se escuchan de un esquema en un modo.
+
+    Parámetros:
+    nombre (str): Esquema.
+    modo (str): Modo de captura.
+
+    Retorna:
+    str: Patrón (regex), o None si el esquema no se escucha en ese modo.
+    """
+    esquema = ESQUEMAS[nombre]
+    if modo == "grabar":
+        return esquema["url"]
+    if modo == "activo":
+        return esquema["endpoint"]
+    if modo == "reproducir":
+        return esquema["endpoint"] or esquema["url"]
+    return None
+
+def archivo_fixture(nombre, url, directorio=DIRECTORIO_FIXTURES):
+    """
+    Archivo donde se graba (o desde donde se reproduce) la respuesta de una URL.
+
+    Parámetros:
+    nombre (str): Esquema.
+    url (str): URL de la respuesta.
+    directorio (str): Directorio de fixtures.
+
+    Retorna:
+    str: Ruta del archivo JSON.
+    """
+    return os.path.join(directorio, nombre, hashlib.sha1(url.encode("utf-8")).hexdigest()[:16] + ".json")
+
+def grabar_fixture(nombre, url, payload, directorio=DIRECTORIO_FIXTURES):
+    """
+    Guarda una respuesta reconocida junto con los registros que se extrajeron de ella.
+
+    Parámetros:
+    nombre (str): Esquema.
+    url (str): URL de la respuesta.
+    payload: JSON de la respuesta.
+    directorio (str): Directorio de fixtures.
+    """
+    ruta = archivo_fixture(nombre, url, directorio)
+    os.makedirs(os.path.dirname(ruta), exist_ok=True)
+    with open(ruta, "w", encoding="utf-8") as file:
+        json.dump({"url": url, "payload": payload, "esperado": extraer_registros(payload, ESQUEMAS[nombre])}, file, ensure_ascii=False, indent=1)
+
+class CapturaRed:
+    """
+    Escucha las respuestas de una página y guarda las que coinciden con los esquemas pedidos.
+    Se crea con 'iniciar_captura'.
+    """
+
+    def __init__(self, page, nombres, modo, directorio):
+        self.nombres = list(nombres)
+        self.modo = modo
+        self.directorio = directorio
+        self.patrones = {nombre: patron_url(nombre, modo) for nombre in self.nombres}
+        self.respuestas = {nombre: [] for nombre in self.nombres}
+        self.eventos = {nombre: asyncio.Event() for nombre in self.nombres}
+        # Navegación en curso de cada esquema; 'limpiar' la avanza y las respuestas que
+        # terminan de leerse después (de la página anterior) se descartan
+        self.navegaciones = {nombre: 0 for nombre in self.nombres}
+        sin_endpoint = [nombre for nombre, patron in self.patrones.items() if patron is None]
+        if modo == "activo" and sin_endpoint:
+            logging.warning(f"Esquemas sin endpoint confirmado, se usa el DOM: {sin_endpoint}. Grabar respuestas reales con MODO_RED = 'grabar' y fijar su 'endpoint'.")
+        if any(self.patrones.values()):
+            page.on("response", self.al_responder)
+
+    def al_responder(self, response):
+        for nombre in self.nombres:
+            patron = self.patrones[nombre]
+            if patron and re.search(patron, response.url):
+                asyncio.ensure_future(self.leer(nombre, response, self.navegaciones[nombre]))
+
+    async def leer(self, nombre, response, navegacion):
+        if "json" not in (response.headers.get("content-type") or ""):
+            return
+        try:
+            payload = await response.json()
+        except Exception:
+            return
+        if self.modo == "grabar":
+            # Se graba todo lo que coincide con el patrón amplio; los datos siguen saliendo del DOM
+            grabar_fixture(nombre, response.url, payload, self.directorio)
+            return
+        registros = extraer_registros(payload, ESQUEMAS[nombre])
+        if registros is None or navegacion != self.navegaciones[nombre]:
+            return
+        logging.debug(f"{nombre}: datos tomados de {response.url}")
+        self.respuestas[nombre].append(registros)
+        self.eventos[nombre].set()
+
+    def limpiar(self, nombre):
+        """Descarta lo capturado de un esquema; se llama antes de navegar a otra página."""
+        self.navegaciones[nombre] += 1
+        self.respuestas[nombre] = []
+        self.eventos[nombre].clear()
+
+    async def esperar(self, nombre, segundos=ESPERA_RED_SEGUNDOS):
+        """
+        Espera una respuesta reconocida del esquema y devuelve sus registros.
+
+        Parámetros:
+        nombre (str): Esquema.
+        segundos (float): Espera máxima.
+
+        Retorna:
+        list: Registros de la última respuesta de la página, o None para usar el DOM.
+        """
+        if self.modo in ("desactivado", "grabar") or self.patrones[nombre] is None:
+            return None
+        # Si el sitio dejó de mandar este JSON, no se sigue pagando la espera en cada página
+        fallos = fallos_por_esquema.get(nombre, 0)
+        if not self.respuestas[nombre] and fallos < FALLOS_ANTES_DE_DESISTIR:
+            try:
+                await asyncio.wait_for(self.eventos[nombre].wait(), timeout=segundos)
+            except asyncio.TimeoutError:
+                pass
+        if not self.respuestas[nombre]:
+            fallos_por_esquema[nombre] = fallos + 1
+            if fallos + 1 == FALLOS_ANTES_DE_DESISTIR:
+                logging.info(f"Sin respuestas JSON de {nombre} en {FALLOS_ANTES_DE_DESISTIR} páginas; se usa solo el DOM.")
+            return None
+        fallos_por_esquema[nombre] = 0
+        return self.respuestas[nombre][-1]
+
+async def iniciar_captura(page, nombres, modo=None, directorio=DIRECTORIO_FIXTURES):
+    """
+    Empieza a capturar las respuestas de una página. En modo "reproducir", las llamadas con
+    respuesta grabada se responden desde DIRECTORIO_FIXTURES.
+
+    Parámetros:
+    page: Página de Playwright.
+    nombres (list): Esquemas de ESQUEMAS a capturar.
+    modo (str): Modo; por defecto MODO_RED.
+    directorio (str): Directorio de fixtures.
+
+    Retorna:
+    CapturaRed: Captura asociada a la página.
+    """
+    modo = modo or MODO_RED
+    if modo == "reproducir":
+        for nombre in nombres:
+            async def responder(route, nombre=nombre):
+                ruta = archivo_fixture(nombre, route.request.url, directorio)
+                if not os.path.exists(ruta):
+                    await route.continue_()
+                    return
+                with open(ruta, encoding="utf-8") as file:
+                    await route.fulfill(json=json.load(file)["payload"])
+            await page.route(re.compile(patron_url(nombre, modo)), responder)
+    return CapturaRed(page, nombres, modo, directorio)
+
+def verificar_fixtures(directorio=DIRECTORIO_FIXTURES):
+    """
+    Vuelve a extraer los registros de cada fixture y los compara con los guardados, sin navegador.
+
+    Parámetros:
+    directorio (str): Directorio de fixtures (una carpeta por esquema).
+
+    Retorna:
+    list: Fixtures cuyo resultado cambió.
+    """
+    distintos = []
+    for nombre in sorted(os.listdir(directorio)) if os.path.isdir(directorio) else []:
+        if nombre not in ESQUEMAS:
+            continue
+        for archivo in sorted(os.listdir(os.path.join(directorio, nombre))):
+            ruta = os.path.join(directorio, nombre, archivo)
+            with open(ruta, encoding="utf-8") as file:
+                fixture = json.load(file)
+            registros = extraer_registros(fixture["payload"], ESQUEMAS[nombre])
+            estado = "ok" if registros == fixture.get("esperado") else "DISTINTO"
+            print(f"{estado}\t{nombre}\t{archivo}\t{len(registros or [])} registros")
+            if estado != "ok":
+                distintos.append(ruta)
+    return distintos
+
+
+if __name__ == "__main__":
+    sys.exit(1 if verificar_fixtures(sys.argv[1] if len(sys.argv) > 1 else DIRECTORIO_FIXTURES) else 0)
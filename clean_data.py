@@ -1,48 +1,24 @@
 import pandas as pd
 import logging
 import csv
-import locale
+import math
+import os
 import re
+import shutil
+import tempfile
 import unicodedata
 from datetime import datetime
 import numpy as np
 
-# Configurar logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("app.log", mode="a", encoding="utf-8"),  # Guarda en un archivo
-        logging.StreamHandler()  # Muestra en consola
-    ]
-)
-
-# Función para convertir la fecha de nacimiento
-def convertir_fecha(fecha):
-    try:
-        # Eliminar espacios extra al principio y al final
-        fecha = fecha.strip()
-
-        # Separar la fecha de la edad usando el primer espacio
-        fecha_sin_edad = fecha.split("(")[0]  # Tomamos solo la parte "11/03/1995"
-        
-        # Separar la fecha en día, mes, y año
-        dia, mes, anio = fecha_sin_edad.split("/")  # Separa la fecha en día, mes, año
-        
-        # Diccionario de meses
-        meses = {
-            "01": "enero", "02": "febrero", "03": "marzo", "04": "abril", "05": "mayo", "06": "junio",
-            "07": "julio", "08": "agosto", "09": "septiembre", "10": "octubre", "11": "noviembre", "12": "diciembre"
-        }
-        
-        # Convertir el mes numérico al nombre
-        mes_nombre = meses[mes]
-        
-        # Formatear la fecha en el formato requerido sin la edad entre paréntesis
-        return f"{dia}_{mes_nombre}_{anio}"
-    except Exception as e:
-        logging.error(f"Error al convertir la fecha {fecha}: {e}")
-        return fecha  # En caso de error, devolvemos la fecha original
+import almacen_panel
+import cruce_fuentes
+import fechas
+import historial_panel
+import perfilado
+import registro
+import similares
+import validacion
+from archivos_ligas import archivos_ligas_soccerway, archivos_ligas_transfermarkt, archivos_ligas_besoccer, archivo_csv, CAMPOS_TEMPORADA, archivo_temporadas
 
 def leer_csv(archivo):
     """Lee un archivo CSV y lo devuelve como un DataFrame de pandas."""
@@ -69,9 +45,9 @@ def limpiar_texto(texto):
         if pd.isna(texto):  # Si es NaN, devolver una cadena vacía
             return ""
         
-        # Si el valor es una fecha, convertirla a string en formato YYYY-MM-DD
-        if isinstance(texto, pd.Timestamp):  
-            return texto.strftime("%d_%B_%Y")  # Convertir a string sin la hora
+        # Si el valor es una fecha, convertirla a string en formato DD_mes_YYYY
+        if isinstance(texto, pd.Timestamp):
+            return fechas.llave_fecha(pd.Series([texto]))[0]
         
         return "_".join(str(texto).strip().split()).lower()  # Convertir a texto limpio
     except Exception as e:
@@ -97,6 +73,9 @@ def agregar_llave_primaria_soccerway(df):
             if col not in df.columns:
                 raise ValueError(f"Falta la columna '{col}' en el archivo CSV.")
 
+        # La fecha va como "08_septiembre_1993", igual que en las otras fuentes
+        df_temp["Fecha de nacimiento"] = fechas.llave_fecha(fechas.parsear_fechas(df_temp["Fecha de nacimiento"]))
+
         # Limpiar espacios en blanco en cada celda de las columnas necesarias
         for col in columnas_necesarias:
             df_temp[col] = df_temp[col].apply(limpiar_texto)
@@ -130,8 +109,10 @@ def agregar_llave_primaria_tmkt(df):
             if col not in df_temp.columns:
                 raise ValueError(f"Falta la columna '{col}' en el archivo CSV.")
 
-        # Convertir la columna 'Fecha nacimiento'
-        df_temp["Fecha Nacimiento"] = df_temp["Fecha Nacimiento"].apply(convertir_fecha)
+        # Convertir la columna 'Fecha nacimiento' ("11/03/1995 (29)") a "11_marzo_1995"; si no se
+        # reconoce la fecha se deja el texto original
+        fecha = fechas.llave_fecha(fechas.parsear_fechas(df_temp["Fecha Nacimiento"]))
+        df_temp["Fecha Nacimiento"] = fecha.where(fecha != "", df_temp["Fecha Nacimiento"])
 
         # Limpiar espacios en blanco en cada celda de las columnas necesarias
         for col in columnas_necesarias:
@@ -162,7 +143,7 @@ def guardar_en_csv(datos, archivo):
 
 def formatear_fechas_soccerway(df, columna_fecha):
     """
-    Formatea las fechas de una columna en el DataFrame para que los días siempre tengan dos dígitos.
+    Convierte las fechas de soccerway ("8 septiembre 1993") a fechas reales, sin depender del locale.
 
     Parámetros:
     df (pd.DataFrame): El DataFrame que contiene la columna de fechas.
@@ -171,55 +152,21 @@ def formatear_fechas_soccerway(df, columna_fecha):
     Retorna:
     pd.DataFrame: DataFrame con las fechas formateadas.
     """
-    try:
-        # Establecer el locale a español para que pandas reconozca los nombres de los meses
-        locale.setlocale(locale.LC_TIME, 'es_ES.UTF-8')
-
-        # Convertir la columna de fecha a datetime especificando el formato
-        df[columna_fecha] = pd.to_datetime(df[columna_fecha], format='%d %B %Y', errors='coerce')
+    df[columna_fecha] = fechas.parsear_fechas(df[columna_fecha])
+    return df
 
-        return df
-    
-    except Exception as e:
-        print(f"Error al formatear las fechas: {e}")
-        return df
-    
 def extraer_fecha_de_columna_besoccer(df, columna_fecha):
     """
-    Extrae y formatea las fechas de la columna del DataFrame, quedándose solo con el formato 'DD mes YYYY'.
-    
+    Extrae la fecha de las cadenas 'Nacido el DD mes YYYY en ...' de besoccer.
+
     Parámetros:
     df (pd.DataFrame): DataFrame que contiene la columna con las fechas.
-    columna_fecha (str): El nombre de la columna que contiene las cadenas con la fecha en el formato 'Nacido el DD mes YYYY en ...'.
-    
+    columna_fecha (str): El nombre de la columna que contiene las cadenas con la fecha.
+
     Retorna:
-    pd.DataFrame: DataFrame modificado con la nueva columna 'fecha_formateada'.
+    pd.DataFrame: DataFrame con la columna 'birth_date' como fecha real.
     """
-    # Expresión regular para encontrar la fecha en el formato 'DD mes YYYY'
-    patron_fecha = r'Nacido el (\d{1,2}) (\w+) (\d{4})'
-    
-    # Función para extraer y formatear la fecha
-    def formatear_fecha(cadena):
-        if not isinstance(cadena, str):  # Verifica si cadena no es un string
-            return None  
-
-        cadena = cadena.strip()  # Elimina espacios en blanco al inicio y al final
-
-        patron_fecha = r"(\d{1,2}) (\w+) (\d{4})"  # Asegúrate de definir tu patrón correctamente
-        coincidencia = re.search(patron_fecha, cadena)
-
-        if coincidencia:
-            dia = coincidencia.group(1).zfill(2)  # Asegura que el día tenga dos dígitos
-            mes = coincidencia.group(2)
-            anio = coincidencia.group(3)
-            return f"{dia} {mes} {anio}"
-        
-        return None  # Si no se encuentra la fecha
-
-    # Aplicar la función a la columna especificada
-    df['birth_date'] = df[columna_fecha].apply(formatear_fecha)
-    
-    # Devolver el DataFrame modificado
+    df['birth_date'] = fechas.parsear_fechas(df[columna_fecha])
     return df
 
 def agregar_llave_primaria_besoccer(df):
@@ -241,6 +188,9 @@ def agregar_llave_primaria_besoccer(df):
             if col not in df_temp.columns:
                 raise ValueError(f"Falta la columna '{col}' en el archivo CSV.")
 
+        # La fecha va como "08_septiembre_1993", igual que en las otras fuentes
+        df_temp["birth_date"] = fechas.llave_fecha(fechas.parsear_fechas(df_temp["birth_date"]))
+
         # Limpiar espacios en blanco en cada celda de las columnas necesarias
         for col in columnas_necesarias:
             df_temp[col] = df_temp[col].apply(limpiar_texto)
@@ -289,172 +239,310 @@ def aplicar_quitar_tildes(df, columna):
     
     # Devolver el DataFrame modificado
     return df
+# Campos tipados -------------------------------------------------------------------------
+# Valor de mercado, altura, peso y fechas de contrato llegan como texto ("1,20 mill. €",
+# "187 cm", "31/12/2027"). Se convierten una sola vez, de forma vectorizada, a euros,
+# centímetros, kilos y fechas reales.
 
+# Valores que indican que la fuente no tiene el dato (no cuentan como error de conversión)
+VALORES_SIN_DATO = ["", "-", "?", "Sin valor", "Sin información", "Sin fecha", "Desconocido", "nan", "None"]
 
+PATRON_VALOR_MERCADO = r"^\s*(?P<numero>\d+(?:[.,]\d+)*)\s*(?P<unidad>mill\.?|mil)?\s*€?\s*$"
+MULTIPLICADOR_VALOR_MERCADO = {"mil": 1_000, "mill": 1_000_000, "mill.": 1_000_000}
 
-# Soccerway -------------------------------------------------------------------------
+def contar_fallas_parseo(original, convertido, columna):
+    """
+    Cuenta los valores que tenían dato pero no se pudieron convertir y los informa en el log.
 
-archivos_ligas_soccerway = ["raw_soccerway_primera_cl.csv","raw_soccerway_primera_b_cl.csv","raw_soccerway_segunda_cl.csv","raw_soccerway_primera_b_arg.csv","raw_soccerway_tfa_arg_1.csv","raw_soccerway_tfa_arg_2.csv","raw_soccerway_tfa_arg_3.csv","raw_soccerway_tfa_arg_4.csv"]
+    Parámetros:
+    original (pd.Series): Columna de texto original.
+    convertido (pd.Series): Columna convertida, con NaN/NaT donde falló la conversión.
+    columna (str): Nombre de la columna, para el log.
 
-# Leemos archivos de soccerway y los unimos -----------------------------------------------------
-df_soccerway_primera_cl = leer_csv("raw_soccerway_primera_cl.csv")
-df_soccerway_primera_b_cl = leer_csv("raw_soccerway_primera_b_cl.csv")
-df_soccerway_segunda_cl = leer_csv("raw_soccerway_segunda_cl.csv")
-df_soccerway_primera_b_arg = leer_csv("raw_soccerway_primera_b_arg.csv")
-df_soccerway_primera_c_arg = leer_csv("raw_soccerway_primera_c_arg.csv")
-df_soccerway_tfa_arg_1 = leer_csv("raw_soccerway_tfa_arg_1.csv")
-df_soccerway_tfa_arg_2 = leer_csv("raw_soccerway_tfa_arg_2.csv")
-df_soccerway_tfa_arg_3 = leer_csv("raw_soccerway_tfa_arg_3.csv")
-df_soccerway_tfa_arg_4 = leer_csv("raw_soccerway_tfa_arg_4.csv")
-lista_df_soccerway = [df_soccerway_primera_cl,df_soccerway_primera_b_cl,df_soccerway_segunda_cl,df_soccerway_primera_b_arg,df_soccerway_primera_c_arg,df_soccerway_tfa_arg_1,df_soccerway_tfa_arg_2,df_soccerway_tfa_arg_3,df_soccerway_tfa_arg_4]
+    Retorna:
+    int: Cantidad de valores no reconocidos.
+    """
+    texto = original.astype(str).str.strip()
+    fallas = original.notna() & ~texto.isin(VALORES_SIN_DATO) & convertido.isna()
+    n_fallas = int(fallas.sum())
 
-#Aplicamos transformaciones ------------------------------------------------
-df_soccerway = pd.concat(lista_df_soccerway, ignore_index=True)
-df_soccerway =formatear_fechas_soccerway(df_soccerway,"Fecha de nacimiento")
-df_soccerway = agregar_llave_primaria_soccerway(df_soccerway)
-df_soccerway = aplicar_quitar_tildes(df_soccerway,"soccerway_pk")
-archivo_soccerway = "stg_soccerway.csv"
-df_soccerway.to_csv(archivo_soccerway, index=False, encoding="utf-8")
+    if n_fallas:
+        ejemplos = texto[fallas].unique()[:5].tolist()
+        logging.warning(f"Columna '{columna}': {n_fallas} valores no reconocidos, por ejemplo {ejemplos}.")
+    return n_fallas
 
-# Transfermarkt -------------------------------------------------------------------------
+def parsear_valor_mercado(serie):
+    """
+    Convierte valores de mercado de transfermarkt ("800 mil €", "1,20 mill. €", "1.500 mil €") a euros.
 
-archivos_ligas_transfermarkt = ["raw_transfermarkt_primera_cl.csv","raw_transfermarkt_primera_b_cl.csv","raw_transfermarkt_primera_b_arg.csv"]
+    Parámetros:
+    serie (pd.Series): Columna con los valores de mercado como texto.
 
-# Leemos archivos transfermarkt
-df_transfermarkt_primera_cl = leer_csv("raw_transfermarkt_primera_cl.csv")
-df_transfermarkt_primera_b_cl = leer_csv("raw_transfermarkt_primera_b_cl.csv")
-df_transfermarkt_primera_b_arg = leer_csv("raw_transfermarkt_primera_b_arg.csv")
-lista_df_transfermarkt = [df_transfermarkt_primera_cl,df_transfermarkt_primera_b_cl,df_transfermarkt_primera_b_arg]
+    Retorna:
+    pd.Series: Valores en euros (Int64), nulos si no hay dato o no se reconoce el formato.
+    """
+    partes = serie.astype(str).str.extract(PATRON_VALOR_MERCADO)
+    # Formato español: punto para miles y coma para decimales
+    numero = partes["numero"].str.replace(".", "", regex=False).str.replace(",", ".", regex=False)
+    numero = pd.to_numeric(numero, errors="coerce")
+    multiplicador = partes["unidad"].map(MULTIPLICADOR_VALOR_MERCADO).fillna(1)
+    return (numero * multiplicador).round().astype("Int64")
+
+def parsear_medida(serie, unidad):
+    """
+    Convierte medidas como "187 cm" o "80 kg" a enteros. Para la altura también acepta metros ("1,87 m").
 
-#Aplicamos transformaciones
-df_transfermarkt = pd.concat(lista_df_transfermarkt, ignore_index=True)
-df_transfermarkt = agregar_llave_primaria_tmkt(df_transfermarkt)
-df_transfermarkt = aplicar_quitar_tildes(df_transfermarkt,"tmkt_pk")
-archivo_tmkt = "stg_tmkt.csv"
-df_transfermarkt.to_csv(archivo_tmkt, index=False, encoding="utf-8")
+    Parámetros:
+    serie (pd.Series): Columna con las medidas como texto.
+    unidad (str): 'cm' o 'kg'.
 
+    Retorna:
+    pd.Series: Medidas enteras (Int64), nulas si no hay dato o no se reconoce el formato.
+    """
+    texto = serie.astype(str)
+    medida = pd.to_numeric(texto.str.extract(rf"^\s*(\d+)\s*{unidad}\s*$")[0], errors="coerce")
 
-# Besoccer -------------------------------------------------------------------------
+    if unidad == "cm":
+        metros = pd.to_numeric(texto.str.extract(r"^\s*(\d[.,]\d{1,2})\s*m\s*$")[0].str.replace(",", ".", regex=False), errors="coerce")
+        medida = medida.fillna(metros * 100)
 
-archivos_ligas_besoccer = ["raw_besoccer_primera_cl.csv","raw_besoccer_primera_b_cl.csv","raw_besoccer_segunda_cl"]
+    return medida.round().astype("Int64")
 
-df_besoccer_primera_cl = leer_csv("raw_besoccer_primera_cl.csv")
-df_besoccer_primera_b_cl = leer_csv("raw_besoccer_primera_b_cl.csv")
-df_besoccer_segunda_cl = leer_csv("raw_besoccer_segunda_cl.csv")
-lista_df_besoccer = [df_besoccer_primera_cl,df_besoccer_primera_b_cl,df_besoccer_segunda_cl]
+def parsear_fecha_dmy(serie):
+    """
+    Convierte fechas "DD/MM/YYYY" (como las de transfermarkt) a fechas reales.
 
-df_besoccer = pd.concat(lista_df_besoccer, ignore_index=True)
-df_besoccer = extraer_fecha_de_columna_besoccer(df_besoccer,"birth_date")
-df_besoccer = agregar_llave_primaria_besoccer(df_besoccer)
-df_besoccer = aplicar_quitar_tildes(df_besoccer,"besoccer_pk")
-archivo_besoccer = "stg_besoccer.csv"
-df_besoccer.to_csv(archivo_besoccer, index=False, encoding="utf-8")
+    Parámetros:
+    serie (pd.Series): Columna con las fechas como texto.
 
+    Retorna:
+    pd.Series: Fechas (datetime64), NaT si no hay dato o no se reconoce el formato.
+    """
+    return pd.to_datetime(serie.astype(str).str.strip(), format="%d/%m/%Y", errors="coerce")
 
+def tipar_columnas(df, conversiones):
+    """
+    Aplica las conversiones a las columnas presentes del DataFrame e informa los valores no reconocidos.
 
-archivo_csv = "clean_data_final_4.csv"
+    Parámetros:
+    df (pd.DataFrame): DataFrame a convertir.
+    conversiones (dict): Columna -> función que recibe la serie de texto y devuelve la serie tipada.
 
-df_consolidado_aux =pd.merge(df_soccerway,df_transfermarkt, left_on = "soccerway_pk", right_on = "tmkt_pk", how = "left")
+    Retorna:
+    pd.DataFrame: DataFrame con las columnas tipadas.
+    """
+    for columna, convertir in conversiones.items():
+        if columna not in df.columns:
+            continue
+        original = df[columna]
+        df[columna] = convertir(original)
+        contar_fallas_parseo(original, df[columna], columna)
+    return df
 
-df_consolidado =pd.merge(df_consolidado_aux,df_besoccer, left_on = "soccerway_pk", right_on = "besoccer_pk", how = "left")
+# Conversiones por fuente
+CONVERSIONES_SOCCERWAY = {
+    "Altura": lambda serie: parsear_medida(serie, "cm"),
+    "Peso": lambda serie: parsear_medida(serie, "kg"),
+}
+CONVERSIONES_TRANSFERMARKT = {
+    "Valor de Mercado": parsear_valor_mercado,
+    "Fichado": parsear_fecha_dmy,
+    "Contrato Hasta": parsear_fecha_dmy,
+}
 
-# Transformaciones Finales
-columnas_a_reemplazar = [
-    'Salto', 'Estirada', 'Paradas', 'Saques', 'Colocación', 
-    'Reflejos', 'Ritmo', 'Tiro', 'Pase', 'Regate', 'Defensa', 
-    'Físico', 'ELO',
-    '2025_Temporada', '2025_Equipo', '2025_Liga', '2025_Minutos Jugados', 
-    '2025_Apariciones', '2025_Alineaciones', '2025_Entra', '2025_Sale', 
-    '2025_Comenzó de suplente', '2025_Gol', '2025_Amarilla', 
-    '2025_Segunda Amarilla', '2025_Roja', '2024_Temporada', '2024_Equipo', 
-    '2024_Liga', '2024_Minutos Jugados', '2024_Apariciones', '2024_Alineaciones', 
-    '2024_Entra', '2024_Sale', '2024_Comenzó de suplente', '2024_Gol', 
-    '2024_Amarilla', '2024_Segunda Amarilla', '2024_Roja','Valor de Mercado','Edad_x','Fisico'
-]
 
-# Filtrar solo las columnas que existen en el DataFrame para evitar errores
-columnas_presentes = [col for col in columnas_a_reemplazar if col in df_consolidado.columns]
+def normalizar_soccerway(df):
+    """
+    Formatea las fechas de soccerway, agrega la llave 'soccerway_pk', le quita los tildes
+    y convierte altura y peso a enteros.
 
+    Parámetros:
+    df (pd.DataFrame): DataFrame crudo de soccerway (completo o un bloque).
 
-# Reemplazar "?" y "Desconocido" por 0, y luego rellenar los valores NaN con 0
-df_consolidado[columnas_presentes] = df_consolidado[columnas_presentes].replace({"?": 0, "Desconocido": 0}).fillna(0)
+    Retorna:
+    pd.DataFrame: DataFrame con la llave normalizada.
+    """
+    with perfilado.etapa("fechas_soccerway", df) as medicion:
+        df = medicion.salida(formatear_fechas_soccerway(df, "Fecha de nacimiento"))
+    with perfilado.etapa("llave_soccerway", df) as medicion:
+        df = medicion.salida(agregar_llave_primaria_soccerway(df))
+    if df is None:
+        return None
+    with perfilado.etapa("tildes_soccerway", df) as medicion:
+        df = medicion.salida(aplicar_quitar_tildes(df, "soccerway_pk"))
+    with perfilado.etapa("tipos_soccerway", df) as medicion:
+        return medicion.salida(tipar_columnas(df, CONVERSIONES_SOCCERWAY))
 
-# Lista de las columnas que deseas convertir a entero
-columnas_entero = ['Salto', 'Estirada', 'Paradas', 'Saques', 'Colocación', 
-                   'Reflejos', 'Ritmo', 'Tiro', 'Pase', 'Regate', 'Defensa', 
-                   'Físico', 'ELO']
+def normalizar_transfermarkt(df):
+    """
+    Agrega la llave 'tmkt_pk' a los datos de transfermarkt, le quita los tildes y convierte
+    el valor de mercado a euros y las fechas de fichaje y contrato a fechas reales.
 
-# Convertir las columnas seleccionadas a tipo entero
-df_consolidado[columnas_entero] = df_consolidado[columnas_entero].astype(int)
+    Parámetros:
+    df (pd.DataFrame): DataFrame crudo de transfermarkt (completo o un bloque).
 
-# Lista de columnas a rellenar con "Sin información"
-columnas_texto = [
-    'Fecha de nacimiento', 'Altura', 'Peso', 'Pie_x', 'Posicion Secundaria', 
-    'Link Jugador', 'Agente', 'Fichado', 'Contrato Hasta'
-]
-
-# Filtrar solo las columnas que existen en el DataFrame
-columnas_presentes_texto = [col for col in columnas_texto if col in df_consolidado.columns]
-
-# Rellenar valores vacíos con "Sin información" en las columnas de texto
-df_consolidado[columnas_presentes_texto] = df_consolidado[columnas_presentes_texto].fillna("Sin información")
-
-
-# Eliminar duplicados y quedarte solo con el primer valor de cada 'soccerway_pk'
-df_consolidado = df_consolidado.drop_duplicates(subset="soccerway_pk", keep="first")
-
-col_a_eliminar = [
-    "2019/2020_Temporada", "2019/2020_Equipo", "2019/2020_Liga", "2019/2020_Minutos Jugados",
-    "2019/2020_Apariciones", "2019/2020_Alineaciones", "2019/2020_Entra", "2019/2020_Sale",
-    "2019/2020_Comenzó de suplente", "2019/2020_Gol", "2019/2020_Amarilla", 
-    "2019/2020_Segunda Amarilla", "2019/2020_Roja", "tmkt_pk", "Nombre Jugador", 
-    "Fecha Nacimiento", "Posicion", "Equipo_y", "Nacionalidad_y", "Pie_y", "besoccer_pk", 
-    "Nombre completo", "Nacionalidad", "Edad_y", "birth_date"
-]
+    Retorna:
+    pd.DataFrame: DataFrame con la llave normalizada.
+    """
+    # Las fechas de nacimiento de transfermarkt se leen al armar la llave
+    with perfilado.etapa("llave_transfermarkt", df) as medicion:
+        df = medicion.salida(agregar_llave_primaria_tmkt(df))
+    if df is None:
+        return None
+    with perfilado.etapa("tildes_transfermarkt", df) as medicion:
+        df = medicion.salida(aplicar_quitar_tildes(df, "tmkt_pk"))
+    with perfilado.etapa("tipos_transfermarkt", df) as medicion:
+        return medicion.salida(tipar_columnas(df, CONVERSIONES_TRANSFERMARKT))
 
-df_consolidado = df_consolidado.drop(columns=[col for col in col_a_eliminar if col in df_consolidado.columns])
-df_consolidado = df_consolidado.dropna(subset=["Nombre"])
+def normalizar_besoccer(df):
+    """
+    Extrae la fecha de nacimiento de besoccer, agrega la llave 'besoccer_pk' y le quita los tildes.
 
-# Crear la columna 'Nombre Jugador' concatenando 'Nombre' y 'Apellidos'
-df_consolidado['Nombre Jugador'] = df_consolidado['Nombre'] + ' ' + df_consolidado['Apellidos']
+    Parámetros:
+    df (pd.DataFrame): DataFrame crudo de besoccer (completo o un bloque).
 
+    Retorna:
+    pd.DataFrame: DataFrame con la llave normalizada.
+    """
+    with perfilado.etapa("fechas_besoccer", df) as medicion:
+        df = medicion.salida(extraer_fecha_de_columna_besoccer(df, "birth_date"))
+    with perfilado.etapa("llave_besoccer", df) as medicion:
+        df = medicion.salida(agregar_llave_primaria_besoccer(df))
+    if df is None:
+        return None
+    with perfilado.etapa("tildes_besoccer", df) as medicion:
+        return medicion.salida(aplicar_quitar_tildes(df, "besoccer_pk"))
 
-columnas_a_convertir = ["Temporada", "2025_Temporada", "2024_Temporada"]
-
-# Convertir las columnas a números, reemplazar NaN con 0 y asegurarse de que sean int
-for col in columnas_a_convertir:
-    if col in df_consolidado.columns:  # Verifica que la columna exista
-        df_consolidado[col] = pd.to_numeric(df_consolidado[col], errors="coerce").fillna(0).astype(int)
+def consolidar_fuentes(df_soccerway, df_transfermarkt, df_besoccer):
+    """
+    Une las tres fuentes por llave y aplica las transformaciones finales del panel.
 
-# Lista de columnas permitidas
-columnas_permitidas = [
-    'soccerway_pk', 'Nombre', 'Apellidos','Nombre Jugador', 'Nacionalidad_x', 'Fecha de nacimiento', 
-    'Edad_x', 'País de nacimiento', 'Posición', 'Altura', 'Peso', 'Pie_x', 'Equipo_x', 
-    'Temporada', 'URL', '2025_Temporada', '2025_Equipo', '2025_Liga', '2025_Minutos Jugados', 
-    '2025_Apariciones', '2025_Alineaciones', '2025_Entra', '2025_Sale', '2025_Comenzó de suplente', 
-    '2025_Gol', '2025_Amarilla', '2025_Segunda Amarilla', '2025_Roja', '2024_Temporada', 
-    '2024_Equipo', '2024_Liga', '2024_Minutos Jugados', '2024_Apariciones', '2024_Alineaciones', 
-    '2024_Entra', '2024_Sale', '2024_Comenzó de suplente', '2024_Gol', '2024_Amarilla', 
-    '2024_Segunda Amarilla', '2024_Roja', 'Posicion Secundaria', 'Link Jugador', 'Valor de Mercado', 
-    'Agente', 'Fichado', 'Contrato Hasta', 'ELO', 'Ritmo', 'Tiro', 'Pase', 'Regate', 'Defensa',
-    'Físico', 'Salto', 'Estirada', 'Paradas', 'Saques', 'Colocación', 'Reflejos'
-]
-
-# Seleccionar solo las columnas permitidas que existan en el DataFrame
-df_consolidado = df_consolidado[[col for col in columnas_permitidas if col in df_consolidado.columns]]
+    Parámetros:
+    df_soccerway (pd.DataFrame): Datos normalizados de soccerway.
+    df_transfermarkt (pd.DataFrame): Datos normalizados de transfermarkt.
+    df_besoccer (pd.DataFrame): Datos normalizados de besoccer.
 
-# Diccionario con las columnas renombradas (quitando "_x")
-columnas_renombradas = {
-    'Nacionalidad_x': 'Nacionalidad',
-    'Edad_x': 'Edad',
-    'Pie_x': 'Pie',
-    'Equipo_x': 'Equipo'
-}
-# Renombrar las columnas si existen en el DataFrame
-df_consolidado = df_consolidado.rename(columns=columnas_renombradas)
+    Retorna:
+    tuple: (DataFrame consolidado, una fila por 'soccerway_pk'; cruces por fuente de
+    cruce_fuentes.unir_fuentes). Las estadísticas por temporada no se incluyen, se agregan
+    al exportar con 'exportar_panel'.
+    """
+    # Cada fuente queda con una fila por llave antes de unir (cruce_fuentes.DESEMPATE)
+    df_consolidado, cruces = cruce_fuentes.unir_fuentes(df_soccerway, df_transfermarkt, df_besoccer)
+
+    with perfilado.etapa("transformaciones_finales", df_consolidado) as medicion:
+        df_consolidado = medicion.salida(transformaciones_finales(df_consolidado))
+
+    return df_consolidado, cruces
+
+def transformaciones_finales(df_consolidado):
+    """
+    Rellena y tipa las columnas del panel unido, crea 'Nombre Jugador' y deja solo las
+    columnas permitidas, sin los sufijos del cruce.
+
+    Parámetros:
+    df_consolidado (pd.DataFrame): Resultado de cruce_fuentes.unir_fuentes.
+
+    Retorna:
+    pd.DataFrame: DataFrame consolidado.
+    """
+    columnas_a_reemplazar = [
+        'Salto', 'Estirada', 'Paradas', 'Saques', 'Colocación', 
+        'Reflejos', 'Ritmo', 'Tiro', 'Pase', 'Regate', 'Defensa', 
+        'Físico', 'ELO', 'Edad_x','Fisico'
+    ]
+
+    # Filtrar solo las columnas que existen en el DataFrame para evitar errores
+    columnas_presentes = [col for col in columnas_a_reemplazar if col in df_consolidado.columns]
+
+
+    # Reemplazar "?" y "Desconocido" por 0, y luego rellenar los valores NaN con 0
+    df_consolidado[columnas_presentes] = df_consolidado[columnas_presentes].replace({"?": 0, "Desconocido": 0}).fillna(0)
+
+    # Lista de las columnas que deseas convertir a entero
+    columnas_entero = ['Salto', 'Estirada', 'Paradas', 'Saques', 'Colocación', 
+                       'Reflejos', 'Ritmo', 'Tiro', 'Pase', 'Regate', 'Defensa', 
+                       'Físico', 'ELO']
+
+    # Altura, peso y valor de mercado ya vienen tipados; sin dato quedan en 0
+    columnas_medida = [col for col in ['Altura', 'Peso', 'Valor de Mercado'] if col in df_consolidado.columns]
+    df_consolidado[columnas_medida] = df_consolidado[columnas_medida].fillna(0)
+    columnas_entero = columnas_entero + columnas_medida + [col for col in ['Edad_x'] if col in df_consolidado.columns]
+
+    # Convertir las columnas seleccionadas a tipo entero
+    df_consolidado[columnas_entero] = df_consolidado[columnas_entero].astype(int)
+
+    # Lista de columnas a rellenar con "Sin información" ('Fichado' y 'Contrato Hasta' son
+    # fechas y quedan vacías cuando no hay dato)
+    columnas_texto = [
+        'Fecha de nacimiento', 'Pie_x', 'Posicion Secundaria', 
+        'Link Jugador', 'Agente'
+    ]
+
+    # Filtrar solo las columnas que existen en el DataFrame
+    columnas_presentes_texto = [col for col in columnas_texto if col in df_consolidado.columns]
+
+    # Rellenar valores vacíos con "Sin información" en las columnas de texto
+    df_consolidado[columnas_presentes_texto] = df_consolidado[columnas_presentes_texto].fillna("Sin información")
+
+
+    col_a_eliminar = [
+        "tmkt_pk", "Nombre Jugador", 
+        "Fecha Nacimiento", "Posicion", "Equipo_y", "Nacionalidad_y", "Pie_y", "besoccer_pk", 
+        "Nombre completo", "Nacionalidad", "Edad_y", "birth_date"
+    ]
+
+    df_consolidado = df_consolidado.drop(columns=[col for col in col_a_eliminar if col in df_consolidado.columns])
+    df_consolidado = df_consolidado.dropna(subset=["Nombre"])
+
+    # Crear la columna 'Nombre Jugador' concatenando 'Nombre' y 'Apellidos'
+    df_consolidado['Nombre Jugador'] = df_consolidado['Nombre'] + ' ' + df_consolidado['Apellidos']
+
+
+    # Convertir la temporada a número, reemplazar NaN con 0 y asegurarse de que sea int
+    if "Temporada" in df_consolidado.columns:
+        df_consolidado["Temporada"] = pd.to_numeric(df_consolidado["Temporada"], errors="coerce").fillna(0).astype(int)
+
+    # Lista de columnas permitidas
+    columnas_permitidas = [
+        'soccerway_pk', 'Nombre', 'Apellidos','Nombre Jugador', 'Nacionalidad_x', 'Fecha de nacimiento', 
+        'Edad_x', 'País de nacimiento', 'Posición', 'Altura', 'Peso', 'Pie_x', 'Equipo_x', 
+        'Temporada', 'URL', 'Posicion Secundaria', 'Link Jugador', 'Valor de Mercado', 
+        'Agente', 'Fichado', 'Contrato Hasta', 'ELO', 'Ritmo', 'Tiro', 'Pase', 'Regate', 'Defensa',
+        'Físico', 'Salto', 'Estirada', 'Paradas', 'Saques', 'Colocación', 'Reflejos'
+    ]
+
+    # Seleccionar solo las columnas permitidas que existan en el DataFrame
+    df_consolidado = df_consolidado[[col for col in columnas_permitidas if col in df_consolidado.columns]]
+
+    # Diccionario con las columnas renombradas (quitando "_x")
+    columnas_renombradas = {
+        'Nacionalidad_x': 'Nacionalidad',
+        'Edad_x': 'Edad',
+        'Pie_x': 'Pie',
+        'Equipo_x': 'Equipo'
+    }
+    # Renombrar las columnas si existen en el DataFrame
+    df_consolidado = df_consolidado.rename(columns=columnas_renombradas)
+
+    return df_consolidado
+
+
+# Temporadas -------------------------------------------------------------------------
+# Las estadísticas por temporada se guardan en una tabla larga (una fila por jugador y
+# temporada) con columnas tipadas. Solo al exportar se pivotan al formato ancho del panel
+# ('2025_Minutos Jugados', '2024_Gol', ...).
+
+# Temporadas que se muestran en el panel, de la más reciente a la más antigua
+TEMPORADAS_PANEL = ["2025", "2024"]
+
+CAMPOS_TEMPORADA_ENTEROS = CAMPOS_TEMPORADA[3:]
+
+# Columnas anchas de los archivos crudos antiguos, por ejemplo '2019/2020_Gol'
+PATRON_COLUMNA_TEMPORADA = re.compile(r"^(\d{4}(?:/\d{4})?)_(" + "|".join(re.escape(c) for c in CAMPOS_TEMPORADA) + r")$")
 
 # Diccionario con los nombres de las ligas
-ligas_dict = {
+LIGAS = {
     "PRD": "Primera División de Chile",
     "PA1": "Primera División de Argentina",
     "0": "Desconocido",
@@ -468,31 +556,580 @@ ligas_dict = {
     "TFA": "Torneo Federal A (Argentina)"
 }
 
-# Reemplazar los códigos de liga con sus nombres en las columnas 2025_Liga y 2024_Liga
-df_consolidado["2025_Liga"] = df_consolidado["2025_Liga"].replace(ligas_dict)
-df_consolidado["2024_Liga"] = df_consolidado["2024_Liga"].replace(ligas_dict)
+def separar_temporadas(df):
+    """
+    Quita las columnas anchas por temporada de soccerway y las convierte a formato largo.
+
+    Parámetros:
+    df (pd.DataFrame): DataFrame de soccerway con 'soccerway_pk' y 'URL'.
+
+    Retorna:
+    tuple: (DataFrame sin columnas de temporada, DataFrame largo de temporadas).
+    """
+    columnas_por_temporada = {}
+    for col in df.columns:
+        coincidencia = PATRON_COLUMNA_TEMPORADA.match(col)
+        if coincidencia:
+            columnas_por_temporada.setdefault(coincidencia.group(1), {})[coincidencia.group(2)] = col
+
+    bloques = []
+    for temporada, columnas in columnas_por_temporada.items():
+        df_temporada = pd.DataFrame({"soccerway_pk": df["soccerway_pk"], "URL": df["URL"]})
+        for campo in CAMPOS_TEMPORADA:
+            df_temporada[campo] = df[columnas[campo]] if campo in columnas else np.nan
+
+        # Solo quedan las filas de los jugadores que tienen datos en esa temporada
+        df_temporada = df_temporada[df_temporada[CAMPOS_TEMPORADA].notna().any(axis=1)]
+        df_temporada["Temporada"] = temporada
+        bloques.append(df_temporada)
+
+    columnas_anchas = [col for columnas in columnas_por_temporada.values() for col in columnas.values()]
+    df_jugadores = df.drop(columns=columnas_anchas)
+
+    if not bloques:
+        return df_jugadores, pd.DataFrame(columns=["soccerway_pk", "URL"] + CAMPOS_TEMPORADA)
+    return df_jugadores, pd.concat(bloques, ignore_index=True)
+
+def asignar_llave_temporadas(df_temporadas, df_mapa):
+    """
+    Agrega 'soccerway_pk' a las temporadas escritas por el scraper, que vienen identificadas por 'URL'.
+
+    Parámetros:
+    df_temporadas (pd.DataFrame): Temporadas en formato largo con la columna 'URL'.
+    df_mapa (pd.DataFrame): Columnas 'URL' y 'soccerway_pk' de los jugadores de soccerway.
+
+    Retorna:
+    pd.DataFrame: Temporadas con la columna 'soccerway_pk'.
+    """
+    df_mapa = df_mapa[["URL", "soccerway_pk"]].drop_duplicates(subset="URL")
+    df_temporadas = df_temporadas.drop(columns=["soccerway_pk"], errors="ignore")
+    df_temporadas = df_temporadas.merge(df_mapa, on="URL", how="inner")
+    return df_temporadas.reindex(columns=["soccerway_pk", "URL"] + CAMPOS_TEMPORADA)
+
+def tipar_temporadas(df_temporadas):
+    """
+    Tipa la tabla larga de temporadas: campos numéricos como enteros, ligas con su nombre
+    y una sola fila por jugador, temporada, equipo y liga.
+
+    Parámetros:
+    df_temporadas (pd.DataFrame): Temporadas en formato largo.
+
+    Retorna:
+    pd.DataFrame: Tabla de temporadas tipada.
+    """
+    df_temporadas = df_temporadas.reindex(columns=["soccerway_pk", "URL"] + CAMPOS_TEMPORADA)
+
+    df_temporadas["Temporada"] = df_temporadas["Temporada"].astype(str).str.strip()
+    for campo in ["Equipo", "Liga"]:
+        df_temporadas[campo] = df_temporadas[campo].where(df_temporadas[campo].isna(), df_temporadas[campo].astype(str).str.strip())
+    df_temporadas["Liga"] = df_temporadas["Liga"].replace(LIGAS)
+
+    for campo in CAMPOS_TEMPORADA_ENTEROS:
+        df_temporadas[campo] = pd.to_numeric(df_temporadas[campo], errors="coerce").fillna(0).astype("int32")
+
+    return df_temporadas.drop_duplicates(subset=["soccerway_pk", "Temporada", "Equipo", "Liga"], keep="first").reset_index(drop=True)
+
+def leer_temporadas(archivos_soccerway, df_mapa):
+    """
+    Lee los archivos de temporadas que acompañan a los archivos crudos de soccerway.
+
+    Parámetros:
+    archivos_soccerway (list): Archivos crudos de soccerway.
+    df_mapa (pd.DataFrame): Columnas 'URL' y 'soccerway_pk' de los jugadores de soccerway.
+
+    Retorna:
+    pd.DataFrame: Temporadas en formato largo con 'soccerway_pk', sin tipar.
+    """
+    lista_df = [pd.read_csv(archivo_temporadas(archivo)) for archivo in archivos_soccerway if os.path.exists(archivo_temporadas(archivo))]
+    if not lista_df:
+        return pd.DataFrame(columns=["soccerway_pk", "URL"] + CAMPOS_TEMPORADA)
+    return asignar_llave_temporadas(pd.concat(lista_df, ignore_index=True), df_mapa)
+
+def pivotar_temporadas(df_temporadas, temporadas=TEMPORADAS_PANEL):
+    """
+    Pivota la tabla larga de temporadas al formato ancho del panel.
+
+    Si un jugador tiene varias filas en la misma temporada (por ejemplo, cambió de equipo),
+    se usa la primera, que es la que aparece primero en su tabla de carrera.
+
+    Parámetros:
+    df_temporadas (pd.DataFrame): Tabla de temporadas tipada.
+    temporadas (list): Temporadas a pivotar, en el orden del panel.
+
+    Retorna:
+    pd.DataFrame: Una fila por 'soccerway_pk' con columnas '<temporada>_<campo>'.
+    """
+    columnas = [f"{temporada}_{campo}" for temporada in temporadas for campo in CAMPOS_TEMPORADA]
+
+    df_panel = df_temporadas[df_temporadas["Temporada"].isin(temporadas)]
+    df_panel = df_panel.drop_duplicates(subset=["soccerway_pk", "Temporada"], keep="first")
+    df_panel = df_panel.set_index(["soccerway_pk", "Temporada"], drop=False)[CAMPOS_TEMPORADA].unstack("Temporada")
+    df_panel.columns = [f"{temporada}_{campo}" for campo, temporada in df_panel.columns]
+
+    return df_panel.reindex(columns=columnas).rename_axis("soccerway_pk").reset_index()
+
+def exportar_panel(df_jugadores, df_temporadas, temporadas=TEMPORADAS_PANEL):
+    """
+    Arma el DataFrame con el formato del panel: una fila por jugador y, después de 'URL',
+    las columnas anchas de las temporadas del panel.
+
+    Parámetros:
+    df_jugadores (pd.DataFrame): Resultado de 'consolidar_fuentes'.
+    df_temporadas (pd.DataFrame): Tabla de temporadas tipada.
+    temporadas (list): Temporadas a mostrar en el panel.
+
+    Retorna:
+    pd.DataFrame: DataFrame listo para escribir en el CSV final.
+    """
+    df_ancho = pivotar_temporadas(df_temporadas, temporadas)
+    columnas_temporada = [col for col in df_ancho.columns if col != "soccerway_pk"]
 
+    df_panel = df_jugadores.merge(df_ancho, on="soccerway_pk", how="left")
 
-# Verificar si hay valores NaN, inf o -inf en el DataFrame
-has_nan = df_consolidado.isna().any().any()
-# Filtrar solo las columnas numéricas
-df_numeric = df_consolidado.select_dtypes(include=[np.number])
+    # Los jugadores sin datos en una temporada quedan en 0, como en el panel original
+    df_panel[columnas_temporada] = df_panel[columnas_temporada].fillna(0)
+    for temporada in temporadas:
+        df_panel[f"{temporada}_Temporada"] = pd.to_numeric(df_panel[f"{temporada}_Temporada"], errors="coerce").fillna(0).astype(int)
+        for campo in CAMPOS_TEMPORADA_ENTEROS:
+            df_panel[f"{temporada}_{campo}"] = df_panel[f"{temporada}_{campo}"].astype(int)
 
-# Verificar si hay valores inf o -inf en las columnas numéricas
-has_inf = np.isinf(df_numeric).any().any()
-print(f"¿Hay valores inf o -inf?: {has_inf}")
+    # Ubicar las columnas de temporada justo después de 'URL'
+    columnas = [col for col in df_jugadores.columns]
+    posicion = columnas.index("URL") + 1 if "URL" in columnas else len(columnas)
+    columnas = columnas[:posicion] + columnas_temporada + columnas[posicion:]
 
-print(f"¿Hay valores NaN?: {has_nan}")
+    return df_panel[columnas]
 
-# Ver qué columnas tienen al menos un NaN en df_consolidado
-columns_with_nan = df_consolidado.columns[df_consolidado.isna().any()].tolist()
-print("columnas con Nan")
-print(columns_with_nan)
 
+# Modo por bloques -------------------------------------------------------------------------
+# Para historiales de varias temporadas: los archivos crudos se leen por bloques, las llaves
+# se normalizan por bloque y cada fuente se reparte en particiones por hash de la llave.
+# Luego se consolida partición por partición, de modo que la memoria usada queda acotada
+# por PRESUPUESTO_MEMORIA_MB y no por el tamaño total del historial.
 
+# Factor aproximado entre la memoria de una fuente y el pico durante los merges
+FACTOR_MEMORIA_MERGE = 4
 
+def columnas_de_archivos(archivos):
+    """
+    Obtiene la unión ordenada de las columnas de varios CSV leyendo solo sus encabezados.
 
-df_consolidado.to_csv(archivo_csv, index=False, encoding="utf-8")
+    Parámetros:
+    archivos (list): Rutas de los archivos CSV.
 
-print(df_consolidado.columns.tolist())
+    Retorna:
+    list: Columnas en el orden en que aparecen por primera vez.
+    """
+    columnas = []
+    for archivo in archivos:
+        for col in pd.read_csv(archivo, nrows=0).columns:
+            if col not in columnas:
+                columnas.append(col)
+    return columnas
+
+def estimar_bytes_por_fila(archivo, muestra=1000):
+    """
+    Estima la memoria en bytes que ocupa una fila del archivo una vez cargada en pandas.
 
+    Parámetros:
+    archivo (str): Ruta del archivo CSV.
+    muestra (int): Cantidad de filas a leer para la estimación.
+
+    Retorna:
+    tuple: (bytes por fila en memoria, bytes por fila en disco).
+    """
+    df_muestra = pd.read_csv(archivo, nrows=muestra)
+    filas = max(len(df_muestra), 1)
+    bytes_memoria = df_muestra.memory_usage(index=False, deep=True).sum() / filas
+
+    # Bytes en disco por fila, para extrapolar el número de filas del archivo completo
+    with open(archivo, "rb") as file:
+        bytes_disco = sum(len(linea) for _, linea in zip(range(filas + 1), file)) / (filas + 1)
+
+    return bytes_memoria, bytes_disco
+
+def calcular_plan_por_bloques(archivos, presupuesto_mb):
+    """
+    Calcula cuántas particiones y cuántas filas por bloque usar para respetar el presupuesto de memoria.
+
+    Parámetros:
+    archivos (list): Rutas de todos los archivos crudos a consolidar.
+    presupuesto_mb (int): Memoria máxima aproximada que puede usar la consolidación.
+
+    Retorna:
+    tuple: (número de particiones, filas por bloque).
+    """
+    presupuesto = presupuesto_mb * 1024 * 1024
+    memoria_total = 0
+    bytes_fila_max = 1
+
+    for archivo in archivos:
+        bytes_memoria, bytes_disco = estimar_bytes_por_fila(archivo)
+        filas_estimadas = os.path.getsize(archivo) / max(bytes_disco, 1)
+        memoria_total += filas_estimadas * bytes_memoria
+        bytes_fila_max = max(bytes_fila_max, bytes_memoria)
+
+    n_particiones = max(1, math.ceil(memoria_total * FACTOR_MEMORIA_MERGE / presupuesto))
+    filas_por_bloque = max(1000, int(presupuesto / (bytes_fila_max * FACTOR_MEMORIA_MERGE)))
+
+    return n_particiones, filas_por_bloque
+
+def escribir_particiones(df, columna_llave, n_particiones, directorio, nombre):
+    """
+    Agrega las filas de un DataFrame a los archivos de partición según el hash de una columna.
+
+    Parámetros:
+    df (pd.DataFrame): Filas a repartir.
+    columna_llave (str): Columna cuyo hash define la partición.
+    n_particiones (int): Número de particiones.
+    directorio (str): Directorio donde se escriben las particiones.
+    nombre (str): Prefijo de los archivos de partición.
+    """
+    hashes = pd.util.hash_pandas_object(df[columna_llave].fillna("").astype(str), index=False).to_numpy()
+    particiones = hashes % n_particiones
+
+    for particion, df_particion in df.groupby(particiones):
+        ruta = os.path.join(directorio, f"{nombre}_{particion}.csv")
+        df_particion.to_csv(ruta, mode="a", header=not os.path.exists(ruta), index=False, encoding="utf-8")
+
+def particionar_fuente(archivos, normalizar, columna_llave, n_particiones, filas_por_bloque, directorio, nombre, archivo_stg, separar=False):
+    """
+    Lee los archivos de una fuente por bloques, normaliza la llave de cada bloque y reparte
+    las filas en archivos de partición según el hash de la llave.
+
+    Parámetros:
+    archivos (list): Rutas de los archivos crudos de la fuente.
+    normalizar (callable): Función que agrega la llave normalizada a un bloque.
+    columna_llave (str): Nombre de la columna llave que agrega 'normalizar'.
+    n_particiones (int): Número de particiones.
+    filas_por_bloque (int): Filas a leer por bloque.
+    directorio (str): Directorio donde se escriben las particiones.
+    nombre (str): Prefijo de los archivos de partición.
+    archivo_stg (str): Archivo de staging donde se acumulan los bloques normalizados.
+    separar (bool): Si es True (soccerway), separa las columnas anchas de temporada en las
+        particiones 'temporadas' y escribe el mapa 'URL' -> llave en las particiones 'mapa_url'.
+
+    Retorna:
+    tuple: (columnas de los archivos de partición, columnas que eran fechas).
+    """
+    archivos_presentes = []
+    for archivo in archivos:
+        if os.path.exists(archivo):
+            archivos_presentes.append(archivo)
+        else:
+            logging.error(f"Error al leer el archivo {archivo}: no existe.")
+
+    columnas_crudas = columnas_de_archivos(archivos_presentes)
+    columnas = None
+    columnas_fecha = []
+
+    if os.path.exists(archivo_stg):
+        os.remove(archivo_stg)
+
+    for archivo in archivos_presentes:
+        filas = 0
+        for bloque in pd.read_csv(archivo, chunksize=filas_por_bloque):
+            # Todas las particiones deben compartir las mismas columnas
+            bloque = normalizar(bloque.reindex(columns=columnas_crudas))
+            if bloque is None:
+                raise ValueError(f"No se pudo normalizar un bloque de {archivo}.")
+
+            if separar:
+                bloque, df_temporadas = separar_temporadas(bloque)
+                escribir_particiones(df_temporadas, "soccerway_pk", n_particiones, directorio, "temporadas")
+                escribir_particiones(bloque[["URL", columna_llave]], "URL", n_particiones, directorio, "mapa_url")
+
+            columnas = bloque.columns.tolist()
+            columnas_fecha = bloque.select_dtypes(include=["datetime"]).columns.tolist()
+            filas += len(bloque)
+
+            bloque.to_csv(archivo_stg, mode="a", header=not os.path.exists(archivo_stg), index=False, encoding="utf-8")
+            escribir_particiones(bloque, columna_llave, n_particiones, directorio, nombre)
+
+        logging.info(f"Archivo {archivo} particionado por bloques con {filas} filas.")
+
+    return columnas, columnas_fecha
+
+def particionar_temporadas(archivos_soccerway, n_particiones, filas_por_bloque, directorio):
+    """
+    Reparte los archivos de temporadas del scraper en las particiones 'temporadas' por llave.
+
+    Como esos archivos vienen identificados por 'URL', primero se particionan por 'URL', se
+    unen partición por partición con el mapa 'URL' -> llave y luego se reparten por llave.
+
+    Parámetros:
+    archivos_soccerway (list): Archivos crudos de soccerway.
+    n_particiones (int): Número de particiones.
+    filas_por_bloque (int): Filas a leer por bloque.
+    directorio (str): Directorio de las particiones.
+    """
+    columnas = ["URL"] + CAMPOS_TEMPORADA
+    hay_temporadas = False
+
+    for archivo in archivos_soccerway:
+        ruta = archivo_temporadas(archivo)
+        if not os.path.exists(ruta):
+            continue
+        hay_temporadas = True
+        for bloque in pd.read_csv(ruta, chunksize=filas_por_bloque):
+            escribir_particiones(bloque.reindex(columns=columnas), "URL", n_particiones, directorio, "temporadas_url")
+
+    if not hay_temporadas:
+        return
+
+    for particion in range(n_particiones):
+        df_temporadas = leer_particion(directorio, "temporadas_url", particion, columnas)
+        if df_temporadas.empty:
+            continue
+        df_mapa = leer_particion(directorio, "mapa_url", particion, ["URL", "soccerway_pk"])
+        escribir_particiones(asignar_llave_temporadas(df_temporadas, df_mapa), "soccerway_pk", n_particiones, directorio, "temporadas")
+
+def leer_particion(directorio, nombre, particion, columnas, columnas_fecha=None):
+    """
+    Lee un archivo de partición. Si la partición quedó vacía devuelve un DataFrame sin filas.
+
+    Parámetros:
+    directorio (str): Directorio de las particiones.
+    nombre (str): Prefijo de los archivos de partición.
+    particion (int): Número de partición.
+    columnas (list): Columnas esperadas de la partición.
+    columnas_fecha (list): Columnas a leer como fecha.
+
+    Retorna:
+    pd.DataFrame: Filas de la partición.
+    """
+    ruta = os.path.join(directorio, f"{nombre}_{particion}.csv")
+    if not os.path.exists(ruta):
+        return pd.DataFrame(columns=columnas)
+
+    df = pd.read_csv(ruta)
+    # Las fechas se escriben como texto ISO en la partición, se vuelven a convertir
+    for col in columnas_fecha or []:
+        df[col] = pd.to_datetime(df[col], errors="coerce")
+    return df
+
+def consolidar_por_bloques(archivos_soccerway, archivos_transfermarkt, archivos_besoccer, archivo_salida, presupuesto_mb):
+    """
+    Consolida las tres fuentes sin cargarlas completas en memoria: las particiona por hash de
+    la llave y une partición por partición, escribiendo el resultado de forma incremental.
+
+    Parámetros:
+    archivos_soccerway (list): Archivos crudos de soccerway.
+    archivos_transfermarkt (list): Archivos crudos de transfermarkt.
+    archivos_besoccer (list): Archivos crudos de besoccer.
+    archivo_salida (str): Archivo CSV consolidado.
+    presupuesto_mb (int): Memoria máxima aproximada a usar.
+
+    Retorna:
+    int: Número de filas escritas en el archivo consolidado.
+    """
+    todos = [a for a in archivos_soccerway + archivos_transfermarkt + archivos_besoccer if os.path.exists(a)]
+    n_particiones, filas_por_bloque = calcular_plan_por_bloques(todos, presupuesto_mb)
+    logging.info(f"Modo por bloques: {n_particiones} particiones, {filas_por_bloque} filas por bloque, presupuesto {presupuesto_mb} MB.")
+
+    directorio = tempfile.mkdtemp(prefix="particiones_")
+    filas_escritas = 0
+    resultados = []
+    con_almacen = almacen_panel.abrir_carga()
+    cruces = {}
+    columnas_temporadas = ["soccerway_pk", "URL"] + CAMPOS_TEMPORADA
+
+    try:
+        # El tiempo de cada partición incluye el de la normalización de sus bloques (fechas_*, llave_*, ...)
+        with perfilado.etapa("particionar_soccerway"):
+            columnas_soccerway, fechas_soccerway = particionar_fuente(archivos_soccerway, normalizar_soccerway, "soccerway_pk", n_particiones, filas_por_bloque, directorio, "soccerway", "stg_soccerway.csv", separar=True)
+        with perfilado.etapa("particionar_transfermarkt"):
+            columnas_tmkt, fechas_tmkt = particionar_fuente(archivos_transfermarkt, normalizar_transfermarkt, "tmkt_pk", n_particiones, filas_por_bloque, directorio, "tmkt", "stg_tmkt.csv")
+        with perfilado.etapa("particionar_besoccer"):
+            columnas_besoccer, fechas_besoccer = particionar_fuente(archivos_besoccer, normalizar_besoccer, "besoccer_pk", n_particiones, filas_por_bloque, directorio, "besoccer", "stg_besoccer.csv")
+        with perfilado.etapa("particionar_temporadas"):
+            particionar_temporadas(archivos_soccerway, n_particiones, filas_por_bloque, directorio)
+
+        for archivo in [archivo_salida, "stg_temporadas.csv"]:
+            if os.path.exists(archivo):
+                os.remove(archivo)
+
+        for particion in range(n_particiones):
+            with perfilado.etapa("carga_particiones") as medicion:
+                df_soccerway = leer_particion(directorio, "soccerway", particion, columnas_soccerway, fechas_soccerway)
+                if df_soccerway.empty:
+                    continue
+                df_transfermarkt = leer_particion(directorio, "tmkt", particion, columnas_tmkt, fechas_tmkt)
+                df_besoccer = leer_particion(directorio, "besoccer", particion, columnas_besoccer, fechas_besoccer)
+                medicion.filas_salida = len(df_soccerway) + len(df_transfermarkt) + len(df_besoccer)
+
+            with perfilado.etapa("temporadas") as medicion:
+                df_temporadas = medicion.salida(tipar_temporadas(leer_particion(directorio, "temporadas", particion, columnas_temporadas)))
+            with perfilado.etapa("escritura_stg", df_temporadas):
+                df_temporadas.to_csv("stg_temporadas.csv", mode="a", header=not os.path.exists("stg_temporadas.csv"), index=False, encoding="utf-8")
+
+            # Como cada llave cae en una sola partición, los cruces se pueden sumar entre particiones
+            df_jugadores, cruces_particion = consolidar_fuentes(df_soccerway, df_transfermarkt, df_besoccer)
+            validacion.sumar_cruces(cruces, cruces_particion)
+            with perfilado.etapa("exportar_panel", df_jugadores) as medicion:
+                df_consolidado = medicion.salida(exportar_panel(df_jugadores, df_temporadas))
+            with perfilado.etapa("validacion", df_consolidado):
+                resultados.append(validacion.validar(df_consolidado))
+            with perfilado.etapa("escritura_panel", df_consolidado):
+                df_consolidado.to_csv(archivo_salida, mode="a", header=filas_escritas == 0, index=False, encoding="utf-8")
+            with perfilado.etapa("almacen", df_consolidado):
+                almacen_panel.agregar_a_carga(con_almacen, df_consolidado, df_temporadas)
+            filas_escritas += len(df_consolidado)
+
+            logging.info(f"Partición {particion + 1}/{n_particiones} consolidada con {len(df_consolidado)} filas.")
+    except Exception:
+        con_almacen.close()
+        raise
+    finally:
+        shutil.rmtree(directorio, ignore_errors=True)
+
+    logging.info(f"Archivo {archivo_salida} escrito por bloques con {filas_escritas} filas.")
+    reporte = validacion.escribir_reporte(validacion.combinar_resultados(resultados), validacion.evaluar_tasas_cruce(cruces), archivo_salida)
+    perfilado.registrar_dato("tasas_cruce", reporte["tasas_cruce"])
+    with perfilado.etapa("almacen"):
+        almacen_panel.cerrar_carga(con_almacen, publicar=reporte["valido"])
+    return filas_escritas
+
+
+
+# Activar para consolidar historiales grandes sin cargarlos completos en memoria
+MODO_POR_BLOQUES = False
+PRESUPUESTO_MEMORIA_MB = 512
+
+def consolidar_en_memoria(archivos_soccerway, archivos_transfermarkt, archivos_besoccer, archivo_salida):
+    """
+    Consolida las tres fuentes cargándolas completas en memoria y escribe el panel, los
+    archivos stg_*, el reporte de validación y el almacén local.
+
+    Parámetros:
+    archivos_soccerway (list): Archivos crudos de soccerway.
+    archivos_transfermarkt (list): Archivos crudos de transfermarkt.
+    archivos_besoccer (list): Archivos crudos de besoccer.
+    archivo_salida (str): Archivo CSV consolidado.
+
+    Retorna:
+    pd.DataFrame: El panel consolidado.
+    """
+    # Soccerway -------------------------------------------------------------------------
+
+    # Leemos archivos de soccerway y los unimos
+
+    #Aplicamos transformaciones
+    with perfilado.etapa("carga_soccerway") as medicion:
+        lista_df_soccerway = [leer_csv(archivo) for archivo in archivos_soccerway]
+        df_soccerway = medicion.salida(pd.concat(lista_df_soccerway, ignore_index=True))
+    df_soccerway = normalizar_soccerway(df_soccerway)
+    with perfilado.etapa("separar_temporadas", df_soccerway) as medicion:
+        df_soccerway, df_temporadas = separar_temporadas(df_soccerway)
+        medicion.salida(df_temporadas)
+    archivo_soccerway = "stg_soccerway.csv"
+    with perfilado.etapa("escritura_stg", df_soccerway):
+        df_soccerway.to_csv(archivo_soccerway, index=False, encoding="utf-8")
+
+    # Transfermarkt -------------------------------------------------------------------------
+
+    # Leemos archivos transfermarkt
+
+    #Aplicamos transformaciones
+    with perfilado.etapa("carga_transfermarkt") as medicion:
+        lista_df_transfermarkt = [leer_csv(archivo) for archivo in archivos_transfermarkt]
+        df_transfermarkt = medicion.salida(pd.concat(lista_df_transfermarkt, ignore_index=True))
+    df_transfermarkt = normalizar_transfermarkt(df_transfermarkt)
+    archivo_tmkt = "stg_tmkt.csv"
+    with perfilado.etapa("escritura_stg", df_transfermarkt):
+        df_transfermarkt.to_csv(archivo_tmkt, index=False, encoding="utf-8")
+
+
+    # Besoccer -------------------------------------------------------------------------
+
+
+    with perfilado.etapa("carga_besoccer") as medicion:
+        lista_df_besoccer = [leer_csv(archivo) for archivo in archivos_besoccer]
+        df_besoccer = medicion.salida(pd.concat(lista_df_besoccer, ignore_index=True))
+    df_besoccer = normalizar_besoccer(df_besoccer)
+    archivo_besoccer = "stg_besoccer.csv"
+    with perfilado.etapa("escritura_stg", df_besoccer):
+        df_besoccer.to_csv(archivo_besoccer, index=False, encoding="utf-8")
+
+
+    # Temporadas -------------------------------------------------------------------------
+
+    # Se suman las temporadas de los archivos del scraper a las de las columnas anchas antiguas
+    with perfilado.etapa("temporadas") as medicion:
+        df_temporadas = pd.concat([df_temporadas, leer_temporadas(archivos_soccerway, df_soccerway)], ignore_index=True)
+        df_temporadas = medicion.salida(tipar_temporadas(df_temporadas))
+    archivo_temporadas_stg = "stg_temporadas.csv"
+    with perfilado.etapa("escritura_stg", df_temporadas):
+        df_temporadas.to_csv(archivo_temporadas_stg, index=False, encoding="utf-8")
+
+
+    df_jugadores, cruces = consolidar_fuentes(df_soccerway, df_transfermarkt, df_besoccer)
+    with perfilado.etapa("exportar_panel", df_jugadores) as medicion:
+        df_consolidado = medicion.salida(exportar_panel(df_jugadores, df_temporadas))
+
+    # Validar tipos, rangos, nulos, unicidad y cruces en una sola pasada; update_gsheet_service.py
+    # no publica el CSV si el reporte no es válido
+    with perfilado.etapa("validacion", df_consolidado):
+        resultado = validacion.validar(df_consolidado)
+
+    with perfilado.etapa("escritura_panel", df_consolidado):
+        df_consolidado.to_csv(archivo_salida, index=False, encoding="utf-8")
+    reporte = validacion.escribir_reporte(resultado, validacion.evaluar_tasas_cruce(cruces), archivo_salida)
+    perfilado.registrar_dato("tasas_cruce", reporte["tasas_cruce"])
+
+    # Copia consultable e indexada del panel (almacen_panel.py); solo se publica si pasó la validación
+    with perfilado.etapa("almacen", df_consolidado):
+        almacen_panel.publicar_panel(df_consolidado, df_temporadas, publicar=reporte["valido"])
+
+    return df_consolidado
+
+def ejecutar(archivos_soccerway=None, archivos_transfermarkt=None, archivos_besoccer=None, archivo_salida=archivo_csv, por_bloques=MODO_POR_BLOQUES, presupuesto_mb=PRESUPUESTO_MEMORIA_MB, cprofile=False, memoria_python=perfilado.MEDIR_MEMORIA_PYTHON):
+    """
+    Ejecuta la limpieza y consolidación completa.
+
+    Parámetros:
+    archivos_soccerway (list): Archivos crudos de soccerway; por defecto 'archivos_ligas_soccerway'.
+    archivos_transfermarkt (list): Archivos crudos de transfermarkt; por defecto 'archivos_ligas_transfermarkt'.
+    archivos_besoccer (list): Archivos crudos de besoccer; por defecto 'archivos_ligas_besoccer'.
+    archivo_salida (str): Archivo CSV consolidado.
+    por_bloques (bool): Consolidar sin cargar las fuentes completas en memoria.
+    presupuesto_mb (int): Memoria máxima aproximada del modo por bloques.
+    cprofile (bool): Guardar además un perfil de cProfile en '<archivo_salida>.prof'.
+    memoria_python (bool): Medir el pico de memoria de cada etapa con tracemalloc (más lento).
+
+    Retorna:
+    bool: True si el panel pasó la validación.
+    """
+    archivos_soccerway = archivos_soccerway or archivos_ligas_soccerway
+    archivos_transfermarkt = archivos_transfermarkt or archivos_ligas_transfermarkt
+    archivos_besoccer = archivos_besoccer or archivos_ligas_besoccer
+
+    # Tiempo, memoria y filas de cada etapa en '<archivo_salida>.perfil.json' (perfilado.py)
+    perfilado.iniciar(memoria_python=memoria_python, cprofile=cprofile)
+    perfilado.registrar_dato("modo", "por_bloques" if por_bloques else "en_memoria")
+    try:
+        if por_bloques:
+            consolidar_por_bloques(archivos_soccerway, archivos_transfermarkt, archivos_besoccer, archivo_salida, presupuesto_mb)
+        else:
+            df_consolidado = consolidar_en_memoria(archivos_soccerway, archivos_transfermarkt, archivos_besoccer, archivo_salida)
+            logging.debug(f"Columnas del panel: {df_consolidado.columns.tolist()}")
+
+        valido = validacion.verificar_reporte(archivo_salida)[0]
+
+        # Índice de jugadores similares (similares.py) y versión nueva del historial (historial_panel.py),
+        # solo con un panel válido
+        if valido:
+            with perfilado.etapa("similares"):
+                similares.actualizar_desde_csv(archivo_salida)
+            with perfilado.etapa("historial"):
+                historial_panel.registrar_desde_csv(archivo_salida)
+    finally:
+        perfilado.terminar(perfilado.archivo_reporte(archivo_salida), perfilado.archivo_cprofile(archivo_salida) if cprofile else None)
+    return valido
+
+
+if __name__ == "__main__":
+    # Configurar logging (consola y app.log)
+    registro.configurar("app.log")
+
+    ejecutar()
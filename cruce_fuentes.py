@@ -0,0 +1,158 @@
+import logging
+
+import numpy as np
+import pandas as pd
+
+import perfilado
+
+# Unión de las tres fuentes por llave. Antes se hacían dos merge 'left' sobre las llaves de
+# texto y recién después se quitaban los 'soccerway_pk' repetidos: una llave repetida en
+# ambos lados multiplicaba las filas intermedias antes de descartarlas. Ahora:
+# 1. Cada fuente se deja con una fila por llave antes de unir, según la regla de DESEMPATE.
+# 2. Las llaves se reemplazan por su hash de 64 bits y el cruce se hace con un índice de
+#    hashes (un solo 'reindex'), sin comparar textos largos.
+# 3. Se verifica la cardinalidad (cada jugador cruza con a lo más una fila de la otra fuente)
+#    y se informan, por fuente, las filas repetidas descartadas, los jugadores sin cruce y las
+#    llaves de la fuente que no cruzan con ningún jugador.
+# La memoria y el tiempo quedan proporcionales al tamaño de las fuentes.
+
+# Regla para elegir la fila de una llave repetida en cada fuente:
+# - "primera": la primera que aparece (comportamiento anterior).
+# - "ultima": la última, que en los archivos crudos suele ser la extracción más reciente.
+# - "mas_completa": la que tiene más columnas con dato; a igual cantidad, la primera.
+DESEMPATE = {"soccerway": "primera", "transfermarkt": "primera", "besoccer": "primera"}
+
+# Llave de cada fuente
+LLAVES = {"soccerway": "soccerway_pk", "transfermarkt": "tmkt_pk", "besoccer": "besoccer_pk"}
+
+def hash_llaves(serie):
+    """
+    Convierte las llaves de texto a enteros de 64 bits.
+
+    Parámetros:
+    serie (pd.Series): Llaves.
+
+    Retorna:
+    np.ndarray: Hash (uint64) de cada llave.
+    """
+    return pd.util.hash_pandas_object(serie.fillna("").astype(str), index=False).to_numpy()
+
+def deduplicar(df, columna_llave, regla="primera"):
+    """
+    Deja una fila por llave según la regla de desempate.
+
+    Parámetros:
+    df (pd.DataFrame): Datos de una fuente.
+    columna_llave (str): Columna de la llave.
+    regla (str): "primera", "ultima" o "mas_completa".
+
+    Retorna:
+    tuple: (DataFrame con una fila por llave en el orden original, filas descartadas).
+    """
+    # Se trabaja por posición y no por etiqueta: el índice puede tener etiquetas repetidas
+    # (por ejemplo, después de concatenar archivos sin ignore_index)
+    if regla == "primera":
+        repetidas = df.duplicated(subset=columna_llave, keep="first").to_numpy()
+    elif regla == "ultima":
+        repetidas = df.duplicated(subset=columna_llave, keep="last").to_numpy()
+    elif regla == "mas_completa":
+        orden = np.argsort(-df.notna().sum(axis=1).to_numpy(), kind="stable")
+        repetidas = np.empty(len(df), dtype=bool)
+        repetidas[orden] = df.iloc[orden].duplicated(subset=columna_llave, keep="first").to_numpy()
+    else:
+        raise ValueError(f"Regla de desempate no reconocida: {regla}")
+
+    descartadas = int(repetidas.sum())
+    return (df[~repetidas] if descartadas else df), descartadas
+
+def unir_izquierda(df_izquierda, df_derecha, llave_izquierda, llave_derecha, sufijos=("_x", "_y")):
+    """
+    Une dos DataFrame como pd.merge(how="left") cruzando por el hash de las llaves. La llave
+    de la derecha debe ser única (se verifica; ver 'deduplicar').
+
+    Parámetros:
+    df_izquierda (pd.DataFrame): Filas que se conservan todas, en su orden.
+    df_derecha (pd.DataFrame): Filas a agregar, una por llave.
+    llave_izquierda (str): Columna de la llave a la izquierda.
+    llave_derecha (str): Columna de la llave a la derecha.
+    sufijos (tuple): Sufijos de las columnas repetidas, como en pd.merge.
+
+    Retorna:
+    tuple: (DataFrame unido con índice 0..n-1, {"cruzados", "huerfanas"}).
+    """
+    hashes_derecha = pd.Index(hash_llaves(df_derecha[llave_derecha]))
+    if hashes_derecha.has_duplicates:
+        if df_derecha[llave_derecha].duplicated().any():
+            raise ValueError(f"La llave '{llave_derecha}' no es única: el cruce no sería de muchos a uno.")
+        # Dos llaves distintas con el mismo hash (muy improbable): se cruza por el texto
+        logging.warning(f"Colisión de hash en '{llave_derecha}'; se cruza por el texto de la llave.")
+        hashes_derecha = pd.Index(df_derecha[llave_derecha].fillna("").astype(str))
+        hashes_izquierda = df_izquierda[llave_izquierda].fillna("").astype(str).to_numpy()
+    else:
+        hashes_izquierda = hash_llaves(df_izquierda[llave_izquierda])
+
+    posiciones = hashes_derecha.get_indexer(hashes_izquierda)
+    cruzadas = posiciones >= 0
+
+    # Las filas sin cruce quedan vacías, igual que en el merge
+    df_alineado = df_derecha.set_axis(range(len(df_derecha))).reindex(posiciones)
+
+    comunes = set(df_izquierda.columns) & set(df_derecha.columns)
+    izquierda = df_izquierda.rename(columns={col: f"{col}{sufijos[0]}" for col in comunes}).reset_index(drop=True)
+    derecha = df_alineado.rename(columns={col: f"{col}{sufijos[1]}" for col in comunes}).reset_index(drop=True)
+    df_unido = pd.concat([izquierda, derecha], axis=1)
+
+    conteo = {
+        "cruzados": int(cruzadas.sum()),
+        "huerfanas": int(len(df_derecha) - pd.unique(posiciones[cruzadas]).size),
+    }
+    return df_unido, conteo
+
+def unir_fuentes(df_soccerway, df_transfermarkt, df_besoccer, desempate=None):
+    """
+    Deja una fila por llave en cada fuente y une transfermarkt y besoccer a soccerway.
+
+    Parámetros:
+    df_soccerway (pd.DataFrame): Datos normalizados de soccerway.
+    df_transfermarkt (pd.DataFrame): Datos normalizados de transfermarkt.
+    df_besoccer (pd.DataFrame): Datos normalizados de besoccer.
+    desempate (dict): Fuente -> regla de desempate; por defecto DESEMPATE.
+
+    Retorna:
+    tuple: (DataFrame unido, una fila por 'soccerway_pk'; cruces por fuente). Los cruces de
+    transfermarkt y besoccer tienen "cruzados" (jugadores de soccerway con una fila de la
+    fuente) y "total" (jugadores de soccerway), con los que validacion.evaluar_tasas_cruce
+    calcula la tasa, "sin_cruce", "huerfanas" (llaves de la fuente que no cruzan con ningún
+    jugador) y "duplicadas" (filas repetidas descartadas de la fuente).
+    """
+    desempate = {**DESEMPATE, **(desempate or {})}
+
+    with perfilado.etapa("duplicados_soccerway", df_soccerway) as medicion:
+        df_unido, duplicadas_soccerway = deduplicar(df_soccerway.dropna(subset=[LLAVES["soccerway"]]), LLAVES["soccerway"], desempate["soccerway"])
+        medicion.salida(df_unido)
+    total = len(df_unido)
+    if duplicadas_soccerway:
+        logging.info(f"soccerway: {duplicadas_soccerway} filas con 'soccerway_pk' repetido descartadas ({desempate['soccerway']}).")
+
+    cruces = {}
+    for fuente, df_fuente in (("transfermarkt", df_transfermarkt), ("besoccer", df_besoccer)):
+        llave = LLAVES[fuente]
+        with perfilado.etapa(f"duplicados_{fuente}", df_fuente) as medicion:
+            df_fuente, duplicadas = deduplicar(df_fuente.dropna(subset=[llave]), llave, desempate[fuente])
+            medicion.salida(df_fuente)
+        with perfilado.etapa(f"cruce_{fuente}", [df_unido, df_fuente]) as medicion:
+            df_unido, conteo = unir_izquierda(df_unido, df_fuente, LLAVES["soccerway"], llave)
+            medicion.salida(df_unido)
+        cruces[fuente] = {
+            "cruzados": conteo["cruzados"],
+            "total": total,
+            "sin_cruce": total - conteo["cruzados"],
+            "huerfanas": conteo["huerfanas"],
+            "duplicadas": duplicadas,
+        }
+        logging.info(
+            f"Cruce con {fuente}: {conteo['cruzados']}/{total} jugadores, {conteo['huerfanas']} llaves de {fuente} sin jugador, "
+            f"{duplicadas} filas repetidas descartadas ({desempate[fuente]})."
+        )
+
+    return df_unido, cruces
@@ -0,0 +1,193 @@
+import csv
+import logging
+import os
+import random
+import sys
+
+import registro
+from archivos_ligas import archivos_ligas_soccerway, archivos_ligas_transfermarkt, archivos_ligas_besoccer, CAMPOS_TEMPORADA, archivo_temporadas
+
+# Generador de archivos crudos sintéticos de Soccerway, Transfermarkt y BeSoccer para medir la
+# limpieza con más ligas de las que hay hoy (benchmark_clean.py). Los archivos tienen los
+# mismos nombres y columnas que escriben los scrapers y los mismos formatos desordenados:
+# fechas "8 septiembre 1993" / "11/03/1995 (29)" / "Nacido el 8 septiembre 1993 en ...",
+# nombres con y sin tildes o con espacios de más según la fuente, valores "1,20 mill. €",
+# alturas "1,87 m", "Sin información", filas repetidas, etc.
+#
+# La escala 1 tiene JUGADORES_BASE jugadores, como clean_data_final_4.csv; la escala 10 y
+# la 100 repiten las ligas con más jugadores por liga.
+
+JUGADORES_BASE = 2851
+
+# Fracción de los jugadores de soccerway que aparece en cada una de las otras fuentes
+SOLAPE = {"transfermarkt": 0.5, "besoccer": 0.35}
+
+# Fracción de filas que se repiten en cada fuente (extracciones acumuladas)
+FRACCION_REPETIDAS = 0.01
+
+MESES = [
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
+]
+NOMBRES = [
+    "José", "Matías", "Sebastián", "Nicolás", "Benjamín", "Agustín", "Martín", "Joaquín",
+    "Tomás", "Ángel", "Iván", "Cristóbal", "Lucas", "Bastián", "Facundo", "Germán",
+]
+APELLIDOS = [
+    "González", "Muñoz", "Rodríguez", "Pérez", "Díaz", "Núñez", "Castellón", "Ríos",
+    "Fernández", "López", "Martínez", "Sánchez", "Gómez", "Toselli", "Zaldivia", "Aránguiz",
+]
+NACIONALIDADES = ["Chile", "Argentina", "Uruguay", "Colombia", "Perú"]
+POSICIONES = ["Portero", "Defensa", "Centrocampista", "Delantero"]
+POSICIONES_TMKT = ["Portero", "Defensa central", "Lateral derecho", "Pivote", "Mediocentro ofensivo", "Extremo izquierdo", "Delantero centro"]
+LIGAS = ["PRD", "PRB", "SED", "PBM", "PRC", "TFA", "TFA", "TFA", "TFA"]
+ATRIBUTOS = ["Ritmo", "Tiro", "Pase", "Regate", "Defensa", "Físico", "Salto", "Estirada", "Paradas", "Saques", "Colocación", "Reflejos"]
+
+COLUMNAS_SOCCERWAY = [
+    "Nombre", "Apellidos", "Nacionalidad", "Fecha de nacimiento", "Edad", "País de nacimiento",
+    "Posición", "Altura", "Peso", "Pie", "Equipo", "Temporada", "URL"
+]
+COLUMNAS_TRANSFERMARKT = [
+    "Nombre Jugador", "Fecha Nacimiento", "Posicion", "Posicion Secundaria", "Equipo", "Link Jugador",
+    "Valor de Mercado", "Nacionalidad", "Pie", "Agente", "Fichado", "Contrato Hasta"
+]
+COLUMNAS_BESOCCER = ["Nombre completo", "Nacionalidad", "Edad", "ELO", "birth_date"] + ATRIBUTOS
+
+def sin_tildes(texto):
+    return texto.translate(str.maketrans("áéíóúÁÉÍÓÚ", "aeiouAEIOU"))
+
+def crear_jugadores(cantidad, azar):
+    """
+    Crea los jugadores base, cada uno con una combinación única de nombre, nacionalidad y fecha.
+
+    Parámetros:
+    cantidad (int): Número de jugadores.
+    azar (random.Random): Generador de números aleatorios.
+
+    Retorna:
+    list: Jugadores (dict).
+    """
+    jugadores = []
+    for numero in range(cantidad):
+        anio = azar.randint(1984, 2008)
+        jugadores.append({
+            "id": numero,
+            # El número asegura llaves distintas aunque se repitan nombre y fecha
+            "nombre": f"{azar.choice(NOMBRES)} {azar.choice(NOMBRES)}",
+            "apellidos": f"{azar.choice(APELLIDOS)} {azar.choice(APELLIDOS)}{numero}",
+            "nacionalidad": azar.choice(NACIONALIDADES),
+            "dia": azar.randint(1, 28),
+            "mes": azar.randint(1, 12),
+            "anio": anio,
+            "edad": 2025 - anio,
+            "posicion": azar.choice(POSICIONES),
+        })
+    return jugadores
+
+def valor_mercado(azar):
+    valor = azar.choice([0, 50, 150, 300, 450, 800, 1200, 2500])
+    if valor == 0:
+        return azar.choice(["-", "Sin valor", ""])
+    if valor >= 1000:
+        return f"{valor / 1000:.2f}".replace(".", ",") + " mill. €"
+    return f"{valor} mil €"
+
+def escribir_csv(archivo, columnas, filas):
+    with open(archivo, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(columnas)
+        writer.writerows(filas)
+
+def filas_con_repetidas(filas, azar):
+    repetidas = [fila for fila in filas if azar.random() < FRACCION_REPETIDAS]
+    return filas + repetidas
+
+def generar(directorio, escala=1, solape=None, semilla=0):
+    """
+    Escribe los archivos crudos sintéticos de las tres fuentes.
+
+    Parámetros:
+    directorio (str): Directorio de salida (se crea si no existe).
+    escala (float): Tamaño relativo a JUGADORES_BASE jugadores.
+    solape (dict): Fuente -> fracción de jugadores de soccerway que aparece en ella; por defecto SOLAPE.
+    semilla (int): Semilla, para generar siempre los mismos datos.
+
+    Retorna:
+    dict: {"soccerway": [...], "transfermarkt": [...], "besoccer": [...]} con las rutas escritas.
+    """
+    solape = {**SOLAPE, **(solape or {})}
+    azar = random.Random(semilla)
+    os.makedirs(directorio, exist_ok=True)
+
+    jugadores = crear_jugadores(int(JUGADORES_BASE * escala), azar)
+    por_liga = [jugadores[indice::len(archivos_ligas_soccerway)] for indice in range(len(archivos_ligas_soccerway))]
+    archivos = {"soccerway": [], "transfermarkt": [], "besoccer": []}
+
+    # Soccerway: un archivo de jugadores y uno de temporadas por liga
+    for indice, (archivo, liga) in enumerate(zip(archivos_ligas_soccerway, LIGAS)):
+        filas, temporadas = [], []
+        for jugador in por_liga[indice]:
+            url = f"https://es.soccerway.com/players/jugador-{jugador['id']}/{jugador['id']}/"
+            filas.append([
+                jugador["nombre"], jugador["apellidos"], jugador["nacionalidad"],
+                f"{jugador['dia']} {MESES[jugador['mes'] - 1]} {jugador['anio']}", jugador["edad"], jugador["nacionalidad"],
+                jugador["posicion"], azar.choice(["187 cm", "1,80 m", "175 cm", "Sin información"]),
+                azar.choice(["80 kg", "72 kg", "Sin información"]), azar.choice(["Derecho", "Izquierdo", "Sin información"]),
+                f"Equipo {indice}-{jugador['id'] % 16}", "2025", url,
+            ])
+            for temporada in ("2025", "2024"):
+                minutos = azar.choice([0, 90, 450, 1200, 2700])
+                temporadas.append([
+                    url, temporada, f"Equipo {indice}-{jugador['id'] % 16}", liga, minutos, minutos // 90, minutos // 90,
+                    azar.randint(0, 5), azar.randint(0, 5), azar.randint(0, 10), azar.randint(0, 12), azar.randint(0, 8), 0, azar.randint(0, 1),
+                ])
+        ruta = os.path.join(directorio, archivo)
+        escribir_csv(ruta, COLUMNAS_SOCCERWAY, filas_con_repetidas(filas, azar))
+        escribir_csv(archivo_temporadas(ruta), ["URL"] + CAMPOS_TEMPORADA, temporadas)
+        archivos["soccerway"].append(ruta)
+
+    # Transfermarkt y BeSoccer: cada jugador aparece con probabilidad 'solape' en uno de sus archivos
+    for fuente, lista in (("transfermarkt", archivos_ligas_transfermarkt), ("besoccer", archivos_ligas_besoccer)):
+        filas_por_archivo = [[] for _ in lista]
+        for jugador in jugadores:
+            if azar.random() >= solape[fuente]:
+                continue
+            nombre = f"{jugador['nombre']} {jugador['apellidos']}"
+            # Algunas filas llegan sin tildes o con espacios de más
+            if azar.random() < 0.2:
+                nombre = sin_tildes(nombre)
+            if azar.random() < 0.05:
+                nombre = f" {nombre}  "
+            destino = filas_por_archivo[jugador["id"] % len(lista)]
+            if fuente == "transfermarkt":
+                destino.append([
+                    nombre, f"{jugador['dia']:02d}/{jugador['mes']:02d}/{jugador['anio']} ({jugador['edad']})",
+                    azar.choice(POSICIONES_TMKT), azar.choice(POSICIONES_TMKT), f"Club {jugador['id'] % 40}",
+                    f"https://www.transfermarkt.es/jugador/profil/spieler/{jugador['id']}", valor_mercado(azar),
+                    jugador["nacionalidad"], azar.choice(["derecho", "izquierdo", "-"]), azar.choice(["Vibra Futbol", "Sin agente", "-"]),
+                    azar.choice(["01/01/2025", "15/07/2024", "-"]), azar.choice(["31/12/2025", "31/12/2026", "-"]),
+                ])
+            else:
+                destino.append([
+                    nombre, jugador["nacionalidad"], jugador["edad"], azar.randint(40, 85),
+                    f"Nacido el {jugador['dia']} {MESES[jugador['mes'] - 1]} {jugador['anio']} en Santiago",
+                ] + [azar.choice([str(azar.randint(30, 90)), "Desconocido", "?"]) for _ in ATRIBUTOS])
+
+        columnas = COLUMNAS_TRANSFERMARKT if fuente == "transfermarkt" else COLUMNAS_BESOCCER
+        for archivo, filas in zip(lista, filas_por_archivo):
+            ruta = os.path.join(directorio, archivo)
+            escribir_csv(ruta, columnas, filas_con_repetidas(filas, azar))
+            archivos[fuente].append(ruta)
+
+    logging.info(f"Datos sintéticos escala {escala} ({len(jugadores)} jugadores) escritos en {directorio}.")
+    return archivos
+
+
+if __name__ == "__main__":
+    registro.configurar(archivo=None)
+
+    if len(sys.argv) not in (2, 3):
+        print("Uso: python datos_sinteticos.py <directorio> [escala]")
+        sys.exit(1)
+
+    generar(sys.argv[1], float(sys.argv[2]) if len(sys.argv) == 3 else 1)
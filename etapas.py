@@ -0,0 +1,205 @@
+import hashlib
+import json
+import logging
+import os
+
+# Ejecución por etapas (extracción -> limpieza -> publicación) con caché por contenido. Cada
+# etapa declara sus archivos de entrada, sus salidas, sus parámetros y de qué etapas depende.
+# Antes de ejecutarla se calcula una huella con el hash de las entradas y los parámetros; si
+# coincide con la de la última ejecución correcta y las salidas siguen intactas, se omite.
+#
+# Para que un refresco sin cambios sea casi instantáneo, el hash de cada archivo se guarda
+# junto con su tamaño y fecha de modificación, y solo se vuelve a leer el archivo si cambiaron.
+
+ARCHIVO_ESTADO = ".etlconcon_estado.json"
+
+def nueva_etapa(nombre, funcion, entradas=(), salidas=(), parametros=None, depende=(), siempre=False):
+    """
+    Define una etapa del proceso.
+
+    Parámetros:
+    nombre (str): Nombre único de la etapa.
+    funcion (callable): Función sin argumentos que ejecuta la etapa; retorna True si fue correcta.
+    entradas (list): Archivos que lee (incluido su código, para que un cambio la vuelva a ejecutar).
+    salidas (list): Archivos que escribe.
+    parametros (dict): Opciones que cambian su resultado.
+    depende (list): Etapas que deben ejecutarse antes.
+    siempre (bool): Ejecutarla siempre (por ejemplo, la extracción, cuyas entradas son remotas).
+
+    Retorna:
+    dict: La etapa.
+    """
+    return {
+        "nombre": nombre,
+        "funcion": funcion,
+        "entradas": list(entradas),
+        "salidas": list(salidas),
+        "parametros": parametros or {},
+        "depende": list(depende),
+        "siempre": siempre,
+    }
+
+def cargar_estado(archivo=ARCHIVO_ESTADO):
+    """
+    Carga el estado de la última ejecución.
+
+    Parámetros:
+    archivo (str): Archivo JSON de estado.
+
+    Retorna:
+    dict: {"archivos": {...}, "etapas": {...}}.
+    """
+    try:
+        with open(archivo, encoding="utf-8") as file:
+            estado = json.load(file)
+    except (OSError, ValueError):
+        estado = {}
+    estado.setdefault("archivos", {})
+    estado.setdefault("etapas", {})
+    return estado
+
+def guardar_estado(estado, archivo=ARCHIVO_ESTADO):
+    """
+    Guarda el estado de forma atómica.
+
+    Parámetros:
+    estado (dict): Estado a guardar.
+    archivo (str): Archivo JSON de estado.
+    """
+    temporal = archivo + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as file:
+        json.dump(estado, file, ensure_ascii=False, indent=1)
+    os.replace(temporal, archivo)
+
+def hash_archivo(ruta, estado):
+    """
+    Calcula el hash SHA-256 de un archivo, reutilizando el guardado si su tamaño y fecha de
+    modificación no cambiaron.
+
+    Parámetros:
+    ruta (str): Archivo.
+    estado (dict): Estado con la caché de hashes (se actualiza).
+
+    Retorna:
+    str: Hash en hexadecimal, o None si el archivo no existe.
+    """
+    try:
+        info = os.stat(ruta)
+    except FileNotFoundError:
+        estado["archivos"].pop(ruta, None)
+        return None
+
+    guardado = estado["archivos"].get(ruta)
+    if guardado and guardado["tamano"] == info.st_size and guardado["mtime_ns"] == info.st_mtime_ns:
+        return guardado["sha256"]
+
+    sha = hashlib.sha256()
+    with open(ruta, "rb") as file:
+        for bloque in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(bloque)
+    estado["archivos"][ruta] = {"tamano": info.st_size, "mtime_ns": info.st_mtime_ns, "sha256": sha.hexdigest()}
+    return sha.hexdigest()
+
+def huella_etapa(etapa, estado):
+    """
+    Calcula la huella de una etapa a partir del hash de sus entradas y de sus parámetros.
+
+    Parámetros:
+    etapa (dict): Etapa de 'nueva_etapa'.
+    estado (dict): Estado con la caché de hashes.
+
+    Retorna:
+    str: Huella en hexadecimal.
+    """
+    contenido = {
+        "entradas": {ruta: hash_archivo(ruta, estado) for ruta in etapa["entradas"]},
+        "parametros": etapa["parametros"],
+    }
+    return hashlib.sha256(json.dumps(contenido, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def orden_de_ejecucion(etapas, objetivos=None):
+    """
+    Ordena las etapas necesarias para los objetivos de modo que cada una vaya después de sus dependencias.
+
+    Parámetros:
+    etapas (list): Etapas definidas.
+    objetivos (list): Nombres de las etapas pedidas; por defecto todas.
+
+    Retorna:
+    list: Etapas en orden de ejecución.
+    """
+    por_nombre = {etapa["nombre"]: etapa for etapa in etapas}
+    orden = []
+    visitadas = set()
+    en_curso = set()
+
+    def visitar(nombre):
+        if nombre in visitadas:
+            return
+        if nombre in en_curso:
+            raise ValueError(f"Dependencia circular en la etapa {nombre}")
+        en_curso.add(nombre)
+        for dependencia in por_nombre[nombre]["depende"]:
+            if dependencia in por_nombre:
+                visitar(dependencia)
+        en_curso.discard(nombre)
+        visitadas.add(nombre)
+        orden.append(por_nombre[nombre])
+
+    for nombre in objetivos or list(por_nombre):
+        visitar(nombre)
+    return orden
+
+def ejecutar_etapas(etapas, objetivos=None, forzar=False, archivo_estado=ARCHIVO_ESTADO):
+    """
+    Ejecuta las etapas en orden, omitiendo las que no cambiaron desde la última ejecución correcta.
+
+    Si una etapa falla, las que dependen de ella no se ejecutan.
+
+    Parámetros:
+    etapas (list): Etapas definidas.
+    objetivos (list): Nombres de las etapas pedidas; por defecto todas.
+    forzar (bool): Ejecutar todas las etapas aunque no hayan cambiado.
+    archivo_estado (str): Archivo JSON de estado.
+
+    Retorna:
+    dict: Nombre de la etapa -> "ejecutada", "omitida", "fallida" o "bloqueada".
+    """
+    estado = cargar_estado(archivo_estado)
+    resultados = {}
+
+    for etapa in orden_de_ejecucion(etapas, objetivos):
+        nombre = etapa["nombre"]
+        if any(resultados.get(dependencia) in ("fallida", "bloqueada") for dependencia in etapa["depende"]):
+            logging.warning(f"Etapa {nombre} no se ejecuta porque falló una etapa anterior.")
+            resultados[nombre] = "bloqueada"
+            continue
+
+        huella = huella_etapa(etapa, estado)
+        anterior = estado["etapas"].get(nombre, {})
+        salidas_intactas = all(hash_archivo(ruta, estado) == anterior.get("salidas", {}).get(ruta) and hash_archivo(ruta, estado) is not None for ruta in etapa["salidas"])
+
+        if not forzar and not etapa["siempre"] and anterior.get("huella") == huella and salidas_intactas:
+            logging.info(f"Etapa {nombre} sin cambios; se omite.")
+            resultados[nombre] = "omitida"
+            continue
+
+        logging.info(f"Ejecutando etapa {nombre}...")
+        try:
+            correcta = etapa["funcion"]()
+        except Exception as e:
+            logging.error(f"Falló la etapa {nombre}: {e}")
+            correcta = False
+
+        if correcta is False:
+            resultados[nombre] = "fallida"
+            estado["etapas"].pop(nombre, None)
+        else:
+            resultados[nombre] = "ejecutada"
+            estado["etapas"][nombre] = {
+                "huella": huella,
+                "salidas": {ruta: hash_archivo(ruta, estado) for ruta in etapa["salidas"]},
+            }
+        guardar_estado(estado, archivo_estado)
+
+    return resultados
@@ -0,0 +1,345 @@
+import argparse
+import logging
+import os
+import re
+import sys
+
+# Línea de comandos única del proceso: extracción (scrape), limpieza (clean), publicación en
+# el Google Sheet (publish) o todo en secuencia (run). Cada subcomando importa solo los
+# módulos que usa, así pandas, gspread y playwright no se cargan para un '--help' o un listado.
+#
+# Las etapas se ejecutan con etapas.py: la limpieza y la publicación se omiten si sus entradas
+# (archivos crudos, CSV del panel, código y opciones) no cambiaron desde la última ejecución.
+
+DIRECTORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Código de cada etapa: si cambia, la etapa se vuelve a ejecutar
+CODIGO_CLEAN = ["clean_data.py", "validacion.py", "fechas.py", "cruce_fuentes.py", "perfilado.py", "almacen_panel.py", "similares.py", "historial_panel.py", "archivos_ligas.py"]
+CODIGO_PUBLISH = ["update_gsheet_service.py", "sincronizar_gsheet.py", "snapshot_gsheet.py", "gsheet_local.py", "validacion.py"]
+
+# Archivos que escribe la limpieza además del CSV y sus reportes (los stg_*.csv de cada fuente,
+# almacen_panel.ARCHIVO_ALMACEN, historial_panel.ARCHIVO_HISTORIAL y similares.ARCHIVO_INDICE,
+# sin importar pandas), en el directorio de trabajo: si falta o cambia alguno, la etapa clean
+# se vuelve a ejecutar
+SALIDAS_CLEAN = [
+    "stg_soccerway.csv", "stg_tmkt.csv", "stg_besoccer.csv", "stg_temporadas.csv",
+    "panel.sqlite", "historial_panel.sqlite", "similares.npz",
+]
+
+def configurar_logging(args, archivo="app.log"):
+    """
+    Configura el logging de la línea de comandos, en consola y en archivo (ver registro.py).
+
+    Parámetros:
+    args (argparse.Namespace): Argumentos leídos (--log-nivel, --log-modulo, --log-json).
+    archivo (str): Archivo de log.
+    """
+    import registro
+
+    registro.configurar(
+        archivo,
+        nivel=args.log_nivel,
+        niveles_modulo=registro.leer_niveles_modulo(args.log_modulo),
+        json_lineas=args.log_json,
+    )
+
+def opciones(args, nombres):
+    """
+    Toma de los argumentos solo las opciones indicadas en la línea de comandos, para que las
+    demás usen los valores por defecto del módulo.
+
+    Parámetros:
+    args (argparse.Namespace): Argumentos leídos.
+    nombres (dict): Nombre del argumento -> nombre del parámetro de la función.
+
+    Retorna:
+    dict: Parámetros con valor.
+    """
+    return {parametro: getattr(args, nombre) for nombre, parametro in nombres.items() if getattr(args, nombre) is not None}
+
+def extraer(fuente, url, archivo, presupuesto=None, archivo_panel=None, reintentar=False):
+    """
+    Ejecuta el scraper de una fuente sobre una URL.
+
+    Parámetros:
+    fuente (str): "soccerway", "transfermarkt" o "besoccer".
+    url (str): URL del portal.
+    archivo (str): Archivo CSV de salida.
+    presupuesto (refresco.Presupuesto): Tiempo máximo de la extracción. Soccerway visita los
+        perfiles por prioridad hasta agotarlo; las demás fuentes no se inician si ya se agotó.
+    archivo_panel (str): CSV del panel para la prioridad de los perfiles.
+    reintentar (bool): Procesar solo los equipos y jugadores de 'archivo' registrados en
+        fallidos.py y mezclar el resultado con el archivo existente.
+
+    Retorna:
+    bool: True si terminó sin errores.
+    """
+    import asyncio
+    import importlib
+    import orchestator
+
+    parametros = {}
+    if presupuesto is not None:
+        if presupuesto.agotado():
+            logging.warning(f"Sin tiempo para extraer {url}; {archivo} queda sin refrescar.")
+            return True
+        if fuente == "soccerway":
+            parametros = {"presupuesto": presupuesto, "archivo_panel": archivo_panel}
+    if reintentar:
+        parametros["reintentar"] = True
+
+    modulo, funcion = orchestator.SCRAPERS[fuente]
+    try:
+        asyncio.run(getattr(importlib.import_module(modulo), funcion)(url, archivo, **parametros))
+        return True
+    except Exception as e:
+        logging.error(f"Error al extraer {url}: {e}")
+        return False
+
+def sitios_a_extraer(args):
+    import orchestator
+
+    if args.url:
+        fuente = orchestator.fuente_de_url(args.url)
+        if fuente is None or not args.archivo:
+            raise SystemExit("Se requiere una URL de soccerway, transfermarkt o besoccer y --archivo.")
+        return [(None, fuente, args.url, args.archivo)]
+    return orchestator.sitios_de_ligas(args.liga, args.fuente)
+
+def archivo_reporte(archivo_csv):
+    # Mismo nombre que validacion.archivo_reporte, sin importar pandas
+    return re.sub(r"\.csv$", "", archivo_csv) + ".validacion.json"
+
+def archivo_perfil(archivo_csv, extension=".perfil.json"):
+    # Mismo nombre que perfilado.archivo_reporte (y archivo_cprofile con ".prof")
+    return re.sub(r"\.csv$", "", archivo_csv) + extension
+
+def codigo(archivos):
+    return [os.path.join(DIRECTORIO, archivo) for archivo in archivos]
+
+def definir_etapas(args):
+    """
+    Arma las etapas del subcomando pedido.
+
+    Parámetros:
+    args (argparse.Namespace): Argumentos leídos.
+
+    Retorna:
+    list: Etapas de etapas.py.
+    """
+    import archivos_ligas
+    import etapas
+    from archivos_ligas import archivo_temporadas
+
+    lista = []
+    extracciones = []
+    archivo_csv = getattr(args, "salida", None) or getattr(args, "csv", None) or archivos_ligas.archivo_csv
+
+    if args.comando == "scrape" or (args.comando == "run" and not args.sin_scrape):
+        sitios = sitios_a_extraer(args)
+        presupuesto = None
+        if getattr(args, "presupuesto_min", None):
+            import refresco
+            presupuesto = refresco.Presupuesto(args.presupuesto_min * 60)
+            # Con tiempo limitado van primero los perfiles de Soccerway, que se refrescan por prioridad
+            sitios = sorted(sitios, key=lambda sitio: sitio[1] != "soccerway")
+        if getattr(args, "reintentar", False):
+            import fallidos
+            con_fallidos = fallidos.archivos_con_fallidos()
+            sitios = [sitio for sitio in sitios if sitio[3] in con_fallidos]
+            logging.info(f"Reintentando URL fallidas de {len(sitios)} archivos ({fallidos.ARCHIVO_FALLIDOS}).")
+
+        for liga, fuente, url, archivo in sitios:
+            salidas = [archivo] + ([archivo_temporadas(archivo)] if fuente == "soccerway" else [])
+            nombre = f"scrape:{archivo}"
+            lista.append(etapas.nueva_etapa(
+                nombre, lambda f=fuente, u=url, a=archivo: extraer(f, u, a, presupuesto, archivo_csv, getattr(args, "reintentar", False)),
+                salidas=salidas, siempre=True,
+            ))
+            extracciones.append(nombre)
+
+    if args.comando in ("clean", "run"):
+        parametros_clean = opciones(args, {"por_bloques": "por_bloques", "presupuesto_mb": "presupuesto_mb", "cprofile": "cprofile", "memoria_python": "memoria_python"})
+        crudos = (
+            archivos_ligas.archivos_ligas_soccerway
+            + [archivo_temporadas(archivo) for archivo in archivos_ligas.archivos_ligas_soccerway]
+            + archivos_ligas.archivos_ligas_transfermarkt
+            + archivos_ligas.archivos_ligas_besoccer
+        )
+
+        def limpiar():
+            import clean_data
+            return clean_data.ejecutar(archivo_salida=archivo_csv, **parametros_clean)
+
+        lista.append(etapas.nueva_etapa(
+            "clean", limpiar,
+            entradas=crudos + codigo(CODIGO_CLEAN),
+            salidas=[archivo_csv, archivo_reporte(archivo_csv), archivo_perfil(archivo_csv)]
+            + ([archivo_perfil(archivo_csv, ".prof")] if parametros_clean.get("cprofile") else [])
+            + SALIDAS_CLEAN,
+            parametros=parametros_clean,
+            depende=extracciones,
+        ))
+
+    if args.comando in ("publish", "run"):
+        parametros_publish = opciones(args, {"modo": "modo_carga", "hoja_local": "hoja_local"})
+
+        def publicar():
+            import update_gsheet_service
+            return update_gsheet_service.publicar(csv_file=archivo_csv, **parametros_publish)
+
+        lista.append(etapas.nueva_etapa(
+            "publish", publicar,
+            entradas=[archivo_csv, archivo_reporte(archivo_csv)] + codigo(CODIGO_PUBLISH),
+            parametros=parametros_publish,
+            depende=["clean"],
+        ))
+
+    return lista
+
+def comando_scrape(args):
+    if args.listar:
+        import orchestator
+        for liga, fuente, url, archivo in orchestator.sitios_de_ligas():
+            print(f"{liga}\t{fuente}\t{archivo}\t{url}")
+        return 0
+    return comando_etapas(args)
+
+def comando_etapas(args):
+    import etapas
+
+    resultados = etapas.ejecutar_etapas(definir_etapas(args), forzar=getattr(args, "forzar", False))
+    for nombre, resultado in resultados.items():
+        logging.info(f"{nombre}: {resultado}")
+    return 1 if any(resultado in ("fallida", "bloqueada") for resultado in resultados.values()) else 0
+
+def comando_similares(args):
+    import similares
+
+    indice = similares.cargar_indice(args.indice or similares.ARCHIVO_INDICE)
+    try:
+        resultado = similares.buscar_similares(
+            indice, args.jugador, k=args.k, ligas=args.liga,
+            edad_min=args.edad_min, edad_max=args.edad_max, valor_min=args.valor_min, valor_max=args.valor_max,
+        )
+    except (KeyError, ValueError) as e:
+        logging.error(e.args[0])
+        return 1
+    for jugador in resultado:
+        print(f"{jugador['distancia']:.3f}\t{jugador['soccerway_pk']}\t{jugador['liga']}\t{jugador['edad']}\t{jugador['valor']}")
+    return 0
+
+def comando_historial(args):
+    import historial_panel
+
+    if args.registrar:
+        for archivo in args.registrar:
+            historial_panel.registrar_desde_csv(archivo, args.historial)
+        return 0
+
+    con = historial_panel.conectar(args.historial)
+    try:
+        if args.cambios:
+            desde, hasta = args.cambios
+            resultado = historial_panel.cambios_entre(con, desde, hasta, columnas=args.columna)
+        elif args.version is not None or args.salida:
+            resultado = historial_panel.leer_version(con, args.version, columnas=args.columna)
+        else:
+            resultado = historial_panel.listar_versiones(con)
+    except ValueError as e:
+        logging.error(e)
+        return 1
+    finally:
+        con.close()
+
+    if args.salida:
+        resultado.to_csv(args.salida, index=False, encoding="utf-8")
+        logging.info(f"Resultado guardado en {args.salida} ({len(resultado)} filas).")
+    else:
+        print(resultado.to_string(index=False))
+    return 0
+
+def crear_parser():
+    parser = argparse.ArgumentParser(prog="etlconcon", description="Extracción, limpieza y publicación del panel de jugadores.")
+    parser.add_argument("--log-nivel", dest="log_nivel", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR"], type=str.upper, help="Nivel del log (por defecto INFO).")
+    parser.add_argument("--log-modulo", dest="log_modulo", action="append", metavar="MODULO=NIVEL", help="Nivel de un módulo, p. ej. webscraping_soccerway=DEBUG (se puede repetir).")
+    parser.add_argument("--log-json", dest="log_json", action="store_true", help="Escribir el log como líneas JSON.")
+    subparsers = parser.add_subparsers(dest="comando", required=True)
+
+    def agregar_scrape(sub):
+        sub.add_argument("--liga", action="append", help="Liga de orchestator.ligas (se puede repetir); por defecto todas.")
+        sub.add_argument("--fuente", action="append", choices=["soccerway", "transfermarkt", "besoccer"], help="Solo estas fuentes (se puede repetir).")
+        sub.add_argument("--presupuesto-min", dest="presupuesto_min", type=float, help="Minutos disponibles: los perfiles se refrescan por prioridad hasta agotarlos y el resto queda pendiente.")
+        sub.add_argument("--reintentar-fallidos", "--retry-failed", dest="reintentar", action="store_true", help="Procesar solo los equipos y jugadores que fallaron (fallidos.json) y mezclarlos con los archivos crudos.")
+
+    def agregar_clean(sub):
+        sub.add_argument("--salida", help="CSV consolidado (por defecto el de clean_data.py).")
+        sub.add_argument("--por-bloques", dest="por_bloques", action="store_true", default=None, help="Consolidar sin cargar las fuentes completas en memoria.")
+        sub.add_argument("--presupuesto-mb", dest="presupuesto_mb", type=int, help="Memoria máxima aproximada del modo por bloques.")
+        sub.add_argument("--perfil", dest="cprofile", action="store_true", default=None, help="Guardar además un perfil de cProfile (<salida>.prof).")
+        sub.add_argument("--perfil-memoria", dest="memoria_python", action="store_true", default=None, help="Medir el pico de memoria de cada etapa con tracemalloc (más lento).")
+
+    def agregar_publish(sub):
+        sub.add_argument("--modo", choices=["diferencias", "intercambio", "completa"], help="Modo de carga (por defecto el de update_gsheet_service.py).")
+        sub.add_argument("--hoja-local", dest="hoja_local", help="Publicar en un libro local JSON en lugar de Google Sheets.")
+
+    scrape = subparsers.add_parser("scrape", help="Extraer los datos de los portales.")
+    agregar_scrape(scrape)
+    scrape.add_argument("--url", help="Extraer una sola URL.")
+    scrape.add_argument("--archivo", help="Archivo de salida de --url.")
+    scrape.add_argument("--listar", action="store_true", help="Listar las ligas y sitios configurados.")
+    scrape.set_defaults(funcion=comando_scrape)
+
+    clean = subparsers.add_parser("clean", help="Limpiar y consolidar los archivos crudos.")
+    agregar_clean(clean)
+    clean.set_defaults(funcion=comando_etapas)
+
+    publish = subparsers.add_parser("publish", help="Publicar el panel validado en el Google Sheet.")
+    publish.add_argument("--csv", help="CSV del panel (por defecto el de update_gsheet_service.py).")
+    agregar_publish(publish)
+    publish.set_defaults(funcion=comando_etapas)
+
+    run = subparsers.add_parser("run", help="Extraer, limpiar y publicar en secuencia.")
+    agregar_scrape(run)
+    agregar_clean(run)
+    agregar_publish(run)
+    run.add_argument("--sin-scrape", action="store_true", help="Usar los archivos crudos existentes.")
+    run.set_defaults(funcion=comando_etapas, url=None, archivo=None, listar=False)
+
+    similares = subparsers.add_parser("similares", help="Buscar jugadores parecidos a uno dado.")
+    similares.add_argument("jugador", help="soccerway_pk del jugador de referencia.")
+    similares.add_argument("-k", type=int, default=10, help="Cantidad de jugadores (por defecto 10).")
+    similares.add_argument("--liga", action="append", help="Solo jugadores de esta liga (se puede repetir).")
+    similares.add_argument("--edad-min", dest="edad_min", type=int)
+    similares.add_argument("--edad-max", dest="edad_max", type=int)
+    similares.add_argument("--valor-min", dest="valor_min", type=int, help="Valor de mercado mínimo en euros.")
+    similares.add_argument("--valor-max", dest="valor_max", type=int, help="Valor de mercado máximo en euros.")
+    similares.add_argument("--indice", help="Archivo del índice (por defecto el de similares.py).")
+    similares.set_defaults(funcion=comando_similares)
+
+    historial = subparsers.add_parser("historial", help="Versiones anteriores del panel y cambios entre ellas.")
+    historial.add_argument("--version", type=int, help="Reconstruir el panel de esta versión (por defecto se listan las versiones).")
+    historial.add_argument("--cambios", type=int, nargs=2, metavar=("DESDE", "HASTA"), help="Celdas que cambiaron entre dos versiones.")
+    historial.add_argument("--columna", action="append", help="Solo esta columna (se puede repetir), p. ej. Equipo o 'Valor de Mercado'.")
+    historial.add_argument("--salida", help="Guardar el resultado en un CSV.")
+    historial.add_argument("--registrar", nargs="+", metavar="CSV", help="Registrar CSV del panel como versiones nuevas, en orden.")
+    historial.add_argument("--historial", default="historial_panel.sqlite", help="Archivo del historial.")
+    historial.set_defaults(funcion=comando_historial)
+
+    for sub in (clean, publish, run):
+        sub.add_argument("--forzar", action="store_true", help="Ejecutar las etapas aunque sus entradas no hayan cambiado.")
+
+    return parser
+
+def main(argv=None):
+    parser = crear_parser()
+    args = parser.parse_args(argv)
+    try:
+        configurar_logging(args)
+    except ValueError as e:
+        parser.error(e.args[0])
+    return args.funcion(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
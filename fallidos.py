@@ -0,0 +1,102 @@
+import json
+import logging
+import os
+from datetime import datetime
+
+# Registro durable de las URL de equipos y jugadores que fallaron en una extracción (cola de
+# "cartas muertas"). Antes un timeout o un error en una página solo quedaba en el log y ese
+# equipo o jugador desaparecía del archivo crudo de esa ejecución.
+#
+# Cada falla se guarda en ARCHIVO_FALLIDOS por URL con la fuente, el tipo ("equipo" o
+# "jugador"), el archivo crudo al que pertenece, la clase y el mensaje del error, la cantidad
+# de intentos y la fecha del primer y último fallo. Con 'etlconcon.py scrape
+# --reintentar-fallidos' los scrapers vuelven a procesar solo esas URL y mezclan lo que
+# obtienen con los archivos crudos existentes; las que funcionan salen del registro y las que
+# vuelven a fallar suman un intento.
+
+ARCHIVO_FALLIDOS = "fallidos.json"
+
+class SinDatos(Exception):
+    """
+    La página cargó pero no trajo lo esperado (plantilla sin jugadores, perfil vacío).
+    """
+
+class ColaFallidos:
+    """
+    URL fallidas de las extracciones, guardadas en un archivo JSON.
+    """
+
+    def __init__(self, archivo=ARCHIVO_FALLIDOS):
+        self.archivo = archivo
+        self.entradas = self.cargar()
+        # URL que fallaron en esta ejecución: no se dan por resueltas aunque otra etapa las procese
+        self.fallidas = set()
+
+    def cargar(self):
+        if not os.path.exists(self.archivo):
+            return {}
+        try:
+            with open(self.archivo, encoding="utf-8") as file:
+                return json.load(file)
+        except (OSError, ValueError) as e:
+            logging.warning(f"No se pudo leer {self.archivo} ({e}); se parte sin URL fallidas.")
+            return {}
+
+    def guardar(self):
+        # Se escribe en un archivo temporal y se reemplaza, para no dejarlo a medias
+        temporal = f"{self.archivo}.tmp"
+        with open(temporal, "w", encoding="utf-8") as file:
+            json.dump(self.entradas, file, ensure_ascii=False, indent=1, sort_keys=True)
+        os.replace(temporal, self.archivo)
+
+    def registrar(self, url, fuente, tipo, archivo, error, **contexto):
+        """
+        Registra una falla, sumando un intento si la URL ya estaba registrada.
+
+        Parámetros:
+        url (str): URL del equipo o jugador.
+        fuente (str): "soccerway", "transfermarkt" o "besoccer".
+        tipo (str): "equipo" o "jugador".
+        archivo (str): Archivo crudo donde irían sus datos.
+        error (Exception): Error producido.
+        contexto: Datos para reintentarla (por ejemplo, el club de un jugador de Transfermarkt).
+        """
+        ahora = datetime.now().isoformat(timespec="seconds")
+        anterior = self.entradas.get(url, {})
+        self.entradas[url] = {
+            "fuente": fuente,
+            "tipo": tipo,
+            "archivo": archivo,
+            "error": type(error).__name__,
+            "mensaje": str(error)[:500],
+            "intentos": anterior.get("intentos", 0) + 1,
+            "primer_fallo": anterior.get("primer_fallo", ahora),
+            "ultimo_fallo": ahora,
+            "contexto": {**anterior.get("contexto", {}), **contexto},
+        }
+        self.fallidas.add(url)
+        logging.error(f"{fuente}: falló {tipo} {url} ({type(error).__name__}: {error}); registrado en {self.archivo}.")
+
+    def resolver(self, url):
+        """
+        Quita una URL del registro si no volvió a fallar en esta ejecución.
+        """
+        if url in self.entradas and url not in self.fallidas:
+            del self.entradas[url]
+
+    def pendientes(self, archivo=None, tipo=None):
+        """
+        Retorna:
+        dict: URL -> entrada de las fallas registradas, opcionalmente de un archivo crudo y tipo.
+        """
+        return {
+            url: entrada for url, entrada in self.entradas.items()
+            if (archivo is None or entrada["archivo"] == archivo) and (tipo is None or entrada["tipo"] == tipo)
+        }
+
+def archivos_con_fallidos(archivo=ARCHIVO_FALLIDOS):
+    """
+    Retorna:
+    set: Archivos crudos con al menos una URL fallida registrada.
+    """
+    return {entrada["archivo"] for entrada in ColaFallidos(archivo).entradas.values()}
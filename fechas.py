@@ -0,0 +1,88 @@
+import re
+
+import pandas as pd
+
+# Lectura de fechas en español de las tres fuentes, por columnas completas y sin depender del
+# locale del sistema (locale.setlocale es global al proceso y falla si 'es_ES.UTF-8' no está
+# instalado, con lo que todas las fechas quedaban NaT). Formatos reconocidos:
+# - Soccerway: "8 septiembre 1993"
+# - Transfermarkt: "11/03/1995 (29)" (la edad entre paréntesis se ignora)
+# - BeSoccer: "Nacido el 8 septiembre 1993 en Santiago"
+# - Fechas ya convertidas: "1993-09-08" o "1993-09-08 00:00:00"
+#
+# Las llaves de cruce entre fuentes usan la fecha como "08_septiembre_1993" (llave_fecha).
+
+MESES = [
+    "enero", "febrero", "marzo", "abril", "mayo", "junio",
+    "julio", "agosto", "septiembre", "octubre", "noviembre", "diciembre"
+]
+
+# Nombre (o abreviatura) del mes -> número
+NUMERO_MES = {nombre: numero for numero, nombre in enumerate(MESES, start=1)}
+NUMERO_MES.update({nombre[:3]: numero for nombre, numero in list(NUMERO_MES.items())})
+NUMERO_MES.update({"setiembre": 9, "sept": 9, "set": 9})
+
+PATRON_TEXTO = re.compile(r"(\d{1,2})\s+(?:de\s+)?([a-z]+)\.?\s+(?:de\s+)?(\d{4})", re.IGNORECASE)
+PATRON_NUMERICO = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4})")
+PATRON_ISO = re.compile(r"(\d{4})-(\d{1,2})-(\d{1,2})")
+
+def partes_fecha(serie):
+    """
+    Separa día, mes y año de una columna de fechas en cualquiera de los formatos reconocidos.
+
+    Parámetros:
+    serie (pd.Series): Columna con las fechas como texto.
+
+    Retorna:
+    pd.DataFrame: Columnas 'day', 'month' y 'year' (float), nulas si no se reconoce la fecha.
+    """
+    texto = serie.astype("string").str.strip()
+
+    iso = texto.str.extract(PATRON_ISO)
+    numerico = texto.str.extract(PATRON_NUMERICO)
+    con_nombre = texto.str.extract(PATRON_TEXTO)
+    con_nombre[1] = con_nombre[1].str.lower().map(NUMERO_MES)
+
+    # Cada formato completa solo las filas que los anteriores no reconocieron
+    partes = pd.DataFrame({"day": iso[2], "month": iso[1], "year": iso[0]})
+    for candidato in (numerico[[0, 1, 2]], con_nombre[[0, 1, 2]]):
+        candidato = candidato.set_axis(["day", "month", "year"], axis=1)
+        partes = partes.where(partes["year"].notna(), candidato, axis=0)
+
+    partes = partes.apply(pd.to_numeric, errors="coerce").astype("float64")
+    return partes.where(partes.notna().all(axis=1))
+
+def parsear_fechas(serie):
+    """
+    Convierte una columna de fechas en español a fechas reales.
+
+    Parámetros:
+    serie (pd.Series): Columna con las fechas como texto.
+
+    Retorna:
+    pd.Series: Fechas (datetime64), NaT si no hay dato o no se reconoce el formato.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie
+    # Las fechas se repiten mucho (una por jugador y archivo): se lee cada valor distinto una vez
+    codigos, valores = pd.factorize(serie, use_na_sentinel=True)
+    unicas = pd.to_datetime(partes_fecha(pd.Series(valores)), errors="coerce")
+    fechas = pd.Series(pd.NaT, index=serie.index, dtype="datetime64[ns]")
+    validos = codigos >= 0
+    fechas[validos] = unicas.to_numpy()[codigos[validos]]
+    return fechas
+
+def llave_fecha(fechas):
+    """
+    Escribe las fechas como fragmento de llave: "08_septiembre_1993".
+
+    Parámetros:
+    fechas (pd.Series): Fechas (datetime64) de parsear_fechas.
+
+    Retorna:
+    pd.Series: Texto de cada fecha, "" si es NaT.
+    """
+    dia = fechas.dt.day.astype("Int64").astype("string").str.zfill(2)
+    mes = fechas.dt.month.map(dict(enumerate(MESES, start=1))).astype("string")
+    anio = fechas.dt.year.astype("Int64").astype("string")
+    return (dia + "_" + mes + "_" + anio).fillna("").astype(object)
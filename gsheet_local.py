@@ -0,0 +1,403 @@
+import copy
+import json
+import os
+import random
+import re
+import threading
+import time
+from datetime import datetime, timezone
+
+# Libro de Google Sheets local, guardado en un archivo JSON. Implementa el subconjunto de la
+# API de gspread (Spreadsheet / Worksheet) que usa la carga al panel, para poder probar la
+# sincronización sin credenciales ni cuota. También cuenta las llamadas y las celdas
+# enviadas, para comparar el costo de cada modo de carga, y puede simular latencia y errores
+# transitorios de la API (429 / 503) para ejercitar los reintentos de la carga por bloques.
+
+class RespuestaLocal:
+    """Respuesta mínima con 'status_code', como la que trae gspread.exceptions.APIError."""
+
+    def __init__(self, status_code):
+        self.status_code = status_code
+
+
+class ErrorApiLocal(Exception):
+    """Error simulado de la API de Google Sheets."""
+
+    def __init__(self, status_code):
+        super().__init__(f"Error simulado de la API ({status_code})")
+        self.response = RespuestaLocal(status_code)
+
+
+def columna_a_numero(letras):
+    """
+    Convierte la letra de una columna en notación A1 a su número (A -> 1, AA -> 27).
+
+    Parámetros:
+    letras (str): Letras de la columna.
+
+    Retorna:
+    int: El número de la columna, empezando en 1.
+    """
+    numero = 0
+    for letra in letras.upper():
+        numero = numero * 26 + ord(letra) - ord("A") + 1
+    return numero
+
+def leer_rango_completo(rango, filas, columnas):
+    """
+    Interpreta un rango A1 de lectura, incluidos los rangos abiertos ("A:A", "1:1", "A2:C").
+
+    Parámetros:
+    rango (str): Rango en notación A1.
+    filas (int): Cantidad de filas de la hoja, para completar los rangos abiertos.
+    columnas (int): Cantidad de columnas de la hoja, para completar los rangos abiertos.
+
+    Retorna:
+    tuple: (fila_inicio, columna_inicio, fila_fin, columna_fin), empezando en 1 e inclusivos.
+    """
+    partes = rango.split("!")[-1].split(":")
+    extremos = []
+    for parte in partes:
+        coincidencia = re.fullmatch(r"([A-Za-z]*)(\d*)", parte)
+        if not coincidencia or not parte:
+            raise ValueError(f"Rango no soportado: {rango}")
+        letras, numero = coincidencia.groups()
+        extremos.append((int(numero) if numero else None, columna_a_numero(letras) if letras else None))
+    if len(extremos) == 1:
+        extremos.append(extremos[0])
+    (fila_inicio, columna_inicio), (fila_fin, columna_fin) = extremos
+    return fila_inicio or 1, columna_inicio or 1, fila_fin or filas, columna_fin or columnas
+
+def leer_rango(rango):
+    """
+    Interpreta un rango A1 simple ("B5", "B5:D7", "Hoja!A1:C3").
+
+    Parámetros:
+    rango (str): Rango en notación A1.
+
+    Retorna:
+    tuple: Una tupla (fila, columna) de la celda superior izquierda, empezando en 1.
+    """
+    rango = rango.split("!")[-1].split(":")[0]
+    coincidencia = re.fullmatch(r"([A-Za-z]+)(\d+)", rango)
+    if not coincidencia:
+        raise ValueError(f"Rango no soportado: {rango}")
+    return int(coincidencia.group(2)), columna_a_numero(coincidencia.group(1))
+
+
+class HojaLocal:
+    """Hoja de un LibroLocal, con la misma interfaz que gspread.Worksheet para lo que usa el panel."""
+
+    def __init__(self, libro, datos):
+        self.spreadsheet = libro
+        self._datos = datos
+
+    @property
+    def id(self):
+        return self._datos["id"]
+
+    @property
+    def title(self):
+        return self._datos["titulo"]
+
+    @property
+    def index(self):
+        return self.spreadsheet._datos["hojas"].index(self._datos)
+
+    @property
+    def hidden(self):
+        return self._datos.get("oculta", False)
+
+    @property
+    def valores(self):
+        return self._datos["valores"]
+
+    def _escribir(self, fila, columna, valores):
+        for i, fila_valores in enumerate(valores):
+            destino = fila - 1 + i
+            while len(self.valores) <= destino:
+                self.valores.append([])
+            actual = self.valores[destino]
+            for j, valor in enumerate(fila_valores):
+                while len(actual) < columna + j:
+                    actual.append("")
+                actual[columna - 1 + j] = valor
+            self.spreadsheet.celdas_enviadas += len(fila_valores)
+
+    @property
+    def row_count(self):
+        return max(self._datos.get("filas", 0), len(self.valores))
+
+    @property
+    def col_count(self):
+        return max([self._datos.get("columnas", 0)] + [len(fila) for fila in self.valores])
+
+    def get_all_values(self, **kwargs):
+        self.spreadsheet._registrar_llamada()
+        ancho = max((len(fila) for fila in self.valores), default=0)
+        return [list(fila) + [""] * (ancho - len(fila)) for fila in self.valores]
+
+    def batch_get(self, ranges, **kwargs):
+        self.spreadsheet._registrar_llamada()
+        resultado = []
+        for rango in ranges:
+            fila_inicio, columna_inicio, fila_fin, columna_fin = leer_rango_completo(rango, len(self.valores), self.col_count)
+            bloque = [list(fila[columna_inicio - 1:columna_fin]) for fila in self.valores[fila_inicio - 1:fila_fin]]
+            # Igual que en Sheets, no se devuelven las celdas vacías al final de cada fila ni del rango
+            for fila in bloque:
+                while fila and fila[-1] == "":
+                    fila.pop()
+            while bloque and not bloque[-1]:
+                bloque.pop()
+            resultado.append(bloque)
+        return resultado
+
+    def get_all_records(self, **kwargs):
+        valores = self.get_all_values()
+        if not valores:
+            return []
+        return [dict(zip(valores[0], fila)) for fila in valores[1:]]
+
+    def update(self, values, range_name=None, **kwargs):
+        self.spreadsheet._registrar_llamada()
+        fila, columna = leer_rango(range_name) if range_name else (1, 1)
+        with self.spreadsheet._candado:
+            self._escribir(fila, columna, values)
+            self.spreadsheet._guardar()
+
+    def batch_update(self, data, **kwargs):
+        self.spreadsheet._registrar_llamada()
+        with self.spreadsheet._candado:
+            for rango in data:
+                fila, columna = leer_rango(rango["range"])
+                self._escribir(fila, columna, rango["values"])
+            self.spreadsheet._guardar()
+
+    def resize(self, rows=None, cols=None):
+        self.spreadsheet._registrar_llamada()
+        with self.spreadsheet._candado:
+            if rows is not None:
+                self._datos["filas"] = rows
+                del self.valores[rows:]
+            if cols is not None:
+                self._datos["columnas"] = cols
+            self.spreadsheet._guardar()
+
+    def append_rows(self, values, **kwargs):
+        self.spreadsheet._registrar_llamada()
+        with self.spreadsheet._candado:
+            # Igual que en Sheets, se agrega después de la última fila con datos
+            while self.valores and not any(str(valor) != "" for valor in self.valores[-1]):
+                self.valores.pop()
+            self._escribir(len(self.valores) + 1, 1, values)
+            self.spreadsheet._guardar()
+
+    def delete_rows(self, start_index, end_index=None):
+        self.spreadsheet._registrar_llamada()
+        with self.spreadsheet._candado:
+            del self.valores[start_index - 1:(end_index or start_index)]
+            self.spreadsheet._guardar()
+
+    def clear(self):
+        self.spreadsheet._registrar_llamada()
+        with self.spreadsheet._candado:
+            self.valores.clear()
+            self.spreadsheet._guardar()
+
+
+class LibroLocal:
+    """Libro local guardado en JSON, con la misma interfaz que gspread.Spreadsheet para lo que usa el panel."""
+
+    def __init__(self, ruta=None, latencia=0.0, tasa_fallas=0.0, semilla=None):
+        self.ruta = ruta
+        self.latencia = latencia
+        self.tasa_fallas = tasa_fallas
+        self.llamadas = 0
+        self.fallas = 0
+        self.celdas_enviadas = 0
+        self._azar = random.Random(semilla)
+        self._candado = threading.RLock()
+        self._datos = {"hojas": [{"id": 0, "titulo": "Hoja 1", "valores": []}]}
+
+        if ruta and os.path.exists(ruta):
+            with open(ruta, encoding="utf-8") as file:
+                self._datos = json.load(file)
+
+    def _registrar_llamada(self):
+        with self._candado:
+            self.llamadas += 1
+            falla = self._azar.random() < self.tasa_fallas
+            if falla:
+                self.fallas += 1
+        if self.latencia:
+            time.sleep(self.latencia)
+        if falla:
+            raise ErrorApiLocal(self._azar.choice([429, 503]))
+
+    def _guardar(self):
+        # Toda escritura cambia la fecha de modificación, como 'modifiedTime' en Drive
+        self._datos["modificado"] = datetime.now(timezone.utc).isoformat()
+        if self.ruta:
+            with open(self.ruta, "w", encoding="utf-8") as file:
+                json.dump(self._datos, file, ensure_ascii=False, default=str)
+
+    @property
+    def id(self):
+        return self.ruta or "libro_local"
+
+    def get_lastUpdateTime(self):
+        self._registrar_llamada()
+        return self._datos.get("modificado")
+
+    @property
+    def sheet1(self):
+        return self.get_worksheet(0)
+
+    def get_worksheet(self, indice):
+        return HojaLocal(self, self._datos["hojas"][indice])
+
+    def worksheets(self):
+        return [HojaLocal(self, datos) for datos in self._datos["hojas"]]
+
+    def worksheet(self, titulo):
+        for datos in self._datos["hojas"]:
+            if datos["titulo"] == titulo:
+                return HojaLocal(self, datos)
+        raise KeyError(f"No existe la hoja '{titulo}'")
+
+    def add_worksheet(self, title, rows, cols, index=None):
+        respuesta = self.batch_update({"requests": [{"addSheet": {"properties": {
+            "title": title, "index": index, "gridProperties": {"rowCount": rows, "columnCount": cols}
+        }}}]})
+        return self.worksheet(respuesta["replies"][0]["addSheet"]["properties"]["title"])
+
+    def del_worksheet(self, hoja):
+        self.batch_update({"requests": [{"deleteSheet": {"sheetId": hoja.id}}]})
+
+    def batch_update(self, body):
+        self._registrar_llamada()
+        with self._candado:
+            # Igual que en Sheets, las solicitudes de un batch_update se aplican todas o ninguna:
+            # primero se prueban sobre una copia y solo si no fallan se aplican al libro
+            self._aplicar_solicitudes(copy.deepcopy(self._datos), body)
+            respuestas = self._aplicar_solicitudes(self._datos, body)
+            self._guardar()
+        return {"replies": respuestas}
+
+    @staticmethod
+    def _buscar_hoja(datos, id_hoja):
+        for hoja in datos["hojas"]:
+            if hoja["id"] == id_hoja:
+                return hoja
+        raise ValueError(f"No existe la hoja con id {id_hoja}")
+
+    @staticmethod
+    def _escribir_celdas(hoja, fila, columna, valores):
+        # Escritura del lado del servidor (copyPaste, updateCells): no cuenta como celdas enviadas
+        # y, como en Sheets, no puede salirse de la grilla
+        filas = max(hoja.get("filas", 0), len(hoja["valores"]))
+        columnas = max([hoja.get("columnas", 0)] + [len(f) for f in hoja["valores"]])
+        if fila + len(valores) > filas or columna + max((len(f) for f in valores), default=0) > columnas:
+            raise ValueError(f"El rango a escribir excede la grilla de la hoja '{hoja['titulo']}'.")
+        for i, fila_valores in enumerate(valores):
+            while len(hoja["valores"]) <= fila + i:
+                hoja["valores"].append([])
+            actual = hoja["valores"][fila + i]
+            while len(actual) < columna + len(fila_valores):
+                actual.append("")
+            actual[columna:columna + len(fila_valores)] = fila_valores
+
+    def _aplicar_solicitudes(self, datos, body):
+        respuestas = []
+        for solicitud in body.get("requests", []):
+            respuesta = {}
+            if "deleteDimension" in solicitud:
+                rango = solicitud["deleteDimension"]["range"]
+                hoja = self._buscar_hoja(datos, rango["sheetId"])
+                if rango["dimension"] != "ROWS":
+                    raise ValueError("Solo se soporta eliminar filas.")
+                del hoja["valores"][rango["startIndex"]:rango["endIndex"]]
+            elif "addSheet" in solicitud:
+                propiedades = solicitud["addSheet"]["properties"]
+                if any(h["titulo"] == propiedades["title"] for h in datos["hojas"]):
+                    raise ValueError(f"Ya existe una hoja llamada '{propiedades['title']}'")
+                grilla = propiedades.get("gridProperties", {})
+                hoja = {
+                    "id": max((h["id"] for h in datos["hojas"]), default=-1) + 1,
+                    "titulo": propiedades["title"],
+                    "oculta": propiedades.get("hidden", False),
+                    "filas": grilla.get("rowCount", 0),
+                    "columnas": grilla.get("columnCount", 0),
+                    "valores": [],
+                }
+                indice = propiedades.get("index")
+                datos["hojas"].insert(len(datos["hojas"]) if indice is None else indice, hoja)
+                respuesta = {"addSheet": {"properties": {"sheetId": hoja["id"], "title": hoja["titulo"]}}}
+            elif "deleteSheet" in solicitud:
+                datos["hojas"].remove(self._buscar_hoja(datos, solicitud["deleteSheet"]["sheetId"]))
+            elif "updateSheetProperties" in solicitud:
+                propiedades = solicitud["updateSheetProperties"]["properties"]
+                campos = solicitud["updateSheetProperties"]["fields"].split(",")
+                hoja = self._buscar_hoja(datos, propiedades["sheetId"])
+                grilla = propiedades.get("gridProperties", {})
+                if "gridProperties.rowCount" in campos:
+                    hoja["filas"] = grilla["rowCount"]
+                    del hoja["valores"][grilla["rowCount"]:]
+                if "gridProperties.columnCount" in campos:
+                    hoja["columnas"] = grilla["columnCount"]
+                    for fila in hoja["valores"]:
+                        del fila[grilla["columnCount"]:]
+                if "title" in campos:
+                    if any(h["titulo"] == propiedades["title"] and h is not hoja for h in datos["hojas"]):
+                        raise ValueError(f"Ya existe una hoja llamada '{propiedades['title']}'")
+                    hoja["titulo"] = propiedades["title"]
+                if "hidden" in campos:
+                    hoja["oculta"] = propiedades["hidden"]
+                if "index" in campos:
+                    datos["hojas"].remove(hoja)
+                    datos["hojas"].insert(propiedades["index"], hoja)
+            elif "copyPaste" in solicitud:
+                # Se copian solo los valores (PASTE_VALUES): el formato de la hoja destino no cambia
+                origen = solicitud["copyPaste"]["source"]
+                destino = solicitud["copyPaste"]["destination"]
+                if solicitud["copyPaste"].get("pasteType") != "PASTE_VALUES":
+                    raise ValueError("Solo se soporta copiar valores (PASTE_VALUES).")
+                hoja_origen = self._buscar_hoja(datos, origen["sheetId"])
+                ancho = origen["endColumnIndex"] - origen["startColumnIndex"]
+                bloque = []
+                for fila in hoja_origen["valores"][origen["startRowIndex"]:origen["endRowIndex"]]:
+                    fila = fila[origen["startColumnIndex"]:origen["endColumnIndex"]]
+                    bloque.append(list(fila) + [""] * (ancho - len(fila)))
+                bloque += [[""] * ancho] * (origen["endRowIndex"] - origen["startRowIndex"] - len(bloque))
+                self._escribir_celdas(self._buscar_hoja(datos, destino["sheetId"]), destino["startRowIndex"], destino["startColumnIndex"], bloque)
+            elif "updateCells" in solicitud:
+                actualizacion = solicitud["updateCells"]
+                if actualizacion.get("fields") != "userEnteredValue":
+                    raise ValueError("Solo se soporta actualizar valores (userEnteredValue).")
+                bloque = [
+                    [next(iter(celda.get("userEnteredValue", {"stringValue": ""}).values())) for celda in fila.get("values", [])]
+                    for fila in actualizacion["rows"]
+                ]
+                inicio = actualizacion["start"]
+                self._escribir_celdas(self._buscar_hoja(datos, inicio["sheetId"]), inicio["rowIndex"], inicio["columnIndex"], bloque)
+            else:
+                raise ValueError(f"Solicitud no soportada: {list(solicitud)}")
+            respuestas.append(respuesta)
+        if not any(not h.get("oculta", False) for h in datos["hojas"]):
+            raise ValueError("El libro debe tener al menos una hoja visible.")
+        return respuestas
+
+def abrir_libro_local(ruta, latencia=0.0, tasa_fallas=0.0, semilla=None):
+    """
+    Abre (o crea, si no existe) un libro local guardado en JSON.
+
+    Parámetros:
+    ruta (str): Archivo JSON del libro.
+    latencia (float): Segundos de espera simulados por llamada.
+    tasa_fallas (float): Probabilidad de que una llamada falle con un error 429 o 503.
+    semilla (int): Semilla de las fallas simuladas, para repetir una prueba.
+
+    Retorna:
+    LibroLocal: El libro abierto.
+    """
+    return LibroLocal(ruta, latencia=latencia, tasa_fallas=tasa_fallas, semilla=semilla)
@@ -0,0 +1,374 @@
+import json
+import logging
+import math
+import os
+import sqlite3
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+# Historial de versiones del panel consolidado. En lugar de guardar copias completas
+# (clean_data_final_2.csv, _3, _4...), cada ejecución se registra como una versión nueva y
+# solo se guardan las celdas que cambiaron respecto de la anterior, por 'soccerway_pk'.
+#
+# Cada celda (jugador, columna, valor) se guarda con el intervalo de versiones en que estuvo
+# vigente: 'desde' (inclusive) y 'hasta' (exclusiva, NULL si sigue vigente). Leer una versión
+# es tomar las celdas cuyo intervalo la contiene, y el archivo crece con la cantidad de
+# cambios, no con la cantidad de ejecuciones. Las llaves y los nombres de columna se guardan
+# una sola vez y las celdas los referencian por número.
+#
+# Para no comparar celda por celda todo el panel en cada ejecución, se guarda una huella
+# (hash) de cada fila vigente: solo las filas cuya huella cambió (o los jugadores nuevos y
+# los que salieron) se pasan a formato largo y se comparan con sus celdas vigentes. Si cambia
+# el conjunto de columnas se comparan todas las filas.
+
+ARCHIVO_HISTORIAL = "historial_panel.sqlite"
+
+LLAVE = "soccerway_pk"
+
+# Por encima de esta cantidad de jugadores no se filtra por llave (límite de parámetros de SQLite)
+MAXIMO_LLAVES_FILTRO = 30000
+
+def conectar(archivo=ARCHIVO_HISTORIAL):
+    """
+    Abre (y crea si no existe) la base del historial.
+
+    Parámetros:
+    archivo (str): Archivo SQLite.
+
+    Retorna:
+    sqlite3.Connection: Conexión abierta.
+    """
+    con = sqlite3.connect(archivo)
+    con.executescript(
+        """
+        CREATE TABLE IF NOT EXISTS versiones (
+            version INTEGER PRIMARY KEY,
+            fecha TEXT NOT NULL,
+            origen TEXT,
+            filas INTEGER NOT NULL,
+            columnas TEXT NOT NULL,
+            celdas_cambiadas INTEGER NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS jugadores (id INTEGER PRIMARY KEY, soccerway_pk TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS columnas (id INTEGER PRIMARY KEY, nombre TEXT NOT NULL UNIQUE);
+        CREATE TABLE IF NOT EXISTS celdas (
+            jugador INTEGER NOT NULL,
+            columna INTEGER NOT NULL,
+            valor,
+            desde INTEGER NOT NULL,
+            hasta INTEGER
+        );
+        CREATE INDEX IF NOT EXISTS idx_celdas_desde ON celdas (desde);
+        CREATE INDEX IF NOT EXISTS idx_celdas_hasta ON celdas (hasta);
+        CREATE TABLE IF NOT EXISTS huellas (soccerway_pk TEXT PRIMARY KEY, huella INTEGER NOT NULL);
+        """
+    )
+    return con
+
+def normalizar_valor(valor):
+    """
+    Deja un valor en un tipo comparable entre ejecuciones: los nulos como None, los tipos de
+    NumPy como tipos de Python y los decimales enteros (80.0, de columnas con nulos) como int.
+
+    Parámetros:
+    valor: Valor de una celda.
+
+    Retorna:
+    None, int, float o str.
+    """
+    if valor is None or (isinstance(valor, float) and math.isnan(valor)) or valor is pd.NaT:
+        return None
+    if hasattr(valor, "item"):
+        valor = valor.item()
+    if isinstance(valor, float) and valor.is_integer():
+        return int(valor)
+    if isinstance(valor, (int, float, str)):
+        return valor
+    if isinstance(valor, (pd.Timestamp, datetime)):
+        return valor.strftime("%Y-%m-%d")
+    return str(valor)
+
+def normalizar_columna(serie):
+    """
+    Aplica 'normalizar_valor' a una columna completa, con operaciones vectorizadas según su
+    tipo (las columnas de tipo 'object', que pueden mezclar tipos, se recorren valor por valor).
+
+    Parámetros:
+    serie (pd.Series): Columna del panel.
+
+    Retorna:
+    np.ndarray: Valores normalizados (dtype object).
+    """
+    if pd.api.types.is_bool_dtype(serie) or pd.api.types.is_integer_dtype(serie):
+        return serie.to_numpy(dtype=object, na_value=None)
+    if pd.api.types.is_float_dtype(serie):
+        numeros = serie.to_numpy(dtype=float, na_value=np.nan)
+        valores = numeros.astype(object)
+        enteros = np.isfinite(numeros) & (numeros == np.floor(numeros))
+        # Los enteros que caben en int64 se convierten de una vez; los más grandes, uno por uno
+        chicos = enteros & (np.abs(numeros) < 2 ** 62)
+        valores[chicos] = numeros[chicos].astype(np.int64).astype(object)
+        valores[enteros & ~chicos] = [int(numero) for numero in numeros[enteros & ~chicos]]
+        valores[np.isnan(numeros)] = None
+        return valores
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return serie.dt.strftime("%Y-%m-%d").to_numpy(dtype=object, na_value=None)
+    if pd.api.types.is_string_dtype(serie) and not pd.api.types.is_object_dtype(serie):
+        return serie.to_numpy(dtype=object, na_value=None)
+    return serie.map(normalizar_valor).to_numpy(dtype=object)
+
+def sin_duplicados(df):
+    """
+    Pasa la llave a texto y deja la primera fila de cada jugador.
+    """
+    df = df.copy()
+    df[LLAVE] = df[LLAVE].astype(str)
+    duplicados = df[LLAVE].duplicated()
+    if duplicados.any():
+        logging.warning(f"Historial: se ignoran {int(duplicados.sum())} filas con {LLAVE} repetido.")
+        df = df[~duplicados]
+    return df
+
+def huellas_filas(df):
+    """
+    Retorna:
+    pd.Series: Hash de cada fila del panel (int64), por 'soccerway_pk'.
+    """
+    huellas = pd.util.hash_pandas_object(df, index=False).to_numpy().view(np.int64)
+    return pd.Series(huellas, index=df[LLAVE].to_numpy())
+
+def a_celdas(df):
+    """
+    Pasa el panel a formato largo: una fila por celda no nula, incluida la propia llave (así
+    un jugador queda registrado aunque todas sus otras columnas estén vacías).
+
+    Parámetros:
+    df (pd.DataFrame): Panel consolidado.
+
+    Retorna:
+    pd.DataFrame: Columnas 'soccerway_pk', 'columna' y 'valor'.
+    """
+    df = sin_duplicados(df)
+    normalizado = pd.DataFrame(
+        {columna: normalizar_columna(df[columna]) for columna in df.columns if columna != LLAVE},
+        index=df.index, dtype=object,
+    )
+    normalizado.insert(0, LLAVE, df[LLAVE])
+    celdas = normalizado.melt(id_vars=[LLAVE], var_name="columna", value_name="valor")
+    celdas = celdas[celdas["valor"].notna()]
+    llaves = pd.DataFrame({LLAVE: df[LLAVE], "columna": LLAVE, "valor": df[LLAVE]})
+    return pd.concat([llaves, celdas], ignore_index=True)
+
+def asignar_ids(con, tabla, campo, nombres):
+    """
+    Devuelve el número de cada llave o columna, agregando las que no estaban.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar', dentro de una transacción.
+    tabla (str): "jugadores" o "columnas".
+    campo (str): Campo con el nombre ("soccerway_pk" o "nombre").
+    nombres (iterable): Llaves o nombres de columna.
+
+    Retorna:
+    dict: Nombre -> número.
+    """
+    con.executemany(f"INSERT OR IGNORE INTO {tabla} ({campo}) VALUES (?)", ((nombre,) for nombre in nombres))
+    return {nombre: id_ for id_, nombre in con.execute(f"SELECT id, {campo} FROM {tabla}")}
+
+def registrar_version(df, origen=None, archivo=ARCHIVO_HISTORIAL):
+    """
+    Registra el panel como una versión nueva, guardando solo las celdas que cambiaron: las
+    celdas vigentes que cambiaron o desaparecieron se cierran y las nuevas se agregan. Solo se
+    comparan las filas cuya huella cambió desde la versión anterior.
+
+    Parámetros:
+    df (pd.DataFrame): Panel consolidado.
+    origen (str): Descripción de la versión (por ejemplo, el CSV de donde salió).
+    archivo (str): Archivo SQLite del historial.
+
+    Retorna:
+    int: Número de la versión registrada.
+    """
+    columnas = [str(columna) for columna in df.columns]
+    df = sin_duplicados(df)
+    huellas = huellas_filas(df)
+    con = conectar(archivo)
+    try:
+        with con:
+            anterior = con.execute("SELECT columnas FROM versiones ORDER BY version DESC LIMIT 1").fetchone()
+            guardadas = pd.read_sql_query(f"SELECT {LLAVE}, huella FROM huellas", con).set_index(LLAVE)["huella"].astype("Int64")
+            # Sin huellas de la versión anterior (historial nuevo o de antes de las huellas) o con
+            # otras columnas, se comparan todas las filas con todas las celdas vigentes
+            completa = anterior is None or guardadas.empty or sorted(json.loads(anterior[0])) != sorted(columnas)
+            if completa:
+                revisar = pd.Series(True, index=huellas.index)
+                salieron = []
+            else:
+                revisar = (guardadas.reindex(huellas.index) != huellas).fillna(True)
+                salieron = guardadas.index.difference(huellas.index).tolist()
+
+            nuevas = a_celdas(df[revisar.to_numpy()])
+            ids = asignar_ids(con, "jugadores", LLAVE, list(nuevas[LLAVE].unique()) + salieron)
+            nuevas["jugador"] = nuevas[LLAVE].map(ids)
+            nuevas["columna"] = nuevas["columna"].map(asignar_ids(con, "columnas", "nombre", nuevas["columna"].unique()))
+
+            if completa:
+                vigentes = pd.read_sql_query("SELECT rowid, jugador, columna, valor FROM celdas WHERE hasta IS NULL", con)
+            else:
+                con.execute("CREATE TEMP TABLE IF NOT EXISTS revisar (jugador INTEGER PRIMARY KEY)")
+                con.execute("DELETE FROM revisar")
+                con.executemany("INSERT INTO revisar (jugador) VALUES (?)", ((ids[llave],) for llave in huellas.index[revisar.to_numpy()].tolist() + salieron))
+                vigentes = pd.read_sql_query("SELECT rowid, jugador, columna, valor FROM celdas WHERE hasta IS NULL AND jugador IN (SELECT jugador FROM revisar)", con)
+
+            comparacion = vigentes.merge(nuevas, on=["jugador", "columna"], how="outer", suffixes=("_anterior", ""), indicator=True)
+            distinto = comparacion["valor_anterior"].astype(object) != comparacion["valor"].astype(object)
+            cerrar = comparacion.loc[(comparacion["_merge"] == "left_only") | ((comparacion["_merge"] == "both") & distinto), "rowid"]
+            agregar = comparacion.loc[(comparacion["_merge"] == "right_only") | ((comparacion["_merge"] == "both") & distinto), ["jugador", "columna", "valor"]]
+
+            version = con.execute("SELECT COALESCE(MAX(version), 0) + 1 FROM versiones").fetchone()[0]
+            con.executemany("UPDATE celdas SET hasta = ? WHERE rowid = ?", ((version, int(rowid)) for rowid in cerrar))
+            con.executemany(
+                "INSERT INTO celdas (jugador, columna, valor, desde) VALUES (?, ?, ?, ?)",
+                ((int(jugador), int(columna), valor, version) for jugador, columna, valor in agregar.itertuples(index=False)),
+            )
+
+            if completa:
+                con.execute("DELETE FROM huellas")
+            con.executemany("DELETE FROM huellas WHERE soccerway_pk = ?", ((llave,) for llave in salieron))
+            cambiadas = huellas[revisar.to_numpy()]
+            con.executemany("INSERT OR REPLACE INTO huellas (soccerway_pk, huella) VALUES (?, ?)", zip(cambiadas.index.tolist(), cambiadas.tolist()))
+
+            con.execute(
+                "INSERT INTO versiones (version, fecha, origen, filas, columnas, celdas_cambiadas) VALUES (?, ?, ?, ?, ?, ?)",
+                (version, datetime.now().isoformat(timespec="seconds"), origen, len(df),
+                 json.dumps(columnas, ensure_ascii=False), len(cerrar) + len(agregar)),
+            )
+    finally:
+        con.close()
+
+    logging.info(f"Historial: versión {version} registrada ({int(revisar.sum())} filas revisadas, {len(agregar)} celdas nuevas o modificadas, {len(cerrar)} cerradas).")
+    return version
+
+def registrar_desde_csv(archivo_csv, archivo=ARCHIVO_HISTORIAL):
+    """
+    Registra un CSV del panel como versión nueva (también sirve para cargar las copias antiguas, en orden).
+
+    Parámetros:
+    archivo_csv (str): CSV del panel consolidado.
+    archivo (str): Archivo SQLite del historial.
+
+    Retorna:
+    int: Número de la versión registrada.
+    """
+    df = pd.read_csv(archivo_csv, dtype={LLAVE: str})
+    return registrar_version(df, origen=os.path.basename(archivo_csv), archivo=archivo)
+
+# Consultas -------------------------------------------------------------------------
+
+def listar_versiones(con):
+    """
+    Lista las versiones registradas.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+
+    Retorna:
+    pd.DataFrame: Versión, fecha, origen, filas y celdas cambiadas.
+    """
+    return pd.read_sql_query("SELECT version, fecha, origen, filas, celdas_cambiadas FROM versiones ORDER BY version", con)
+
+def ultima_version(con):
+    """
+    Retorna:
+    int: Número de la última versión, o None si el historial está vacío.
+    """
+    return con.execute("SELECT MAX(version) FROM versiones").fetchone()[0]
+
+def celdas_de_version(con, version, columnas=None, llaves=None):
+    """
+    Lee las celdas vigentes en una versión.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    version (int): Versión a leer.
+    columnas (list): Solo estas columnas del panel.
+    llaves (list): Solo estos jugadores.
+
+    Retorna:
+    pd.DataFrame: Columnas 'soccerway_pk', 'columna' y 'valor'.
+    """
+    consulta = (
+        f"SELECT j.{LLAVE}, c.nombre AS columna, valor FROM celdas "
+        f"JOIN jugadores j ON j.id = celdas.jugador JOIN columnas c ON c.id = celdas.columna "
+        f"WHERE desde <= ? AND (hasta IS NULL OR hasta > ?)"
+    )
+    parametros = [version, version]
+    for nombre, valores in [("c.nombre", columnas), (f"j.{LLAVE}", llaves)]:
+        if valores:
+            consulta += f" AND {nombre} IN ({', '.join('?' * len(valores))})"
+            parametros.extend(valores)
+    return pd.read_sql_query(consulta, con, params=parametros)
+
+def leer_version(con, version=None, columnas=None):
+    """
+    Reconstruye el panel tal como estaba en una versión.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    version (int): Versión a leer; por defecto la última.
+    columnas (list): Solo estas columnas (la llave se incluye siempre).
+
+    Retorna:
+    pd.DataFrame: Panel de esa versión, con las columnas en su orden original.
+    """
+    version = version or ultima_version(con)
+    fila = con.execute("SELECT columnas FROM versiones WHERE version = ?", (version,)).fetchone()
+    if fila is None:
+        raise ValueError(f"No existe la versión {version} en el historial.")
+
+    orden = [columna for columna in json.loads(fila[0]) if not columnas or columna in columnas or columna == LLAVE]
+    celdas = celdas_de_version(con, version, columnas=[LLAVE] + list(columnas) if columnas else None)
+    df = celdas.pivot(index=LLAVE, columns="columna", values="valor")
+    df = df.reindex(columns=[columna for columna in orden if columna != LLAVE]).reset_index()
+    return df[[columna for columna in orden if columna in df.columns]].infer_objects()
+
+def cambios_entre(con, version_desde, version_hasta, columnas=None):
+    """
+    Lista las celdas que cambiaron entre dos versiones (traspasos con la columna 'Equipo',
+    cambios de 'Valor de Mercado', minutos sumados con '2025_Minutos Jugados', etc.).
+
+    Un jugador nuevo aparece con la columna 'soccerway_pk' sin valor anterior; uno que salió
+    del panel, sin valor posterior.
+
+    Parámetros:
+    con (sqlite3.Connection): Conexión de 'conectar'.
+    version_desde (int): Versión de referencia.
+    version_hasta (int): Versión a comparar.
+    columnas (list): Solo estas columnas.
+
+    Retorna:
+    pd.DataFrame: 'soccerway_pk', 'columna', 'antes', 'despues' y 'diferencia' (solo numérica).
+    """
+    # Solo interesan las celdas que se abrieron o cerraron entre ambas versiones
+    menor, mayor = sorted((version_desde, version_hasta))
+    consulta = (
+        f"SELECT DISTINCT j.{LLAVE} FROM celdas JOIN jugadores j ON j.id = celdas.jugador JOIN columnas c ON c.id = celdas.columna "
+        f"WHERE ((desde > ? AND desde <= ?) OR (hasta > ? AND hasta <= ?))"
+    )
+    parametros = [menor, mayor, menor, mayor]
+    if columnas:
+        consulta += f" AND c.nombre IN ({', '.join('?' * len(columnas))})"
+        parametros.extend(columnas)
+    llaves = [fila[0] for fila in con.execute(consulta, parametros)]
+    if not llaves:
+        return pd.DataFrame(columns=[LLAVE, "columna", "antes", "despues", "diferencia"])
+
+    llaves = llaves if len(llaves) <= MAXIMO_LLAVES_FILTRO else None
+    antes = celdas_de_version(con, version_desde, columnas, llaves).rename(columns={"valor": "antes"})
+    despues = celdas_de_version(con, version_hasta, columnas, llaves).rename(columns={"valor": "despues"})
+    cambios = antes.merge(despues, on=[LLAVE, "columna"], how="outer")
+    cambios = cambios[cambios["antes"].astype(object) != cambios["despues"].astype(object)].copy()
+    cambios["diferencia"] = pd.to_numeric(cambios["despues"], errors="coerce") - pd.to_numeric(cambios["antes"], errors="coerce")
+    return cambios.sort_values([LLAVE, "columna"]).reset_index(drop=True)
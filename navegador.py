@@ -0,0 +1,182 @@
+import logging
+import os
+
+# Sesión de navegador para extracciones largas. Una misma página que recorre miles de perfiles
+# hace crecer la memoria de Chromium hasta que el equipo empieza a usar swap o el renderer se
+# cae. La sesión reutiliza un contexto y una página, y los reemplaza por otros nuevos cada
+# NAVEGACIONES_POR_CONTEXTO navegaciones o cuando la memoria (RSS) del proceso y sus hijos
+# (driver y procesos de Chromium) supera LIMITE_RSS_MB.
+#
+# El reciclaje se hace siempre antes de una navegación, nunca a mitad de la lectura de una
+# página, así que el trabajo en curso no se pierde: los datos ya extraídos viven en Python y
+# las cookies del contexto anterior pasan al nuevo.
+
+NAVEGACIONES_POR_CONTEXTO = 200
+LIMITE_RSS_MB = 1500
+
+# La memoria se mide cada tantas navegaciones (recorrer los procesos tiene su costo)
+MEDIR_RSS_CADA = 10
+
+def rss_mb(pid=None):
+    """
+    Mide la memoria residente (RSS) de un proceso y todos sus descendientes.
+
+    Usa psutil si está instalado; si no, lee /proc (Linux).
+
+    Parámetros:
+    pid (int): Proceso raíz; por defecto el actual.
+
+    Retorna:
+    float: Memoria en MB, o None si no se puede medir en este sistema.
+    """
+    pid = pid or os.getpid()
+    try:
+        import psutil
+    except ImportError:
+        psutil = None
+
+    if psutil is not None:
+        try:
+            proceso = psutil.Process(pid)
+            procesos = [proceso] + proceso.children(recursive=True)
+            total = 0
+            for p in procesos:
+                try:
+                    total += p.memory_info().rss
+                except psutil.Error:
+                    continue
+            return total / (1024 * 1024)
+        except psutil.Error:
+            return None
+
+    if not os.path.isdir("/proc"):
+        return None
+
+    # Padre de cada proceso, para encontrar los descendientes
+    hijos = {}
+    for entrada in os.listdir("/proc"):
+        if not entrada.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entrada}/stat", encoding="utf-8", errors="replace") as file:
+                # El nombre del proceso va entre paréntesis y puede tener espacios
+                campos = file.read().rsplit(")", 1)[1].split()
+            hijos.setdefault(int(campos[1]), []).append(int(entrada))
+        except (OSError, IndexError, ValueError):
+            continue
+
+    total = 0
+    pendientes = [pid]
+    tamano_pagina = os.sysconf("SC_PAGE_SIZE")
+    while pendientes:
+        actual = pendientes.pop()
+        pendientes.extend(hijos.get(actual, []))
+        try:
+            with open(f"/proc/{actual}/statm", encoding="utf-8") as file:
+                total += int(file.read().split()[1]) * tamano_pagina
+        except (OSError, IndexError, ValueError):
+            continue
+    return total / (1024 * 1024)
+
+class SesionNavegador:
+    """
+    Contexto y página de Playwright que se reciclan por cantidad de navegaciones o por memoria.
+
+    Uso:
+        sesion = SesionNavegador(browser, al_abrir=funcion_async_opcional)
+        page = await sesion.pagina()   # antes de cada page.goto
+        ...
+        await sesion.cerrar()
+
+    'al_abrir(page)' se llama con cada página nueva (por ejemplo, para volver a enganchar la
+    captura de respuestas de captura_red) y su resultado queda en 'sesion.datos'.
+    """
+
+    def __init__(self, browser, navegaciones_por_contexto=NAVEGACIONES_POR_CONTEXTO, limite_rss_mb=LIMITE_RSS_MB, al_abrir=None, nombre="navegador"):
+        self.browser = browser
+        self.navegaciones_por_contexto = navegaciones_por_contexto
+        self.limite_rss_mb = limite_rss_mb
+        self.al_abrir = al_abrir
+        self.nombre = nombre
+        self.context = None
+        self.page = None
+        self.datos = None
+        self.navegaciones = 0
+        self.navegaciones_contexto = 0
+        self.reciclajes = 0
+        self.rss_inicial = rss_mb()
+        self.rss_maximo = self.rss_inicial or 0
+
+    async def abrir(self, estado=None):
+        self.context = await self.browser.new_context(storage_state=estado)
+        self.page = await self.context.new_page()
+        self.datos = await self.al_abrir(self.page) if self.al_abrir else None
+        self.navegaciones_contexto = 0
+
+    async def reciclar(self, motivo):
+        """
+        Cierra el contexto actual (con su página) y abre uno nuevo.
+
+        Parámetros:
+        motivo (str): Motivo, para el log.
+        """
+        antes = rss_mb()
+        estado = None
+        if self.context is not None:
+            try:
+                # Las cookies (por ejemplo, el rechazo del aviso de cookies) pasan al contexto nuevo
+                estado = await self.context.storage_state()
+                await self.context.close()
+            except Exception as e:
+                logging.warning(f"{self.nombre}: error al cerrar el contexto: {e}")
+        await self.abrir(estado)
+        self.reciclajes += 1
+        despues = rss_mb()
+        memoria = f"{antes:.0f} MB -> {despues:.0f} MB" if antes is not None and despues is not None else "memoria no disponible"
+        logging.info(f"{self.nombre}: contexto reciclado ({motivo}) tras {self.navegaciones} navegaciones; {memoria}.")
+
+    async def pagina(self):
+        """
+        Devuelve la página para la próxima navegación, reciclando antes el contexto si llegó al
+        límite de navegaciones o de memoria.
+
+        Retorna:
+        Page: Página de Playwright.
+        """
+        if self.page is None:
+            await self.abrir()
+        elif self.navegaciones_contexto >= self.navegaciones_por_contexto:
+            await self.reciclar(f"{self.navegaciones_contexto} navegaciones")
+        elif self.limite_rss_mb and self.navegaciones % MEDIR_RSS_CADA == 0:
+            actual = rss_mb()
+            if actual is not None:
+                self.rss_maximo = max(self.rss_maximo, actual)
+                if actual > self.limite_rss_mb:
+                    await self.reciclar(f"RSS {actual:.0f} MB > {self.limite_rss_mb} MB")
+
+        self.navegaciones += 1
+        self.navegaciones_contexto += 1
+        return self.page
+
+    def resumen(self):
+        """
+        Retorna:
+        dict: Navegaciones, reciclajes y memoria inicial, máxima y actual en MB.
+        """
+        actual = rss_mb()
+        if actual is not None:
+            self.rss_maximo = max(self.rss_maximo, actual)
+        return {
+            "navegaciones": self.navegaciones,
+            "reciclajes": self.reciclajes,
+            "rss_inicial_mb": round(self.rss_inicial, 1) if self.rss_inicial is not None else None,
+            "rss_maximo_mb": round(self.rss_maximo, 1) if self.rss_inicial is not None else None,
+            "rss_final_mb": round(actual, 1) if actual is not None else None,
+        }
+
+    async def cerrar(self):
+        logging.info(f"{self.nombre}: {self.resumen()}")
+        if self.context is not None:
+            await self.context.close()
+            self.context = None
+            self.page = None
@@ -1,8 +1,7 @@
 import subprocess
 import logging
 
-# Configuración de logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+import registro
 
 ligas = {
     "primera_cl": [
@@ -97,33 +96,80 @@ ligas = {
 }
 
 
-# Ejecutar cada script secuencialmente con manejo de errores
-for liga, sitios in ligas.items():
-        
-    if liga == "primera_b_arg":
+# Fuente -> (módulo del scraper, función asíncrona que recibe la URL y el archivo de salida)
+SCRAPERS = {
+    "soccerway": ("webscraping_soccerway", "main"),
+    "transfermarkt": ("webscraping_transfermarkt", "extract_table"),
+    "besoccer": ("webscraping_besoccer", "main"),
+}
+
+def fuente_de_url(url):
+    """
+    Determina la fuente (soccerway, transfermarkt o besoccer) de una URL.
+
+    Parámetros:
+    url (str): URL del portal.
+
+    Retorna:
+    str: Nombre de la fuente, o None si no se reconoce.
+    """
+    for fuente in SCRAPERS:
+        if fuente in url:
+            return fuente
+    return None
+
+def sitios_de_ligas(ligas_a_ejecutar=None, fuentes=None):
+    """
+    Lista los sitios a extraer de las ligas y fuentes indicadas.
+
+    Parámetros:
+    ligas_a_ejecutar (list): Ligas de 'ligas'; por defecto todas.
+    fuentes (list): Fuentes a incluir; por defecto todas.
+
+    Retorna:
+    list: Tuplas (liga, fuente, url, archivo).
+    """
+    sitios = []
+    for liga in ligas_a_ejecutar or list(ligas):
+        if liga not in ligas:
+            logging.error(f"Liga no reconocida: {liga}")
+            continue
+        for sitio in ligas[liga]:
+            fuente = fuente_de_url(sitio["url"])
+            if fuente is None:
+                logging.error(f"URL no reconocida: {sitio['url']}")
+                continue
+            if fuentes and fuente not in fuentes:
+                continue
+            sitios.append((liga, fuente, sitio["url"], sitio["archivo"]))
+    return sitios
+
+def ejecutar_scraping(ligas_a_ejecutar=None):
+    """
+    Ejecuta cada scraper secuencialmente, en un proceso aparte, con manejo de errores.
+
+    Parámetros:
+    ligas_a_ejecutar (list): Ligas de 'ligas'; por defecto todas.
+    """
+    for liga, fuente, input_url, archivo_salida in sitios_de_ligas(ligas_a_ejecutar):
         logging.info(f"Ejecutando scraping para {liga}...")
 
-        for sitio in sitios:
-            input_url = sitio["url"]
-            archivo_salida = sitio["archivo"]
+        # Determinar el nombre del script a ejecutar según la fuente
+        script = ["python", f"{SCRAPERS[fuente][0]}.py", input_url, archivo_salida]
 
-            # Determinar el nombre del script a ejecutar según la liga
-            if "soccerway" in input_url:
-                script = ["python", "webscraping_soccerway.py", input_url, archivo_salida]
-            elif "transfermarkt" in input_url:
+        logging.info(f"Ejecutando {script}...")
+        try:
+            result = subprocess.run(script, capture_output=True, text=True, check=True)
+            # Los scrapers registran su avance con logging, que sale por stderr
+            logging.info(result.stdout + result.stderr)
+        except subprocess.CalledProcessError as e:
+            logging.error(f"Error en {script[1]}: {e.stderr}")
+
+    logging.info("Ejecución completada.")
 
-                script = ["python", "webscraping_transfermarkt.py", input_url, archivo_salida]
-            elif "besoccer" in input_url:
-                script = ["python", "webscraping_besoccer.py", input_url, archivo_salida]
-            else:
-                logging.error(f"URL no reconocida: {input_url}")
-                continue
 
-            logging.info(f"Ejecutando {script}...")
-            try:
-                result = subprocess.run(script, capture_output=True, text=True, check=True)
-                logging.info(result.stdout)
-            except subprocess.CalledProcessError as e:
-                logging.error(f"Error en {script[1]}: {e.stderr}")
+if __name__ == "__main__":
+    # Configuración de logging
+    registro.configurar(archivo=None)
 
-logging.info("Ejecución completada.")
\ No newline at end of file
+    ejecutar_scraping(["primera_b_arg"])
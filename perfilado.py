@@ -0,0 +1,240 @@
+import json
+import logging
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+# Medición por etapa de la limpieza (clean_data.py): tiempo, memoria y filas de entrada y
+# salida de cada paso (carga, fechas, llaves, tildes, tipos, cruces, rellenos, escritura...).
+# Al terminar se escribe un reporte JSON junto al panel ('<panel>.perfil.json') y,
+# opcionalmente, un volcado de cProfile ('<panel>.prof', se lee con 'python -m pstats' o
+# snakeviz).
+#
+# La memoria se mide como RSS del proceso al terminar cada etapa y pico del proceso hasta ese
+# momento. Con MEDIR_MEMORIA_PYTHON (o 'memoria_python=True') se usa además tracemalloc para
+# el pico de memoria reservada por Python y NumPy dentro de cada etapa; es más preciso pero
+# hace la limpieza bastante más lenta.
+#
+# Las etapas con el mismo nombre (por ejemplo, las de cada bloque del modo por bloques) se
+# acumulan: se suman tiempos y filas y se guarda el mayor pico.
+
+MEDIR_MEMORIA_PYTHON = False
+
+# Perfil en curso; sin perfil, 'etapa' no mide nada
+perfil_actual = None
+
+def rss_mb():
+    """
+    Retorna:
+    float: Memoria residente actual del proceso en MB, o None si no se puede medir.
+    """
+    try:
+        with open("/proc/self/statm", encoding="utf-8") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+def rss_pico_mb():
+    """
+    Retorna:
+    float: Pico de memoria residente del proceso en MB, o None si no se puede medir.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    # ru_maxrss está en KB en Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def redondear(valor, decimales=1):
+    return round(valor, decimales) if valor is not None else None
+
+class Perfil:
+    """
+    Mediciones de una ejecución de la limpieza.
+    """
+
+    def __init__(self, memoria_python=MEDIR_MEMORIA_PYTHON, cprofile=False):
+        self.memoria_python = memoria_python
+        self.inicio = time.perf_counter()
+        self.etapas = {}
+        self.datos = {}
+        self.pila = []
+        self.cprofile = None
+        if memoria_python:
+            tracemalloc.start()
+        if cprofile:
+            import cProfile
+            self.cprofile = cProfile.Profile()
+            self.cprofile.enable()
+
+    def registrar(self, nombre, segundos, filas_entrada, filas_salida, pico_python):
+        registro = self.etapas.setdefault(nombre, {
+            "llamadas": 0, "segundos": 0.0, "filas_entrada": None, "filas_salida": None,
+            "rss_mb": None, "rss_pico_mb": None, "pico_python_mb": None,
+        })
+        registro["llamadas"] += 1
+        registro["segundos"] += segundos
+        for campo, filas in (("filas_entrada", filas_entrada), ("filas_salida", filas_salida)):
+            if filas is not None:
+                registro[campo] = (registro[campo] or 0) + filas
+        registro["rss_mb"] = max(filter(None, [registro["rss_mb"], rss_mb()]), default=None)
+        registro["rss_pico_mb"] = rss_pico_mb()
+        if pico_python is not None:
+            registro["pico_python_mb"] = max(registro["pico_python_mb"] or 0, pico_python / (1024 * 1024))
+
+    def reporte(self):
+        """
+        Retorna:
+        dict: Reporte de la ejecución, con las etapas de la más lenta a la más rápida.
+        """
+        total = time.perf_counter() - self.inicio
+        etapas = []
+        for nombre, registro in sorted(self.etapas.items(), key=lambda item: -item[1]["segundos"]):
+            etapas.append({
+                "etapa": nombre,
+                **registro,
+                "segundos": round(registro["segundos"], 4),
+                "porcentaje": round(100 * registro["segundos"] / total, 1) if total else 0.0,
+                "rss_mb": redondear(registro["rss_mb"]),
+                "rss_pico_mb": redondear(registro["rss_pico_mb"]),
+                "pico_python_mb": redondear(registro["pico_python_mb"]),
+            })
+        return {
+            "segundos_totales": round(total, 4),
+            "rss_pico_mb": redondear(rss_pico_mb()),
+            "etapas": etapas,
+            **self.datos,
+        }
+
+    def terminar(self, archivo_reporte, archivo_cprofile=None):
+        """
+        Detiene las mediciones y escribe el reporte JSON (y el volcado de cProfile si se pidió).
+
+        Parámetros:
+        archivo_reporte (str): Archivo JSON del reporte.
+        archivo_cprofile (str): Archivo del volcado de cProfile.
+
+        Retorna:
+        dict: El reporte escrito.
+        """
+        if self.cprofile is not None:
+            self.cprofile.disable()
+            if archivo_cprofile:
+                self.cprofile.dump_stats(archivo_cprofile)
+                logging.info(f"Perfil de cProfile guardado en {archivo_cprofile}.")
+        if self.memoria_python:
+            tracemalloc.stop()
+
+        reporte = self.reporte()
+        with open(archivo_reporte, "w", encoding="utf-8") as file:
+            json.dump(reporte, file, ensure_ascii=False, indent=2, default=str)
+
+        resumen = ", ".join(f"{etapa['etapa']} {etapa['segundos']:.2f}s" for etapa in reporte["etapas"][:5])
+        logging.info(f"Limpieza en {reporte['segundos_totales']:.2f}s (pico {reporte['rss_pico_mb']} MB); etapas más lentas: {resumen}. Detalle en {archivo_reporte}.")
+        return reporte
+
+class Medicion:
+    """
+    Etapa en curso; 'salida(df)' registra las filas que produjo.
+    """
+
+    def __init__(self, filas_entrada):
+        self.filas_entrada = filas_entrada
+        self.filas_salida = None
+        self.pico_python = None
+
+    def salida(self, df):
+        self.filas_salida = len(df) if df is not None else None
+        return df
+
+def contar_filas(entrada):
+    if entrada is None:
+        return None
+    if isinstance(entrada, int):
+        return entrada
+    if isinstance(entrada, (list, tuple)):
+        return sum(len(df) for df in entrada if df is not None)
+    return len(entrada)
+
+@contextmanager
+def etapa(nombre, entrada=None):
+    """
+    Mide una etapa de la limpieza.
+
+    Uso:
+        with perfilado.etapa("fechas_soccerway", df) as medicion:
+            df = formatear_fechas_soccerway(df, "Fecha de nacimiento")
+            medicion.salida(df)
+
+    Parámetros:
+    nombre (str): Nombre de la etapa en el reporte.
+    entrada: DataFrame, lista de DataFrame o cantidad de filas de entrada.
+    """
+    perfil = perfil_actual
+    medicion = Medicion(contar_filas(entrada) if perfil is not None else None)
+    if perfil is None:
+        yield medicion
+        return
+
+    if perfil.memoria_python:
+        # El pico acumulado de la etapa que contiene a esta se guarda antes de reiniciarlo
+        if perfil.pila:
+            padre = perfil.pila[-1]
+            padre.pico_python = max(padre.pico_python or 0, tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    perfil.pila.append(medicion)
+    inicio = time.perf_counter()
+    try:
+        yield medicion
+    finally:
+        segundos = time.perf_counter() - inicio
+        perfil.pila.pop()
+        if perfil.memoria_python:
+            medicion.pico_python = max(medicion.pico_python or 0, tracemalloc.get_traced_memory()[1])
+            if perfil.pila:
+                padre = perfil.pila[-1]
+                padre.pico_python = max(padre.pico_python or 0, medicion.pico_python)
+        perfil.registrar(nombre, segundos, medicion.filas_entrada, medicion.filas_salida, medicion.pico_python)
+
+def registrar_dato(nombre, valor):
+    """
+    Agrega un dato al reporte (por ejemplo, las tasas de cruce entre fuentes).
+    """
+    if perfil_actual is not None:
+        perfil_actual.datos[nombre] = valor
+
+def iniciar(memoria_python=MEDIR_MEMORIA_PYTHON, cprofile=False):
+    """
+    Comienza a medir las etapas.
+
+    Parámetros:
+    memoria_python (bool): Medir el pico de memoria de cada etapa con tracemalloc.
+    cprofile (bool): Perfilar además con cProfile.
+
+    Retorna:
+    Perfil: El perfil en curso.
+    """
+    global perfil_actual
+    perfil_actual = Perfil(memoria_python=memoria_python, cprofile=cprofile)
+    return perfil_actual
+
+def terminar(archivo_reporte, archivo_cprofile=None):
+    """
+    Termina el perfil en curso y escribe su reporte.
+
+    Retorna:
+    dict: El reporte, o None si no había un perfil en curso.
+    """
+    global perfil_actual
+    perfil, perfil_actual = perfil_actual, None
+    if perfil is None:
+        return None
+    return perfil.terminar(archivo_reporte, archivo_cprofile)
+
+def archivo_reporte(archivo_csv):
+    return archivo_csv[:-4] + ".perfil.json" if archivo_csv.endswith(".csv") else archivo_csv + ".perfil.json"
+
+def archivo_cprofile(archivo_csv):
+    return archivo_csv[:-4] + ".prof" if archivo_csv.endswith(".csv") else archivo_csv + ".prof"
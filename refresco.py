@@ -0,0 +1,216 @@
+import csv
+import json
+import logging
+import os
+import time
+from datetime import date, datetime
+from urllib.parse import urlparse
+
+# Refresco de perfiles de jugadores con un tiempo máximo. Una extracción completa toma horas;
+# cuando hay poco tiempo (por ejemplo, 20 minutos antes de una reunión) los perfiles se
+# visitan en orden de prioridad hasta que se acaba el tiempo y el resto queda marcado como
+# pendiente para la próxima ejecución.
+#
+# La prioridad de cada perfil combina, con los pesos de PESOS:
+# - minutos: minutos jugados en la temporada actual (MINUTOS_TEMPORADA) según el panel, como
+#   fracción del máximo del panel.
+# - traspaso: 1 si fichó hace menos de DIAS_TRASPASO_RECIENTE días, si cambió de equipo entre
+#   temporadas o si el jugador no está en el panel (recién llegado a la plantilla).
+# - antiguedad: días desde el último refresco como fracción de DIAS_ANTIGUEDAD_MAXIMA (1 si
+#   nunca se refrescó).
+#
+# La fecha del último refresco de cada perfil se guarda en ARCHIVO_ESTADO, por URL.
+
+ARCHIVO_ESTADO = "refresco_jugadores.json"
+
+PESOS = {"minutos": 1.0, "traspaso": 1.0, "antiguedad": 1.0}
+MINUTOS_TEMPORADA = "2025_Minutos Jugados"
+EQUIPO_TEMPORADA = "2025_Equipo"
+EQUIPO_TEMPORADA_ANTERIOR = "2024_Equipo"
+DIAS_TRASPASO_RECIENTE = 60
+DIAS_ANTIGUEDAD_MAXIMA = 30
+
+def llave_url(url):
+    """
+    Llave de una URL de perfil, sin el dominio (el mismo perfil aparece como es. y el.soccerway.com).
+
+    Parámetros:
+    url (str): URL del perfil.
+
+    Retorna:
+    str: Ruta de la URL sin la barra final.
+    """
+    return urlparse(str(url).strip()).path.rstrip("/")
+
+def leer_fecha(texto):
+    """
+    Lee una fecha 'dd/mm/aaaa' o 'aaaa-mm-dd'.
+
+    Retorna:
+    date: La fecha, o None si no se reconoce.
+    """
+    texto = str(texto or "").strip()[:10]
+    for formato in ("%d/%m/%Y", "%Y-%m-%d"):
+        try:
+            return datetime.strptime(texto, formato).date()
+        except ValueError:
+            continue
+    return None
+
+def leer_numero(texto):
+    try:
+        return float(texto)
+    except (TypeError, ValueError):
+        return 0.0
+
+def datos_panel(archivo_csv, columna_url="URL"):
+    """
+    Lee del panel los datos que usa la prioridad, por URL del perfil.
+
+    Parámetros:
+    archivo_csv (str): CSV del panel.
+    columna_url (str): Columna con la URL del perfil.
+
+    Retorna:
+    dict: llave_url -> {"minutos", "fichado", "cambio_equipo"}. Vacío si no existe el panel.
+    """
+    if not os.path.exists(archivo_csv):
+        logging.warning(f"No existe el panel {archivo_csv}; la prioridad solo considera la antigüedad del refresco.")
+        return {}
+
+    datos = {}
+    with open(archivo_csv, newline="", encoding="utf-8") as file:
+        for fila in csv.DictReader(file):
+            if not fila.get(columna_url):
+                continue
+            anterior = (fila.get(EQUIPO_TEMPORADA_ANTERIOR) or "").strip()
+            actual = (fila.get(EQUIPO_TEMPORADA) or "").strip()
+            datos[llave_url(fila[columna_url])] = {
+                "minutos": leer_numero(fila.get(MINUTOS_TEMPORADA)),
+                "fichado": leer_fecha(fila.get("Fichado")),
+                "cambio_equipo": bool(anterior and actual and anterior != actual),
+            }
+    return datos
+
+def cargar_estado(archivo=ARCHIVO_ESTADO):
+    if not os.path.exists(archivo):
+        return {}
+    try:
+        with open(archivo, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        logging.warning(f"No se pudo leer {archivo} ({e}); se considera que ningún perfil fue refrescado.")
+        return {}
+
+def guardar_estado(estado, archivo=ARCHIVO_ESTADO):
+    # Se escribe en un archivo temporal y se reemplaza, para no dejarlo a medias
+    temporal = f"{archivo}.tmp"
+    with open(temporal, "w", encoding="utf-8") as file:
+        json.dump(estado, file, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporal, archivo)
+
+def prioridad(url, panel, estado, hoy=None, minutos_maximos=None):
+    """
+    Calcula la prioridad de refresco de un perfil.
+
+    Parámetros:
+    url (str): URL del perfil.
+    panel (dict): Resultado de datos_panel.
+    estado (dict): Resultado de cargar_estado.
+    hoy (date): Fecha de referencia; por defecto hoy.
+    minutos_maximos (float): Máximo de minutos del panel; se calcula si no se indica.
+
+    Retorna:
+    float: Prioridad; mayor se refresca antes.
+    """
+    hoy = hoy or date.today()
+    if minutos_maximos is None:
+        minutos_maximos = max((dato["minutos"] for dato in panel.values()), default=0)
+
+    llave = llave_url(url)
+    dato = panel.get(llave)
+    if dato is None:
+        minutos, traspaso = 0.0, 1.0
+    else:
+        minutos = min(dato["minutos"] / minutos_maximos, 1.0) if minutos_maximos > 0 else 0.0
+        reciente = dato["fichado"] is not None and 0 <= (hoy - dato["fichado"]).days <= DIAS_TRASPASO_RECIENTE
+        traspaso = 1.0 if reciente or dato["cambio_equipo"] else 0.0
+
+    refrescado = leer_fecha(estado.get(llave, {}).get("refrescado"))
+    antiguedad = 1.0 if refrescado is None else min(max((hoy - refrescado).days, 0) / DIAS_ANTIGUEDAD_MAXIMA, 1.0)
+
+    return PESOS["minutos"] * minutos + PESOS["traspaso"] * traspaso + PESOS["antiguedad"] * antiguedad
+
+def ordenar_por_prioridad(urls, panel, estado, hoy=None):
+    """
+    Ordena las URL de perfiles de mayor a menor prioridad (a igual prioridad, en el orden dado).
+
+    Retorna:
+    list: URL ordenadas, sin repetidas.
+    """
+    minutos_maximos = max((dato["minutos"] for dato in panel.values()), default=0)
+    unicas = list(dict.fromkeys(urls))
+    return sorted(unicas, key=lambda url: -prioridad(url, panel, estado, hoy, minutos_maximos))
+
+def marcar_refrescado(estado, url, cuando=None):
+    estado[llave_url(url)] = {"refrescado": (cuando or date.today()).isoformat(), "pendiente": False}
+
+def marcar_pendientes(estado, urls):
+    """
+    Marca como pendientes los perfiles que no alcanzaron a refrescarse, conservando la fecha
+    de su último refresco.
+    """
+    for url in urls:
+        estado.setdefault(llave_url(url), {"refrescado": None})["pendiente"] = True
+
+def pendientes(estado):
+    return [llave for llave, dato in estado.items() if dato.get("pendiente")]
+
+class Presupuesto:
+    """
+    Tiempo máximo de una extracción, medido con reloj de pared desde su creación.
+    Sin segundos (None) el presupuesto no se agota nunca.
+    """
+
+    def __init__(self, segundos=None):
+        self.segundos = segundos
+        self.limite = time.monotonic() + segundos if segundos is not None else None
+
+    def restante(self):
+        if self.limite is None:
+            return float("inf")
+        return max(self.limite - time.monotonic(), 0.0)
+
+    def agotado(self):
+        return self.restante() <= 0
+
+def reemplazar_filas(archivo, filas, columna="URL"):
+    """
+    Reescribe un CSV de extracción reemplazando las filas de los perfiles refrescados: se
+    quitan las filas anteriores con la misma URL y se agregan las nuevas al final.
+
+    Parámetros:
+    archivo (str): CSV de salida del scraper.
+    filas (list): Filas nuevas (dict) con la columna 'columna'.
+    columna (str): Columna con la URL del perfil.
+    """
+    if not filas:
+        return
+    refrescadas = {llave_url(fila[columna]) for fila in filas}
+    anteriores, encabezado = [], []
+    if os.path.exists(archivo):
+        with open(archivo, newline="", encoding="utf-8") as file:
+            lector = csv.DictReader(file)
+            encabezado = list(lector.fieldnames or [])
+            anteriores = [fila for fila in lector if llave_url(fila.get(columna, "")) not in refrescadas]
+
+    for fila in filas:
+        encabezado.extend(campo for campo in fila if campo not in encabezado)
+
+    temporal = f"{archivo}.tmp"
+    with open(temporal, "w", newline="", encoding="utf-8") as file:
+        writer = csv.DictWriter(file, fieldnames=encabezado, restval="")
+        writer.writeheader()
+        writer.writerows(anteriores)
+        writer.writerows(filas)
+    os.replace(temporal, archivo)
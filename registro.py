@@ -0,0 +1,162 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import queue
+
+# Configuración única del logging de todos los módulos (etlconcon, scrapers, limpieza,
+# publicación). Los módulos siguen usando logging.info/warning/... como siempre; lo que cambia
+# es dónde terminan los registros:
+# - El logger raíz tiene un solo manejador, un QueueHandler, que deja cada registro en una cola
+#   en memoria y vuelve de inmediato: escribir el archivo o la consola no frena la extracción
+#   ni la limpieza.
+# - Un hilo aparte (QueueListener) saca los registros de la cola y es el único que escribe en
+#   el archivo y en la consola, así los hilos de un proceso no compiten por el archivo. Cada
+#   script que se ejecuta como proceso aparte usa su propio archivo (ver ARCHIVO en cada uno).
+# - El nivel se puede fijar por módulo (NIVELES_MODULO o '--log-modulo captura_red=DEBUG'):
+#   el filtro se aplica antes de encolar, así los mensajes descartados no cuestan nada.
+# - Con json_lineas=True cada registro se escribe como una línea JSON (fecha, nivel, módulo,
+#   función, mensaje y excepción), para leerlos con jq o cargarlos en otra herramienta.
+#
+# La cola se vacía al terminar el proceso (atexit), así no se pierden los últimos mensajes.
+
+FORMATO = "%(asctime)s - %(levelname)s - %(message)s"
+NIVEL = "INFO"
+
+# Nivel por módulo (nombre del archivo sin '.py'); el resto usa NIVEL
+NIVELES_MODULO = {}
+
+# Hilo que escribe los registros; None si el logging no está configurado con este módulo
+oyente = None
+
+class FiltroModulo(logging.Filter):
+    """
+    Deja pasar los registros según el nivel de su módulo.
+    """
+
+    def __init__(self, nivel, niveles):
+        super().__init__()
+        self.nivel = nivel
+        self.niveles = niveles
+
+    def filter(self, record):
+        return record.levelno >= self.niveles.get(record.module, self.nivel)
+
+class FormatoJson(logging.Formatter):
+    """
+    Escribe cada registro como una línea JSON.
+    """
+
+    def format(self, record):
+        datos = {
+            "fecha": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "nivel": record.levelname,
+            "modulo": record.module,
+            "funcion": record.funcName,
+            "mensaje": record.getMessage(),
+        }
+        if record.exc_info:
+            datos["excepcion"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            datos["excepcion"] = record.exc_text
+        return json.dumps(datos, ensure_ascii=False, default=str)
+
+class ManejadorCola(logging.handlers.QueueHandler):
+    """
+    QueueHandler que deja el mensaje armado antes de encolarlo, pero sin mezclar la excepción
+    con el mensaje: la escribe después el formato de cada manejador (texto o JSON).
+    """
+
+    def prepare(self, record):
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def leer_nivel(nivel):
+    """
+    Convierte "DEBUG", "info", 20, etc. al número de nivel de logging.
+    """
+    if isinstance(nivel, int):
+        return nivel
+    numero = logging.getLevelName(str(nivel).upper())
+    if not isinstance(numero, int):
+        raise ValueError(f"Nivel de logging no reconocido: {nivel}")
+    return numero
+
+def leer_niveles_modulo(valores):
+    """
+    Lee opciones "modulo=NIVEL" de la línea de comandos.
+
+    Parámetros:
+    valores (list): Textos "modulo=NIVEL".
+
+    Retorna:
+    dict: Módulo -> nivel.
+    """
+    niveles = {}
+    for valor in valores or []:
+        modulo, separador, nivel = valor.partition("=")
+        if not separador or not modulo.strip():
+            raise ValueError(f"Se esperaba 'modulo=NIVEL': {valor}")
+        niveles[modulo.strip().removesuffix(".py")] = nivel.strip()
+    return niveles
+
+def configurar(archivo="app.log", nivel=NIVEL, niveles_modulo=None, json_lineas=False, consola=True):
+    """
+    Configura el logging del proceso con una cola y un hilo escritor. Se puede volver a
+    llamar: la configuración anterior se detiene y se reemplaza.
+
+    Parámetros:
+    archivo (str): Archivo de log (se agrega al final); None para no escribir archivo.
+    nivel (str|int): Nivel de los módulos sin nivel propio.
+    niveles_modulo (dict): Módulo -> nivel; se suma a NIVELES_MODULO.
+    json_lineas (bool): Escribir cada registro como una línea JSON.
+    consola (bool): Mostrar además los registros en la consola.
+    """
+    global oyente
+    detener()
+
+    nivel = leer_nivel(nivel)
+    niveles = {modulo: leer_nivel(valor) for modulo, valor in {**NIVELES_MODULO, **(niveles_modulo or {})}.items()}
+
+    formato = FormatoJson() if json_lineas else logging.Formatter(FORMATO)
+    manejadores = []
+    if consola:
+        manejadores.append(logging.StreamHandler())
+    if archivo:
+        manejadores.append(logging.FileHandler(archivo, mode="a", encoding="utf-8"))
+    for manejador in manejadores:
+        manejador.setFormatter(formato)
+
+    cola = queue.SimpleQueue()
+    manejador_cola = ManejadorCola(cola)
+    manejador_cola.addFilter(FiltroModulo(nivel, niveles))
+
+    raiz = logging.getLogger()
+    for anterior in raiz.handlers[:]:
+        raiz.removeHandler(anterior)
+        anterior.close()
+    raiz.addHandler(manejador_cola)
+    # El logger raíz deja pasar el nivel más bajo pedido; el filtro aplica el de cada módulo
+    raiz.setLevel(min([nivel, *niveles.values()]))
+
+    oyente = logging.handlers.QueueListener(cola, *manejadores)
+    oyente.start()
+
+def detener():
+    """
+    Escribe los registros pendientes de la cola y detiene el hilo escritor.
+    """
+    global oyente
+    if oyente is None:
+        return
+    anterior, oyente = oyente, None
+    anterior.stop()
+    for manejador in anterior.handlers:
+        manejador.close()
+
+atexit.register(detener)
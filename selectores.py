@@ -0,0 +1,133 @@
+import json
+import logging
+import os
+
+# Detección de las tablas de las páginas por su estructura, con caché por liga. Los ids de las
+# tablas cambian según la liga (en Soccerway la tabla de posiciones de Chile es
+# '..._tables_12_...' y la de Argentina '..._tables_13_...'), y un id equivocado dejaba la
+# extracción sin equipos después de abrir el navegador.
+#
+# En lugar de un id fijo se busca, entre las tablas de la página, la que tiene más filas con
+# el enlace esperado (ESTRUCTURAS: filas 'tr.team_rank' con enlace al equipo, filas con enlaces
+# a '/players/', etc.). El selector encontrado se guarda en ARCHIVO_CACHE por URL de la liga;
+# las ejecuciones siguientes lo usan directamente y solo vuelven a detectar si deja de
+# encontrar al menos MINIMO_FILAS filas.
+
+ARCHIVO_CACHE = "selectores_ligas.json"
+
+# Estructura de cada tabla: selector de las filas y del enlace que debe tener cada fila (los
+# scrapers leen las filas con estos mismos selectores)
+ESTRUCTURAS = {
+    "soccerway_liga": {"filas": "tr.team_rank", "enlaces": "td.text.team.large-link a"},
+    "soccerway_plantilla": {"filas": "tr", "enlaces": "a[href^='/players/']"},
+    "besoccer_liga": {"filas": "tr.row-body", "enlaces": "td.name a[data-cy='team']"},
+}
+
+MINIMO_FILAS = 2
+
+# Cuenta las filas con enlace de cada tabla de la página y arma un selector único para la
+# mejor: su id, o la ruta de 'nth-of-type' desde el ancestro más cercano con id
+JS_DETECTAR_TABLA = """
+([filas, enlaces]) => {
+    const ruta = (elemento) => {
+        const partes = [];
+        while (elemento && elemento.nodeType === 1 && elemento !== document.body) {
+            if (elemento.id) {
+                partes.unshift("#" + CSS.escape(elemento.id));
+                return partes.join(" > ");
+            }
+            let posicion = 1;
+            for (let hermano = elemento.previousElementSibling; hermano; hermano = hermano.previousElementSibling) {
+                if (hermano.tagName === elemento.tagName) posicion++;
+            }
+            partes.unshift(`${elemento.tagName.toLowerCase()}:nth-of-type(${posicion})`);
+            elemento = elemento.parentElement;
+        }
+        return ["body", ...partes].join(" > ");
+    };
+    let mejor = null, cantidad = 0;
+    for (const tabla of document.querySelectorAll("table")) {
+        const validas = [...tabla.querySelectorAll(filas)].filter(fila => fila.querySelector(enlaces)).length;
+        if (validas > cantidad) {
+            mejor = tabla;
+            cantidad = validas;
+        }
+    }
+    return mejor ? {selector: ruta(mejor), filas: cantidad} : null;
+}
+"""
+
+JS_CONTAR_FILAS = """
+([selector, filas, enlaces]) => {
+    const tabla = document.querySelector(selector);
+    if (!tabla) return 0;
+    return [...tabla.querySelectorAll(filas)].filter(fila => fila.querySelector(enlaces)).length;
+}
+"""
+
+def cargar_cache(archivo=ARCHIVO_CACHE):
+    if not os.path.exists(archivo):
+        return {}
+    try:
+        with open(archivo, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        logging.warning(f"No se pudo leer {archivo} ({e}); los selectores se vuelven a detectar.")
+        return {}
+
+def guardar_cache(cache, archivo=ARCHIVO_CACHE):
+    # Se escribe en un archivo temporal y se reemplaza, para no dejarlo a medias
+    temporal = f"{archivo}.tmp"
+    with open(temporal, "w", encoding="utf-8") as file:
+        json.dump(cache, file, ensure_ascii=False, indent=1, sort_keys=True)
+    os.replace(temporal, archivo)
+
+async def detectar_tabla(page, estructura):
+    """
+    Busca la tabla de la página con más filas de la estructura indicada.
+
+    Args:
+        page: Página de Playwright ya cargada.
+        estructura (str): Clave de ESTRUCTURAS.
+
+    Returns:
+        tuple: (selector de la tabla, cantidad de filas), o (None, 0) si ninguna tabla tiene filas.
+    """
+    datos = ESTRUCTURAS[estructura]
+    resultado = await page.evaluate(JS_DETECTAR_TABLA, [datos["filas"], datos["enlaces"]])
+    if not resultado:
+        return None, 0
+    return resultado["selector"], resultado["filas"]
+
+async def selector_tabla(page, liga, estructura, cache, archivo=ARCHIVO_CACHE):
+    """
+    Devuelve el selector de una tabla de la liga: el de la caché si todavía encuentra filas,
+    o uno detectado por estructura, que se guarda en la caché.
+
+    Args:
+        page: Página de Playwright ya cargada.
+        liga (str): URL de la liga (llave de la caché).
+        estructura (str): Clave de ESTRUCTURAS.
+        cache (dict): Caché de cargar_cache (se actualiza).
+        archivo (str): Archivo de la caché.
+
+    Returns:
+        str: Selector de la tabla, o None si no se encontró ninguna con la estructura.
+    """
+    datos = ESTRUCTURAS[estructura]
+    guardado = cache.get(liga, {}).get(estructura)
+    if guardado:
+        filas = await page.evaluate(JS_CONTAR_FILAS, [guardado, datos["filas"], datos["enlaces"]])
+        if filas >= MINIMO_FILAS:
+            return guardado
+        logging.warning(f"El selector guardado de {estructura} para {liga} ya no encuentra filas ({guardado}); se vuelve a detectar.")
+
+    selector, filas = await detectar_tabla(page, estructura)
+    if selector is None or filas < MINIMO_FILAS:
+        logging.warning(f"No se encontró una tabla de {estructura} en {page.url}.")
+        return None
+
+    cache.setdefault(liga, {})[estructura] = selector
+    guardar_cache(cache, archivo)
+    logging.info(f"Tabla de {estructura} detectada para {liga}: {selector} ({filas} filas).")
+    return selector
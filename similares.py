@@ -0,0 +1,240 @@
+import logging
+import time
+
+import numpy as np
+
+# Índice de "jugadores similares". Para cada grupo de posición se arma una matriz NumPy con los
+# atributos de BeSoccer y los minutos y goles de la temporada, estandarizada por columna (cada
+# atributo pesa lo mismo), y se guarda en un archivo .npz. Una consulta calcula la distancia del
+# jugador a todo su grupo en una sola operación vectorizada y toma los k más cercanos.
+#
+# BeSoccer no publica todos los atributos de todos los jugadores (vienen vacíos o en 0). Un
+# atributo faltante se reemplaza por la mediana del grupo antes de estandarizar, así no pesa
+# en la distancia como si el jugador tuviera el peor valor posible.
+
+ARCHIVO_INDICE = "similares.npz"
+
+TEMPORADA_ESTADISTICAS = "2025"
+
+ATRIBUTOS_CAMPO = ["ELO", "Ritmo", "Tiro", "Pase", "Regate", "Defensa", "Físico"]
+ATRIBUTOS_PORTERO = ["ELO", "Salto", "Estirada", "Paradas", "Saques", "Colocación", "Reflejos"]
+
+# Posición de soccerway -> atributos de su grupo. Las posiciones que no están aquí van al grupo "Otros".
+GRUPOS_POSICION = {
+    "Portero": ATRIBUTOS_PORTERO,
+    "Defensa": ATRIBUTOS_CAMPO,
+    "Centrocampista": ATRIBUTOS_CAMPO,
+    "Delantero": ATRIBUTOS_CAMPO,
+}
+GRUPO_OTROS = "Otros"
+
+# Columnas del panel que se guardan para filtrar las consultas
+COLUMNAS_FILTRO = {
+    "liga": f"{TEMPORADA_ESTADISTICAS}_Liga",
+    "edad": "Edad",
+    "valor": "Valor de Mercado",
+}
+
+def columnas_necesarias():
+    """
+    Lista las columnas del panel que usa el índice, para leer solo esas del CSV.
+
+    Retorna:
+    list: Nombres de columnas.
+    """
+    atributos = sorted(set(ATRIBUTOS_CAMPO) | set(ATRIBUTOS_PORTERO))
+    estadisticas = [f"{TEMPORADA_ESTADISTICAS}_Minutos Jugados", f"{TEMPORADA_ESTADISTICAS}_Gol"]
+    return ["soccerway_pk", "Posición"] + atributos + estadisticas + list(COLUMNAS_FILTRO.values())
+
+def matriz_de_grupo(df, atributos):
+    """
+    Arma la matriz de características de un grupo: atributos, log de minutos y goles por 90 minutos.
+    Los atributos faltantes (vacíos o <= 0) toman la mediana de los que sí tiene el grupo.
+
+    Parámetros:
+    df (pd.DataFrame): Jugadores del grupo.
+    atributos (list): Atributos de BeSoccer del grupo.
+
+    Retorna:
+    tuple: (matriz float64, nombres de las columnas).
+    """
+    minutos = df[f"{TEMPORADA_ESTADISTICAS}_Minutos Jugados"].to_numpy(dtype="float64")
+    goles = df[f"{TEMPORADA_ESTADISTICAS}_Gol"].to_numpy(dtype="float64")
+    goles_90 = np.divide(goles * 90, minutos, out=np.zeros_like(goles), where=minutos > 0)
+
+    valores = df[atributos].to_numpy(dtype="float64")
+    valores[~(valores > 0)] = np.nan
+    # Un atributo que no tiene ningún jugador del grupo queda en 0 (constante: no pesa en la distancia)
+    medianas = np.zeros(valores.shape[1])
+    presentes = ~np.isnan(valores).all(axis=0)
+    medianas[presentes] = np.nanmedian(valores[:, presentes], axis=0)
+    valores = np.where(np.isnan(valores), medianas, valores)
+
+    matriz = np.column_stack([valores, np.log1p(minutos), goles_90])
+    return matriz, atributos + ["log_minutos", "goles_90"]
+
+def construir_indice(df):
+    """
+    Construye el índice de similares desde el panel consolidado.
+
+    Solo entran los jugadores con algún atributo de BeSoccer: sin atributos, todos quedarían
+    iguales entre sí.
+
+    Parámetros:
+    df (pd.DataFrame): Panel con las columnas de 'columnas_necesarias'.
+
+    Retorna:
+    dict: Grupo -> {"llaves", "matriz", "media", "desviacion", "columnas", "liga", "edad", "valor"}.
+    """
+    indice = {}
+    grupos = df["Posición"].map(lambda posicion: posicion if posicion in GRUPOS_POSICION else GRUPO_OTROS)
+
+    for grupo in grupos.unique():
+        atributos = GRUPOS_POSICION.get(grupo, ATRIBUTOS_CAMPO)
+        df_grupo = df[grupos == grupo]
+        df_grupo = df_grupo[(df_grupo[atributos] > 0).any(axis=1)]
+        if df_grupo.empty:
+            continue
+
+        matriz, columnas = matriz_de_grupo(df_grupo, atributos)
+        media = matriz.mean(axis=0)
+        desviacion = matriz.std(axis=0)
+        desviacion[desviacion == 0] = 1.0
+
+        indice[grupo] = {
+            "llaves": df_grupo["soccerway_pk"].astype(str).to_numpy(dtype=str),
+            "matriz": ((matriz - media) / desviacion).astype("float32"),
+            "media": media,
+            "desviacion": desviacion,
+            "columnas": np.array(columnas),
+            "liga": df_grupo[COLUMNAS_FILTRO["liga"]].fillna("").astype(str).to_numpy(dtype=str),
+            "edad": df_grupo[COLUMNAS_FILTRO["edad"]].fillna(0).to_numpy(dtype="int32"),
+            "valor": df_grupo[COLUMNAS_FILTRO["valor"]].fillna(0).to_numpy(dtype="int64"),
+        }
+        logging.info(f"Índice de similares: grupo {grupo} con {len(df_grupo)} jugadores.")
+    return indice
+
+def guardar_indice(indice, archivo=ARCHIVO_INDICE):
+    """
+    Guarda el índice en un archivo .npz (sin pickle: solo arreglos numéricos y de texto).
+
+    Parámetros:
+    indice (dict): Resultado de 'construir_indice'.
+    archivo (str): Archivo de destino.
+    """
+    arreglos = {"grupos": np.array(list(indice))}
+    for i, datos in enumerate(indice.values()):
+        for campo, valor in datos.items():
+            arreglos[f"{i}_{campo}"] = valor
+    with open(archivo, "wb") as file:
+        np.savez(file, **arreglos)
+    logging.info(f"Índice de similares guardado en {archivo}.")
+
+def cargar_indice(archivo=ARCHIVO_INDICE):
+    """
+    Carga el índice guardado con 'guardar_indice'.
+
+    Parámetros:
+    archivo (str): Archivo .npz.
+
+    Retorna:
+    dict: Grupo -> datos del grupo, más "_posicion": llave -> (grupo, fila).
+    """
+    with np.load(archivo, allow_pickle=False) as arreglos:
+        grupos = [str(grupo) for grupo in arreglos["grupos"]]
+        indice = {}
+        for i, grupo in enumerate(grupos):
+            prefijo = f"{i}_"
+            indice[grupo] = {nombre[len(prefijo):]: arreglos[nombre] for nombre in arreglos.files if nombre.startswith(prefijo)}
+
+    indice["_posicion"] = {
+        llave: (grupo, fila)
+        for grupo in grupos
+        for fila, llave in enumerate(indice[grupo]["llaves"].tolist())
+    }
+    return indice
+
+def actualizar_desde_csv(archivo_csv, archivo=ARCHIVO_INDICE):
+    """
+    Reconstruye y guarda el índice leyendo del panel solo las columnas necesarias.
+
+    Parámetros:
+    archivo_csv (str): CSV del panel consolidado.
+    archivo (str): Archivo .npz de destino.
+    """
+    import pandas as pd
+
+    columnas = columnas_necesarias()
+    df = pd.read_csv(archivo_csv, usecols=lambda columna: columna in columnas)
+    faltantes = [columna for columna in columnas if columna not in df.columns]
+    if faltantes:
+        logging.warning(f"No se construye el índice de similares: faltan las columnas {faltantes}.")
+        return
+    guardar_indice(construir_indice(df), archivo)
+
+def buscar_similares(indice, soccerway_pk, k=10, ligas=None, edad_min=None, edad_max=None, valor_min=None, valor_max=None):
+    """
+    Busca los k jugadores más parecidos a uno dado, dentro de su grupo de posición.
+
+    Parámetros:
+    indice (dict): Resultado de 'cargar_indice'.
+    soccerway_pk (str): Jugador de referencia.
+    k (int): Cantidad de jugadores a devolver.
+    ligas (list): Solo jugadores de estas ligas (temporada de TEMPORADA_ESTADISTICAS).
+    edad_min (int): Edad mínima.
+    edad_max (int): Edad máxima.
+    valor_min (int): Valor de mercado mínimo en euros.
+    valor_max (int): Valor de mercado máximo en euros. Con filtros de valor se excluyen los
+    jugadores sin valor de mercado (0).
+
+    Retorna:
+    list: Diccionarios {"soccerway_pk", "distancia", "liga", "edad", "valor"}, del más parecido
+    al menos parecido. Levanta KeyError si el jugador no está en el índice y ValueError si k
+    es menor que 1.
+    """
+    inicio = time.perf_counter()
+    if k < 1:
+        raise ValueError(f"k debe ser al menos 1 (se pidió {k}).")
+    if soccerway_pk not in indice["_posicion"]:
+        raise KeyError(f"El jugador {soccerway_pk} no está en el índice (sin atributos de BeSoccer).")
+    grupo, fila = indice["_posicion"][soccerway_pk]
+    datos = indice[grupo]
+
+    mascara = np.ones(len(datos["llaves"]), dtype=bool)
+    mascara[fila] = False
+    if ligas:
+        mascara &= np.isin(datos["liga"], ligas)
+    if edad_min is not None:
+        mascara &= datos["edad"] >= edad_min
+    if edad_max is not None:
+        mascara &= datos["edad"] <= edad_max
+    if valor_min is not None or valor_max is not None:
+        mascara &= datos["valor"] > 0
+    if valor_min is not None:
+        mascara &= datos["valor"] >= valor_min
+    if valor_max is not None:
+        mascara &= datos["valor"] <= valor_max
+
+    candidatos = np.flatnonzero(mascara)
+    diferencias = datos["matriz"][candidatos] - datos["matriz"][fila]
+    distancias = np.sqrt(np.einsum("ij,ij->i", diferencias, diferencias))
+
+    # argpartition deja los k menores sin ordenar todo el grupo; luego se ordenan solo esos
+    k = min(k, len(candidatos))
+    if k == 0:
+        return []
+    mejores = np.argpartition(distancias, k - 1)[:k]
+    mejores = mejores[np.argsort(distancias[mejores])]
+
+    resultado = [
+        {
+            "soccerway_pk": str(datos["llaves"][candidatos[i]]),
+            "distancia": round(float(distancias[i]), 4),
+            "liga": str(datos["liga"][candidatos[i]]),
+            "edad": int(datos["edad"][candidatos[i]]),
+            "valor": int(datos["valor"][candidatos[i]]),
+        }
+        for i in mejores
+    ]
+    logging.debug(f"Similares de {soccerway_pk} en {(time.perf_counter() - inicio) * 1000:.2f} ms.")
+    return resultado
@@ -0,0 +1,590 @@
+import logging
+import math
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+# Sincronización por diferencias del panel: en lugar de limpiar la hoja y subir todas las
+# celdas, se compara el DataFrame nuevo con lo que ya tiene la hoja usando 'soccerway_pk' y
+# solo se envían las celdas que cambiaron, las filas nuevas y las filas eliminadas.
+
+LLAVE = "soccerway_pk"
+
+# Columnas que se editan a mano en la hoja y nunca se sobrescriben en filas existentes
+COLUMNAS_PROTEGIDAS = ["Valoracion Scouting"]
+
+# Cantidad máxima de rangos por llamada a batch_update
+RANGOS_POR_SOLICITUD = 1000
+
+# Carga por bloques: filas por llamada, llamadas en paralelo y cuota de escritura de la API
+# (Google Sheets permite 60 solicitudes de escritura por minuto por usuario y proyecto)
+FILAS_POR_BLOQUE = 500
+HILOS_CARGA = 4
+SOLICITUDES_POR_MINUTO = 60
+
+# Reintentos ante errores transitorios (cuota excedida o error del servidor), con espera exponencial
+REINTENTOS = 5
+ESPERA_BASE_SEGUNDOS = 2
+CODIGOS_TRANSITORIOS = {408, 429, 500, 502, 503, 504}
+
+# Sufijo de la hoja oculta donde se prepara la publicación antes del intercambio
+SUFIJO_PREPARACION = "_preparacion"
+
+
+class LimitadorCuota:
+    """Limita las solicitudes a la API a una tasa por minuto, compartida entre hilos (token bucket)."""
+
+    def __init__(self, solicitudes_por_minuto=SOLICITUDES_POR_MINUTO):
+        self.intervalo = 60.0 / solicitudes_por_minuto
+        self.capacidad = solicitudes_por_minuto
+        self.disponibles = float(solicitudes_por_minuto)
+        self.ultima = time.monotonic()
+        self._candado = threading.Lock()
+
+    def esperar(self):
+        """Bloquea hasta que haya cuota para una solicitud más y la consume."""
+        while True:
+            with self._candado:
+                ahora = time.monotonic()
+                self.disponibles = min(self.capacidad, self.disponibles + (ahora - self.ultima) / self.intervalo)
+                self.ultima = ahora
+                if self.disponibles >= 1:
+                    self.disponibles -= 1
+                    return
+                espera = (1 - self.disponibles) * self.intervalo
+            time.sleep(espera)
+
+
+def numero_a_columna(numero):
+    """
+    Convierte el número de una columna a sus letras en notación A1 (1 -> A, 27 -> AA).
+
+    Parámetros:
+    numero (int): Número de la columna, empezando en 1.
+
+    Retorna:
+    str: Las letras de la columna.
+    """
+    letras = ""
+    while numero:
+        numero, resto = divmod(numero - 1, 26)
+        letras = chr(ord("A") + resto) + letras
+    return letras
+
+def valor_a_texto(valor):
+    """
+    Normaliza un valor de la hoja o del DataFrame a texto, para poder compararlos.
+
+    Parámetros:
+    valor: Valor de una celda (texto, número, fecha o vacío).
+
+    Retorna:
+    str: El valor como texto; los números enteros sin decimales y los vacíos como "".
+    """
+    if valor is None:
+        return ""
+    if isinstance(valor, bool):
+        return "TRUE" if valor else "FALSE"
+    if isinstance(valor, (float, np.floating)):
+        if math.isnan(valor):
+            return ""
+        return str(int(valor)) if float(valor).is_integer() else str(float(valor))
+    if isinstance(valor, (int, np.integer)):
+        return str(int(valor))
+    if isinstance(valor, pd.Timestamp):
+        return "" if pd.isna(valor) else valor.strftime("%Y-%m-%d")
+    if valor is pd.NaT or valor is pd.NA:
+        return ""
+    return str(valor)
+
+def matriz_de_texto(filas, ancho):
+    """
+    Convierte una lista de filas a una matriz NumPy de textos normalizados.
+
+    Parámetros:
+    filas (list): Filas de valores.
+    ancho (int): Cantidad de columnas de la matriz.
+
+    Retorna:
+    np.ndarray: Matriz de objetos str de tamaño (len(filas), ancho).
+    """
+    matriz = np.full((len(filas), ancho), "", dtype=object)
+    for i, fila in enumerate(filas):
+        for j, valor in enumerate(fila[:ancho]):
+            matriz[i, j] = valor_a_texto(valor)
+    return matriz
+
+def valores_a_dataframe(valores):
+    """
+    Convierte los valores leídos de la hoja (encabezado + filas) a un DataFrame.
+
+    Parámetros:
+    valores (list): Resultado de 'get_all_values'.
+
+    Retorna:
+    pd.DataFrame: DataFrame con el encabezado de la hoja como columnas.
+    """
+    if not valores:
+        return pd.DataFrame()
+    return pd.DataFrame(valores[1:], columns=valores[0])
+
+def rangos_contiguos(indices):
+    """
+    Agrupa índices ordenados en tramos contiguos.
+
+    Parámetros:
+    indices (list): Índices enteros en orden ascendente.
+
+    Retorna:
+    list: Tuplas (inicio, fin) inclusivas.
+    """
+    tramos = []
+    for indice in indices:
+        if tramos and indice == tramos[-1][1] + 1:
+            tramos[-1] = (tramos[-1][0], indice)
+        else:
+            tramos.append((indice, indice))
+    return tramos
+
+def calcular_diferencias(valores_actuales, df_nuevo, llave=LLAVE, protegidas=COLUMNAS_PROTEGIDAS):
+    """
+    Compara el contenido actual de la hoja con el DataFrame nuevo por llave.
+
+    Parámetros:
+    valores_actuales (list): Resultado de 'get_all_values' sobre la hoja.
+    df_nuevo (pd.DataFrame): DataFrame a publicar, con las mismas columnas que la hoja y sin NaN.
+    llave (str): Columna que identifica a cada jugador.
+    protegidas (list): Columnas que no se actualizan en filas existentes.
+
+    Retorna:
+    dict: Rangos a actualizar, filas nuevas, filas eliminadas, cantidad de filas actuales y el
+    contenido final de la hoja, o None si la hoja no se puede
+    sincronizar por diferencias (está vacía, cambió el encabezado o hay llaves repetidas).
+    """
+    columnas = list(df_nuevo.columns)
+    if not valores_actuales or [valor_a_texto(v) for v in valores_actuales[0]] != columnas:
+        return None
+    if df_nuevo[llave].duplicated().any():
+        return None
+
+    filas_actuales = valores_actuales[1:]
+    actual = matriz_de_texto(filas_actuales, len(columnas))
+    nuevo = matriz_de_texto(df_nuevo.values.tolist(), len(columnas))
+    valores_nuevos = df_nuevo.values.tolist()
+
+    posicion_llave = columnas.index(llave)
+    llaves_actuales = actual[:, posicion_llave]
+    if len(set(llaves_actuales)) != len(llaves_actuales):
+        return None
+
+    # Fila de la hoja (índice en filas_actuales) de cada fila nueva, o -1 si es nueva
+    indice_actual = {valor: i for i, valor in enumerate(llaves_actuales)}
+    posiciones = np.array([indice_actual.get(valor, -1) for valor in nuevo[:, posicion_llave]], dtype=int)
+    existentes = np.flatnonzero(posiciones >= 0)
+
+    comparables = np.array([j for j, col in enumerate(columnas) if col not in protegidas], dtype=int)
+    cambios = np.zeros((len(existentes), len(columnas)), dtype=bool)
+    if len(existentes) and len(comparables):
+        cambios[:, comparables] = nuevo[existentes][:, comparables] != actual[posiciones[existentes]][:, comparables]
+
+    rangos = []
+    celdas = 0
+    for k in np.flatnonzero(cambios.any(axis=1)):
+        i_nuevo = existentes[k]
+        fila_hoja = posiciones[i_nuevo] + 2  # +1 por el encabezado y +1 porque Sheets parte en 1
+        for inicio, fin in rangos_contiguos(np.flatnonzero(cambios[k]).tolist()):
+            rango = f"{numero_a_columna(inicio + 1)}{fila_hoja}:{numero_a_columna(fin + 1)}{fila_hoja}"
+            rangos.append({"range": rango, "values": [valores_nuevos[i_nuevo][inicio:fin + 1]]})
+            celdas += fin - inicio + 1
+
+    filas_nuevas = [valores_nuevos[i] for i in np.flatnonzero(posiciones < 0)]
+    conservadas = np.zeros(len(filas_actuales), dtype=bool)
+    conservadas[posiciones[existentes]] = True
+    filas_eliminadas = (np.flatnonzero(~conservadas) + 2).tolist()
+
+    # Contenido que tendrá la hoja después de aplicar las diferencias, en su orden de filas:
+    # las filas conservadas con sus columnas protegidas tal como están y las nuevas al final
+    protegidas_presentes = [j for j, col in enumerate(columnas) if col in protegidas]
+    nuevo_de_actual = np.full(len(filas_actuales), -1, dtype=int)
+    nuevo_de_actual[posiciones[existentes]] = existentes
+    valores_finales = [columnas]
+    for i_actual in np.flatnonzero(conservadas):
+        fila = list(valores_nuevos[nuevo_de_actual[i_actual]])
+        for j in protegidas_presentes:
+            fila[j] = filas_actuales[i_actual][j] if j < len(filas_actuales[i_actual]) else ""
+        valores_finales.append(fila)
+    valores_finales.extend(filas_nuevas)
+
+    return {
+        "rangos": rangos,
+        "celdas": celdas,
+        "filas_nuevas": filas_nuevas,
+        "filas_eliminadas": filas_eliminadas,
+        "filas_actuales": len(filas_actuales),
+        "valores_finales": valores_finales,
+    }
+
+def es_error_transitorio(error):
+    """
+    Indica si un error de la API vale la pena reintentarlo.
+
+    Parámetros:
+    error (Exception): Error levantado por gspread (o por gsheet_local).
+
+    Retorna:
+    bool: True para cuota excedida, errores del servidor y cortes de conexión.
+    """
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    codigo = getattr(getattr(error, "response", None), "status_code", None)
+    return codigo in CODIGOS_TRANSITORIOS
+
+def enviar_con_reintentos(funcion, limitador=None, reintentos=REINTENTOS, descripcion="solicitud"):
+    """
+    Ejecuta una llamada a la API respetando la cuota y reintentando los errores transitorios.
+
+    Parámetros:
+    funcion (callable): Llamada a ejecutar, sin argumentos.
+    limitador (LimitadorCuota): Limitador compartido; None no limita.
+    reintentos (int): Cantidad máxima de reintentos.
+    descripcion (str): Texto para los logs.
+
+    Retorna:
+    El resultado de la llamada. Levanta el último error si se agotan los reintentos.
+    """
+    for intento in range(reintentos + 1):
+        if limitador:
+            limitador.esperar()
+        try:
+            return funcion()
+        except Exception as e:
+            if intento == reintentos or not es_error_transitorio(e):
+                raise
+            espera = ESPERA_BASE_SEGUNDOS * 2 ** intento * random.uniform(0.5, 1.5)
+            logging.warning(f"Falló {descripcion} ({e}); reintento {intento + 1}/{reintentos} en {espera:.1f} s.")
+            time.sleep(espera)
+
+def dividir_en_bloques(filas, fila_inicio=1, filas_por_bloque=FILAS_POR_BLOQUE):
+    """
+    Divide una matriz de valores en bloques de filas con su rango A1 en la hoja.
+
+    Parámetros:
+    filas (list): Filas de valores (encabezado incluido, si corresponde).
+    fila_inicio (int): Fila de la hoja donde va la primera fila, empezando en 1.
+    filas_por_bloque (int): Cantidad de filas por bloque.
+
+    Retorna:
+    list: Bloques {"range", "values"}.
+    """
+    ancho = max((len(fila) for fila in filas), default=1)
+    bloques = []
+    for inicio in range(0, len(filas), filas_por_bloque):
+        valores = filas[inicio:inicio + filas_por_bloque]
+        primera = fila_inicio + inicio
+        ultima = primera + len(valores) - 1
+        bloques.append({"range": f"A{primera}:{numero_a_columna(ancho)}{ultima}", "values": valores})
+    return bloques
+
+def asegurar_tamano(sheet, filas, columnas):
+    """
+    Agranda la grilla de la hoja si no alcanza para los datos a escribir.
+
+    Parámetros:
+    sheet: Hoja de gspread (o de gsheet_local).
+    filas (int): Cantidad de filas necesarias.
+    columnas (int): Cantidad de columnas necesarias.
+    """
+    if sheet.row_count < filas or sheet.col_count < columnas:
+        sheet.resize(rows=max(sheet.row_count, filas), cols=max(sheet.col_count, columnas))
+
+def cargar_por_bloques(sheet, filas, fila_inicio=1, filas_por_bloque=FILAS_POR_BLOQUE, hilos=HILOS_CARGA, limitador=None):
+    """
+    Escribe una matriz de valores en la hoja en bloques de filas enviados en paralelo.
+
+    Cada bloque se reintenta por separado ante errores transitorios, así que una falla no
+    obliga a reenviar los demás. Los bloques que fallan igual se vuelven a enviar una vez
+    más al final, de a uno; si alguno sigue fallando se levanta el error.
+
+    Parámetros:
+    sheet: Hoja de gspread (o de gsheet_local).
+    filas (list): Filas de valores (encabezado incluido, si corresponde).
+    fila_inicio (int): Fila de la hoja donde va la primera fila, empezando en 1.
+    filas_por_bloque (int): Cantidad de filas por llamada.
+    hilos (int): Cantidad de llamadas simultáneas.
+    limitador (LimitadorCuota): Limitador compartido; por defecto uno con SOLICITUDES_POR_MINUTO.
+
+    Retorna:
+    dict: Resumen con la cantidad de bloques, filas y celdas enviadas.
+    """
+    limitador = limitador or LimitadorCuota()
+    bloques = dividir_en_bloques(filas, fila_inicio, filas_por_bloque)
+    if not bloques:
+        return {"bloques": 0, "filas": 0, "celdas": 0}
+
+    ancho = max(len(fila) for fila in filas)
+    enviar_con_reintentos(lambda: asegurar_tamano(sheet, fila_inicio + len(filas) - 1, ancho), limitador, descripcion="ajuste de tamaño")
+
+    def enviar(bloque):
+        return enviar_con_reintentos(
+            lambda: sheet.update(bloque["values"], range_name=bloque["range"], value_input_option="RAW"),
+            limitador, descripcion=f"bloque {bloque['range']}"
+        )
+
+    fallidos = []
+    with ThreadPoolExecutor(max_workers=hilos) as executor:
+        futuros = {executor.submit(enviar, bloque): bloque for bloque in bloques}
+        for completados, futuro in enumerate(as_completed(futuros), start=1):
+            bloque = futuros[futuro]
+            try:
+                futuro.result()
+                logging.info(f"Bloque {bloque['range']} cargado ({completados}/{len(bloques)}).")
+            except Exception as e:
+                logging.error(f"Falló el bloque {bloque['range']}: {e}")
+                fallidos.append(bloque)
+
+    for bloque in fallidos:
+        logging.info(f"Reenviando bloque {bloque['range']}...")
+        enviar(bloque)
+
+    return {
+        "bloques": len(bloques),
+        "filas": len(filas),
+        "celdas": sum(len(fila) for fila in filas),
+    }
+
+def aplicar_diferencias(sheet, diferencias, rangos_por_solicitud=RANGOS_POR_SOLICITUD, limitador=None):
+    """
+    Envía a la hoja las diferencias calculadas con 'calcular_diferencias', en llamadas agrupadas.
+
+    Primero se actualizan las celdas (las filas aún tienen su posición original), luego se
+    eliminan las filas de abajo hacia arriba en una sola llamada y al final se agregan las nuevas.
+
+    Parámetros:
+    sheet: Hoja de gspread (o de gsheet_local).
+    diferencias (dict): Resultado de 'calcular_diferencias'.
+    rangos_por_solicitud (int): Cantidad máxima de rangos por llamada.
+    limitador (LimitadorCuota): Limitador compartido; por defecto uno con SOLICITUDES_POR_MINUTO.
+
+    Retorna:
+    dict: Resumen con la cantidad de celdas actualizadas y filas agregadas y eliminadas.
+    """
+    limitador = limitador or LimitadorCuota()
+    rangos = diferencias["rangos"]
+    for inicio in range(0, len(rangos), rangos_por_solicitud):
+        grupo = rangos[inicio:inicio + rangos_por_solicitud]
+        enviar_con_reintentos(lambda: sheet.batch_update(grupo, value_input_option="RAW"), limitador, descripcion="actualización de celdas")
+    logging.info(f"Actualizadas {diferencias['celdas']} celdas en {len(rangos)} rangos.")
+
+    if diferencias["filas_eliminadas"]:
+        solicitudes = []
+        for inicio, fin in reversed(rangos_contiguos(diferencias["filas_eliminadas"])):
+            solicitudes.append({
+                "deleteDimension": {
+                    "range": {"sheetId": sheet.id, "dimension": "ROWS", "startIndex": inicio - 1, "endIndex": fin}
+                }
+            })
+        enviar_con_reintentos(lambda: sheet.spreadsheet.batch_update({"requests": solicitudes}), limitador, descripcion="eliminación de filas")
+        logging.info(f"Eliminadas {len(diferencias['filas_eliminadas'])} filas.")
+
+    if diferencias["filas_nuevas"]:
+        # Las filas nuevas se escriben en rangos fijos a continuación de las existentes (y no con
+        # append_rows), para que reintentar un bloque no las duplique
+        fila_inicio = 1 + diferencias["filas_actuales"] - len(diferencias["filas_eliminadas"]) + 1
+        cargar_por_bloques(sheet, diferencias["filas_nuevas"], fila_inicio=fila_inicio, limitador=limitador)
+        logging.info(f"Agregadas {len(diferencias['filas_nuevas'])} filas.")
+
+    return {
+        "celdas_actualizadas": diferencias["celdas"],
+        "filas_agregadas": len(diferencias["filas_nuevas"]),
+        "filas_eliminadas": len(diferencias["filas_eliminadas"]),
+    }
+
+def leer_columnas(sheet, columnas):
+    """
+    Lee solo algunas columnas de la hoja, por nombre, con rangos de columna en un solo batch_get.
+
+    Parámetros:
+    sheet: Hoja de gspread (o de gsheet_local).
+    columnas (list): Nombres de las columnas a leer.
+
+    Retorna:
+    list: Encabezado y filas con las columnas pedidas que existen en la hoja, en ese orden.
+    """
+    encabezado = enviar_con_reintentos(lambda: sheet.batch_get(["1:1"], value_render_option="UNFORMATTED_VALUE"), descripcion="lectura del encabezado")[0]
+    encabezado = [valor_a_texto(valor) for valor in (encabezado[0] if encabezado else [])]
+    presentes = [columna for columna in columnas if columna in encabezado]
+    if not presentes:
+        return []
+
+    rangos = []
+    for columna in presentes:
+        letra = numero_a_columna(encabezado.index(columna) + 1)
+        rangos.append(f"{letra}2:{letra}")
+    bloques = enviar_con_reintentos(lambda: sheet.batch_get(rangos, value_render_option="UNFORMATTED_VALUE"), descripcion="lectura de columnas")
+
+    # Sheets omite las celdas vacías del final, así que cada columna puede venir más corta
+    n_filas = max(len(bloque) for bloque in bloques)
+    filas = [[""] * len(presentes) for _ in range(n_filas)]
+    for j, bloque in enumerate(bloques):
+        for i, fila in enumerate(bloque):
+            if fila:
+                filas[i][j] = fila[0]
+    return [presentes] + filas
+
+def confirmar_carga(hoja, filas, llave=LLAVE):
+    """
+    Relee una hoja recién cargada y revisa que tenga las filas esperadas.
+
+    Parámetros:
+    hoja: Hoja de gspread (o de gsheet_local).
+    filas (list): Filas enviadas, con el encabezado primero.
+    llave (str): Columna que identifica a cada jugador.
+
+    Retorna:
+    bool: True si el encabezado, la cantidad de filas y las llaves (si están) coinciden.
+    """
+    valores = enviar_con_reintentos(lambda: hoja.get_all_values(value_render_option="UNFORMATTED_VALUE"), descripcion="lectura de confirmación")
+    valores = [fila for fila in valores if any(valor_a_texto(v) != "" for v in fila)]
+    if len(valores) != len(filas) or [valor_a_texto(v) for v in valores[0]] != [valor_a_texto(v) for v in filas[0]]:
+        return False
+    encabezado = [valor_a_texto(v) for v in filas[0]]
+    if llave not in encabezado:
+        return True
+    posicion = encabezado.index(llave)
+    return all(valor_a_texto(a[posicion]) == valor_a_texto(b[posicion]) for a, b in zip(valores[1:], filas[1:]))
+
+def valor_celda(valor):
+    """
+    Convierte un valor al formato 'userEnteredValue' de la API de Sheets.
+    """
+    if isinstance(valor, bool):
+        return {"boolValue": valor}
+    if isinstance(valor, (int, float)) and not (isinstance(valor, float) and math.isnan(valor)):
+        return {"numberValue": valor}
+    return {"stringValue": valor_a_texto(valor)}
+
+def reaplicar_protegidas(sheet, filas, llave=LLAVE, protegidas=COLUMNAS_PROTEGIDAS):
+    """
+    Relee de la hoja publicada las columnas editadas a mano y las lleva a las filas a publicar,
+    para no perder lo que se editó mientras se cargaba la hoja de preparación.
+
+    Parámetros:
+    sheet: Hoja publicada de gspread (o de gsheet_local).
+    filas (list): Filas a publicar, con el encabezado primero.
+    llave (str): Columna que identifica a cada jugador.
+    protegidas (list): Columnas editadas a mano.
+
+    Retorna:
+    tuple: (filas con las columnas protegidas actualizadas, solicitudes 'updateCells' que las
+    escriben en la hoja publicada).
+    """
+    encabezado = [valor_a_texto(valor) for valor in filas[0]]
+    columnas = [columna for columna in protegidas if columna in encabezado]
+    if llave not in encabezado or not columnas:
+        return filas, []
+
+    actuales = leer_columnas(sheet, [llave] + columnas)
+    if not actuales or llave not in actuales[0]:
+        return filas, []
+    posicion_llave = actuales[0].index(llave)
+    editados = {
+        valor_a_texto(fila[posicion_llave]): dict(zip(actuales[0], fila))
+        for fila in actuales[1:] if valor_a_texto(fila[posicion_llave]) != ""
+    }
+
+    filas = [filas[0]] + [list(fila) for fila in filas[1:]]
+    solicitudes = []
+    for columna in columnas:
+        j = encabezado.index(columna)
+        for fila in filas[1:]:
+            editado = editados.get(valor_a_texto(fila[encabezado.index(llave)]), {}).get(columna, "")
+            if valor_a_texto(editado) != "":
+                fila[j] = editado
+        solicitudes.append({"updateCells": {
+            "start": {"sheetId": sheet.id, "rowIndex": 1, "columnIndex": j},
+            "rows": [{"values": [{"userEnteredValue": valor_celda(fila[j])}]} for fila in filas[1:]],
+            "fields": "userEnteredValue",
+        }})
+    return filas, solicitudes
+
+def publicar_con_intercambio(sheet, filas, limitador=None):
+    """
+    Publica los datos sin dejar la hoja vacía: se cargan en una hoja oculta de preparación y,
+    una vez confirmada la carga, se copian a la hoja publicada en un solo batch_update.
+
+    Un batch_update de Sheets se aplica completo o no se aplica, así que los lectores del
+    panel ven los datos anteriores hasta el intercambio y los nuevos después, nunca una hoja
+    vacía o a medio cargar. Si algo falla antes del intercambio, se borra la hoja de
+    preparación y la hoja publicada queda intacta.
+
+    La hoja publicada no se reemplaza: se ajusta su grilla al tamaño de los datos y se pegan
+    solo los valores (PASTE_VALUES), así conserva su id (gid), formato, protecciones, filtros
+    y validaciones. Las columnas protegidas se releen justo antes del intercambio y se
+    escriben en el mismo batch_update, para no perder lo editado durante la carga.
+
+    Parámetros:
+    sheet: Hoja publicada de gspread (o de gsheet_local).
+    filas (list): Filas a publicar, con el encabezado primero.
+    limitador (LimitadorCuota): Limitador compartido; por defecto uno con SOLICITUDES_POR_MINUTO.
+
+    Retorna:
+    list: Filas publicadas, con las columnas protegidas tal como quedaron en la hoja.
+    """
+    limitador = limitador or LimitadorCuota()
+    libro = sheet.spreadsheet
+    titulo = sheet.title
+    titulo_preparacion = titulo + SUFIJO_PREPARACION
+    ancho = max(len(fila) for fila in filas)
+
+    # Una hoja de preparación que quedó de una ejecución fallida se descarta
+    for hoja in libro.worksheets():
+        if hoja.title == titulo_preparacion:
+            enviar_con_reintentos(lambda: libro.del_worksheet(hoja), limitador, descripcion="eliminación de la hoja de preparación anterior")
+
+    respuesta = enviar_con_reintentos(lambda: libro.batch_update({"requests": [{"addSheet": {"properties": {
+        "title": titulo_preparacion,
+        "hidden": True,
+        "gridProperties": {"rowCount": len(filas), "columnCount": ancho},
+    }}}]}), limitador, descripcion="creación de la hoja de preparación")
+    id_preparacion = respuesta["replies"][0]["addSheet"]["properties"]["sheetId"]
+    preparacion = libro.worksheet(titulo_preparacion)
+
+    try:
+        logging.info(f"Cargando la hoja oculta '{titulo_preparacion}'...")
+        cargar_por_bloques(preparacion, filas, limitador=limitador)
+        if not confirmar_carga(preparacion, filas):
+            raise RuntimeError(f"La hoja '{titulo_preparacion}' no quedó con los datos esperados.")
+
+        filas, protegidas = reaplicar_protegidas(sheet, filas)
+
+        # Intercambio atómico: la grilla de la hoja publicada toma el tamaño de los datos (así
+        # no quedan filas ni columnas viejas), se pegan los valores de la hoja de preparación,
+        # se escriben las columnas protegidas releídas y se borra la hoja de preparación
+        logging.info(f"Copiando '{titulo_preparacion}' en '{titulo}'...")
+        enviar_con_reintentos(lambda: libro.batch_update({"requests": [
+            {"updateSheetProperties": {
+                "properties": {"sheetId": sheet.id, "gridProperties": {"rowCount": len(filas), "columnCount": ancho}},
+                "fields": "gridProperties.rowCount,gridProperties.columnCount",
+            }},
+            {"copyPaste": {
+                "source": {"sheetId": id_preparacion, "startRowIndex": 0, "endRowIndex": len(filas), "startColumnIndex": 0, "endColumnIndex": ancho},
+                "destination": {"sheetId": sheet.id, "startRowIndex": 0, "endRowIndex": len(filas), "startColumnIndex": 0, "endColumnIndex": ancho},
+                "pasteType": "PASTE_VALUES",
+            }},
+            *protegidas,
+            {"deleteSheet": {"sheetId": id_preparacion}},
+        ]}), limitador, descripcion="intercambio de hojas")
+
+    except Exception:
+        logging.error(f"Falló la publicación; la hoja '{titulo}' queda sin cambios.")
+        try:
+            enviar_con_reintentos(lambda: libro.del_worksheet(preparacion), limitador, descripcion="eliminación de la hoja de preparación")
+        except Exception as e:
+            logging.warning(f"No se pudo eliminar la hoja '{titulo_preparacion}': {e}")
+        raise
+
+    return filas
@@ -0,0 +1,99 @@
+import json
+import logging
+import os
+
+import sincronizar_gsheet
+
+# Copia local del contenido de la hoja publicada. Se guarda después de cada publicación junto
+# con la fecha de modificación del libro, y mientras el libro no cambie (nadie editó una
+# valoración ni otra celda) se usa en lugar de volver a leer toda la hoja.
+
+ARCHIVO_SNAPSHOT = "gsheet_snapshot.json"
+
+def obtener_modificacion(libro):
+    """
+    Obtiene la fecha de la última modificación del libro ('modifiedTime' de Drive).
+
+    Parámetros:
+    libro: Spreadsheet de gspread (o LibroLocal de gsheet_local).
+
+    Retorna:
+    str: Fecha de modificación, o None si no se pudo obtener.
+    """
+    try:
+        # gspread 6 expone un método; las versiones anteriores, una propiedad
+        if hasattr(libro, "get_lastUpdateTime"):
+            return libro.get_lastUpdateTime()
+        return libro.lastUpdateTime
+    except Exception as e:
+        logging.warning(f"No se pudo obtener la fecha de modificación del libro: {e}")
+        return None
+
+def cargar_snapshot(archivo=ARCHIVO_SNAPSHOT):
+    """
+    Carga el snapshot guardado, si existe.
+
+    Parámetros:
+    archivo (str): Archivo JSON del snapshot.
+
+    Retorna:
+    dict: Snapshot con 'libro', 'hoja', 'modificado' y 'valores', o None.
+    """
+    if not os.path.exists(archivo):
+        return None
+    try:
+        with open(archivo, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError) as e:
+        logging.warning(f"Se ignora el snapshot {archivo}: {e}")
+        return None
+
+def guardar_snapshot(sheet, valores, archivo=ARCHIVO_SNAPSHOT):
+    """
+    Guarda el contenido de la hoja con la fecha de modificación actual del libro.
+
+    Se debe llamar justo después de publicar: una edición manual entre la publicación y la
+    lectura de la fecha no se detectaría hasta la siguiente modificación del libro.
+
+    Parámetros:
+    sheet: Hoja de gspread (o de gsheet_local).
+    valores (list): Contenido de la hoja, con el encabezado primero.
+    archivo (str): Archivo JSON del snapshot.
+    """
+    modificado = obtener_modificacion(sheet.spreadsheet)
+    if modificado is None:
+        return
+
+    snapshot = {"libro": sheet.spreadsheet.id, "hoja": sheet.id, "modificado": modificado, "valores": valores}
+    temporal = archivo + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as file:
+        json.dump(snapshot, file, ensure_ascii=False, default=str)
+    os.replace(temporal, archivo)
+    logging.info(f"Snapshot de la hoja guardado en {archivo}.")
+
+def leer_hoja(sheet, columnas=None, archivo=ARCHIVO_SNAPSHOT):
+    """
+    Devuelve el contenido de la hoja, desde el snapshot si el libro no cambió desde que se guardó.
+
+    Parámetros:
+    sheet: Hoja de gspread (o de gsheet_local).
+    columnas (list): Si se indica y el snapshot no sirve, solo se leen estas columnas de la hoja.
+    archivo (str): Archivo JSON del snapshot.
+
+    Retorna:
+    tuple: (valores, origen), con origen "snapshot", "columnas" u "hoja".
+    """
+    snapshot = cargar_snapshot(archivo)
+    if snapshot and snapshot.get("libro") == sheet.spreadsheet.id and snapshot.get("hoja") == sheet.id:
+        modificado = obtener_modificacion(sheet.spreadsheet)
+        if modificado is not None and modificado == snapshot.get("modificado"):
+            logging.info("El libro no cambió desde la última publicación; se usa el snapshot local.")
+            return snapshot["valores"], "snapshot"
+
+    if columnas:
+        logging.info(f"Leyendo las columnas {columnas} de la hoja...")
+        return sincronizar_gsheet.leer_columnas(sheet, columnas), "columnas"
+
+    logging.info("Leyendo la hoja completa...")
+    valores = sincronizar_gsheet.enviar_con_reintentos(lambda: sheet.get_all_values(value_render_option="UNFORMATTED_VALUE"), descripcion="lectura de la hoja")
+    return valores, "hoja"
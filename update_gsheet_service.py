@@ -1,77 +1,178 @@
-import gspread
 import pandas as pd
-from oauth2client.service_account import ServiceAccountCredentials
 import logging
 import numpy as np
+import sys
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Log en la consola
-        logging.FileHandler("extract_players.log")  # Log en un archivo
-    ]
-)
+import gsheet_local
+import registro
+import sincronizar_gsheet
+import snapshot_gsheet
+import validacion
+from archivos_ligas import archivo_csv
+
+# "diferencias" envía solo las celdas que cambiaron; "intercambio" carga todo en una hoja oculta
+# y la intercambia con la publicada; "completa" limpia la hoja y sube todo
+MODO_CARGA = "diferencias"
 
-# Configuración de la API
-scope = [
-    "https://www.googleapis.com/auth/spreadsheets",
-    "https://www.googleapis.com/auth/drive"
-]
+# Modo que se usa cuando la hoja no se puede sincronizar por diferencias
+MODO_RESPALDO = "intercambio"
 
-# Carga de las credenciales
-credentials = ServiceAccountCredentials.from_json_keyfile_name("credentials.json", scope)
-client = gspread.authorize(credentials)
+# Ruta de un libro local (gsheet_local) para probar la carga sin credenciales; None usa Google Sheets
+HOJA_LOCAL = None
+
+ARCHIVO_CREDENCIALES = "credentials.json"
 
 # Abre el Google Sheet por URL o nombre
 spreadsheet_url = "https://docs.google.com/spreadsheets/d/1aI0BUpyGfcWSrfee98eWkEKUsQffKiiS-g23POhyawc/edit?gid=0#gid=0"
 
-# Autenticación con Google Sheets
-sheet = client.open_by_url(spreadsheet_url).sheet1  # Selecciona la primera hoja (sheet1)
+csv_file = archivo_csv
+
+def abrir_hoja(hoja_local=HOJA_LOCAL, archivo_credenciales=ARCHIVO_CREDENCIALES, url=spreadsheet_url):
+    """
+    Abre la hoja del panel: la de Google Sheets o, si se indica, un libro local.
+
+    Parámetros:
+    hoja_local (str): Archivo JSON de un libro local (gsheet_local); None usa Google Sheets.
+    archivo_credenciales (str): Credenciales de la cuenta de servicio.
+    url (str): URL del Google Sheet.
+
+    Retorna:
+    La primera hoja del libro (sheet1).
+    """
+    if hoja_local:
+        return gsheet_local.abrir_libro_local(hoja_local).sheet1
+
+    # gspread solo se importa cuando se publica en Google Sheets
+    import gspread
+    from oauth2client.service_account import ServiceAccountCredentials
+
+    # Configuración de la API
+    scope = [
+        "https://www.googleapis.com/auth/spreadsheets",
+        "https://www.googleapis.com/auth/drive"
+    ]
+
+    # Carga de las credenciales
+    credentials = ServiceAccountCredentials.from_json_keyfile_name(archivo_credenciales, scope)
+    client = gspread.authorize(credentials)
+
+    # Autenticación con Google Sheets
+    return client.open_by_url(url).sheet1  # Selecciona la primera hoja (sheet1)
+
+def publicar(csv_file=csv_file, modo_carga=MODO_CARGA, hoja_local=HOJA_LOCAL):
+    """
+    Publica el panel validado en el Google Sheet.
+
+    Parámetros:
+    csv_file (str): CSV del panel generado por clean_data.py.
+    modo_carga (str): "diferencias", "intercambio" o "completa".
+    hoja_local (str): Archivo JSON de un libro local; None usa Google Sheets.
+
+    Retorna:
+    bool: True si la hoja quedó actualizada.
+    """
+    # No se toca el Google Sheet si el CSV no pasó la validación de clean_data.py
+    valido, motivo = validacion.verificar_reporte(csv_file)
+    if not valido:
+        logging.error(f"Se cancela la carga de '{csv_file}': {motivo}.")
+        return False
+
+    sheet = abrir_hoja(hoja_local)
+
+    logging.info("Leyendo CSV")
+    # Carga el archivo CSV como un DataFrame
+    df_nuevo = pd.read_csv(csv_file)
+
+    hoja_limpiada = False
+    df_actual = pd.DataFrame()
+
+    # Un solo limitador para todas las llamadas de escritura, así la cuota se respeta entre etapas
+    limitador = sincronizar_gsheet.LimitadorCuota()
+
+    try:
+        # Leer los datos existentes en el Google Sheet
+        logging.info("Leyendo datos actuales en Google Sheets")
+        # Si el libro no cambió desde la última publicación se usa el snapshot local. Si no, el modo
+        # "intercambio" solo necesita la llave y las columnas manuales; los otros, la hoja completa
+        columnas_lectura = [sincronizar_gsheet.LLAVE] + sincronizar_gsheet.COLUMNAS_PROTEGIDAS if modo_carga == "intercambio" else None
+        valores_actuales, origen = snapshot_gsheet.leer_hoja(sheet, columnas=columnas_lectura)
+        df_actual = sincronizar_gsheet.valores_a_dataframe(valores_actuales)
+
+        # Unir df_nuevo con df_actual usando "soccerway_pk" y agregar la columna "Valoracion Scouting"
+        if 'Valoracion Scouting' in df_actual.columns:
+            df_nuevo = df_nuevo.merge(df_actual[['soccerway_pk', 'Valoracion Scouting']].drop_duplicates(subset='soccerway_pk'), on='soccerway_pk', how='left')
+        else:
+            df_nuevo['Valoracion Scouting'] = np.nan
+
+        # Rellenar los valores NaN en la columna "Valoracion Scouting" con "Predeterminado"
+        df_nuevo['Valoracion Scouting'] = df_nuevo['Valoracion Scouting'].replace("", np.nan).fillna('Predeterminada')
+
+        # Las celdas sin dato (por ejemplo fechas de contrato vacías) se envían como texto vacío
+        df_nuevo = df_nuevo.fillna("")
+
+        diferencias = None
+        if modo_carga == "diferencias" and origen != "columnas":
+            diferencias = sincronizar_gsheet.calcular_diferencias(valores_actuales, df_nuevo)
+            if diferencias is None:
+                logging.info(f"La hoja no se puede sincronizar por diferencias (vacía, encabezado distinto o llaves repetidas); se usará el modo '{MODO_RESPALDO}'.")
+
+        modo = "diferencias" if diferencias is not None else (modo_carga if modo_carga != "diferencias" else MODO_RESPALDO)
+
+        if modo == "diferencias":
+            logging.info("Comienza sincronización por diferencias...")
+            resumen = sincronizar_gsheet.aplicar_diferencias(sheet, diferencias, limitador=limitador)
+            snapshot_gsheet.guardar_snapshot(sheet, diferencias["valores_finales"])
+            logging.info(f"Datos del archivo '{csv_file}' sincronizados en el Google Sheet: {resumen}")
+
+        elif modo == "intercambio":
+            logging.info("Comienza carga en hoja de preparación...")
+            valores_nuevos = [df_nuevo.columns.values.tolist()] + df_nuevo.values.tolist()
+            valores_nuevos = sincronizar_gsheet.publicar_con_intercambio(sheet, valores_nuevos, limitador=limitador)
+            snapshot_gsheet.guardar_snapshot(sheet, valores_nuevos)
+            logging.info(f"Datos del archivo '{csv_file}' publicados en el Google Sheet mediante intercambio de hojas.")
+
+        else:
+            logging.info("Limpiando GSheet")
+            sincronizar_gsheet.enviar_con_reintentos(sheet.clear, limitador, descripcion="limpieza de la hoja")
+            hoja_limpiada = True
 
-logging.info("Leyendo CSV")
-# Carga el archivo CSV como un DataFrame
-csv_file = "clean_data_final_4.csv"
-df_nuevo = pd.read_csv(csv_file)
 
+            logging.info("Comienza carga de datos...")
 
-try:
-    # Leer los datos existentes en el Google Sheet
-    logging.info("Leyendo datos actuales en Google Sheets")
-    df_actual = pd.DataFrame(sheet.get_all_records())  # Convertir los datos existentes en DataFrame
+            # Actualizar todo el contenido en el Google Sheet, en bloques de filas enviados en paralelo
+            valores_nuevos = [df_nuevo.columns.values.tolist()] + df_nuevo.values.tolist()  # Encabezados + valores
+            resumen = sincronizar_gsheet.cargar_por_bloques(sheet, valores_nuevos, limitador=limitador)
+            snapshot_gsheet.guardar_snapshot(sheet, valores_nuevos)
+            logging.info(f"Carga completa: {resumen}")
 
-    # Unir df_nuevo con df_actual usando "soccerway_pk" y agregar la columna "Valoracion Scouting"
-    df_nuevo = df_nuevo.merge(df_actual[['soccerway_pk', 'Valoracion Scouting']], on='soccerway_pk', how='left')
+            logging.info(f"Datos del archivo '{csv_file}' insertados correctamente en el Google Sheet.")
 
-    # Rellenar los valores NaN en la columna "Valoracion Scouting" con "Predeterminado"
-    df_nuevo['Valoracion Scouting'].fillna('Predeterminada', inplace=True)
+    except Exception as e:
+        logging.error(f"Error al actualizar los datos en Google Sheets: {e}")
 
-    logging.info("Limpiando GSheet")
-    sheet.clear()
+        # Los modos "diferencias" e "intercambio" no limpian la hoja: basta con volver a ejecutar
+        if hoja_limpiada:
+            logging.info("Restaurando el DataFrame anterior...")
 
+            # Reemplazar NaN por cadenas vacías si es necesario
+            df_actual = df_actual.fillna("")  # Esto es opcional, dependiendo de cómo quieras tratar los NaN
 
-    logging.info("Comienza carga de datos...")
-    
+            # Asegúrate de aplicar transformaciones solo a las columnas de tipo 'O' (cadenas de texto)
+            df_actual = df_actual.apply(lambda x: x.map(str) if x.dtype == 'O' else x)
 
-    # Actualizar todo el contenido en el Google Sheet
-    sheet.update([df_nuevo.columns.values.tolist()] + df_nuevo.values.tolist())  # Encabezados + valores
 
-    logging.info(f"Datos del archivo '{csv_file}' insertados correctamente en el Google Sheet.")
+            #Cargar el DataFrame restaurado en Google Sheets
 
-except Exception as e:
-    logging.error(f"Error al actualizar los datos en Google Sheets: {e}")
-    logging.info("Restaurando el DataFrame anterior...")
-    
-    # Reemplazar NaN por cadenas vacías si es necesario
-    df_actual = df_actual.fillna("")  # Esto es opcional, dependiendo de cómo quieras tratar los NaN
+            sincronizar_gsheet.cargar_por_bloques(sheet, [df_actual.columns.values.tolist()] + df_actual.values.tolist(), limitador=limitador)  # Cargar el DataFrame restaurado
+            logging.info("Datos restaurados correctamente desde el GSheet.")
+        return False
 
-    # Asegúrate de aplicar transformaciones solo a las columnas de tipo 'O' (cadenas de texto)
-    df_actual = df_actual.apply(lambda x: x.map(str) if x.dtype == 'O' else x)
+    return True
 
-    
-    #Cargar el DataFrame restaurado en Google Sheets
 
-    sheet.update([df_actual.columns.values.tolist()] + df_actual.values.tolist())  # Cargar el DataFrame restaurado
-    logging.info("Datos restaurados correctamente desde el GSheet.")
+if __name__ == "__main__":
+    # Configuración de logging (antes compartía extract_players.log con el scraper de BeSoccer)
+    registro.configurar("update_gsheet_service.log")
 
+    if not publicar():
+        sys.exit(1)
@@ -0,0 +1,285 @@
+import hashlib
+import json
+import logging
+import re
+
+import numpy as np
+import pandas as pd
+
+# Esquema declarativo del panel. Cada llave es una expresión regular que debe calzar con el
+# nombre completo de la columna; se usa la primera regla que calce. Las columnas sin regla
+# solo se revisan por nulos.
+#   tipo:  "texto", "entero", "decimal" o "fecha"
+#   min / max:  rango permitido (solo columnas numéricas)
+#   nulos:  si se permiten valores vacíos (por defecto False)
+#   unico:  si los valores no se pueden repetir
+ESQUEMA_PANEL = {
+    r"soccerway_pk": {"tipo": "texto", "unico": True},
+    r"Nombre|Apellidos|Nombre Jugador|URL": {"tipo": "texto"},
+    r"Edad": {"tipo": "entero", "min": 0, "max": 60},
+    r"Temporada": {"tipo": "entero", "min": 0, "max": 2100},
+    r"Altura": {"tipo": "entero", "min": 0, "max": 230},
+    r"Peso": {"tipo": "entero", "min": 0, "max": 150},
+    r"Valor de Mercado": {"tipo": "entero", "min": 0, "max": 500_000_000},
+    r"Fichado|Contrato Hasta": {"tipo": "fecha", "nulos": True},
+    r"ELO|Ritmo|Tiro|Pase|Regate|Defensa|Físico|Salto|Estirada|Paradas|Saques|Colocación|Reflejos": {"tipo": "entero", "min": 0, "max": 100},
+    r"\d{4}_Temporada": {"tipo": "entero", "min": 0, "max": 2100},
+    r"\d{4}_Minutos Jugados": {"tipo": "entero", "min": 0, "max": 10_000},
+    r"\d{4}_(Apariciones|Alineaciones|Entra|Sale|Comenzó de suplente|Gol|Amarilla|Segunda Amarilla|Roja)": {"tipo": "entero", "min": 0, "max": 200},
+}
+
+# Proporción mínima de jugadores de soccerway que deben cruzar con cada fuente. Una caída
+# fuerte suele indicar que cambió el formato de una llave (por ejemplo, las fechas).
+TASAS_CRUCE_MINIMAS = {
+    "transfermarkt": 0.2,
+    "besoccer": 0.1,
+}
+
+# Cantidad de valores de ejemplo que se guardan por error en el reporte
+EJEMPLOS_POR_ERROR = 5
+
+def regla_de_columna(columna, esquema):
+    """
+    Busca la primera regla del esquema cuyo patrón calza con el nombre de la columna.
+
+    Parámetros:
+    columna (str): Nombre de la columna.
+    esquema (dict): Patrón -> regla.
+
+    Retorna:
+    dict: Regla de la columna, o un diccionario vacío si no hay ninguna.
+    """
+    for patron, regla in esquema.items():
+        if re.fullmatch(patron, columna):
+            return regla
+    return {}
+
+def tipo_de_serie(serie):
+    """
+    Clasifica el tipo de una columna con los nombres usados en el esquema.
+
+    Parámetros:
+    serie (pd.Series): Columna a clasificar.
+
+    Retorna:
+    str: "entero", "decimal", "fecha", "texto" u "otro".
+    """
+    if pd.api.types.is_bool_dtype(serie):
+        return "otro"
+    if pd.api.types.is_integer_dtype(serie):
+        return "entero"
+    if pd.api.types.is_float_dtype(serie):
+        return "decimal"
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return "fecha"
+    if pd.api.types.is_object_dtype(serie) or pd.api.types.is_string_dtype(serie):
+        return "texto"
+    return "otro"
+
+def agregar_error(errores, regla, columna, mascara, serie):
+    """
+    Agrega un error al listado si la máscara marca alguna fila.
+
+    Parámetros:
+    errores (list): Listado de errores del resultado.
+    regla (str): Nombre de la regla que falló.
+    columna (str): Columna revisada.
+    mascara (np.ndarray): Filas que no cumplen la regla.
+    serie (pd.Series): Valores de la columna, para los ejemplos.
+    """
+    n_filas = int(mascara.sum())
+    if n_filas:
+        ejemplos = [str(valor) for valor in serie[mascara].head(EJEMPLOS_POR_ERROR)]
+        errores.append({"regla": regla, "columna": columna, "filas": n_filas, "ejemplos": ejemplos})
+
+def validar(df, esquema=ESQUEMA_PANEL):
+    """
+    Revisa todas las reglas del esquema en una sola pasada por columna, con operaciones vectorizadas.
+
+    Parámetros:
+    df (pd.DataFrame): DataFrame del panel.
+    esquema (dict): Esquema declarativo a aplicar.
+
+    Retorna:
+    dict: Resultado con la cantidad de filas y el listado de errores encontrados.
+    """
+    errores = []
+
+    # Una sola matriz de nulos para todo el DataFrame
+    nulos = df.isna().to_numpy()
+
+    for posicion, columna in enumerate(df.columns):
+        serie = df[columna]
+        regla = regla_de_columna(columna, esquema)
+        nulos_columna = nulos[:, posicion]
+
+        if not regla.get("nulos", False):
+            agregar_error(errores, "nulos", columna, nulos_columna, serie)
+
+        tipo = tipo_de_serie(serie)
+        if "tipo" in regla and tipo != regla["tipo"] and not (regla["tipo"] == "decimal" and tipo == "entero"):
+            errores.append({"regla": "tipo", "columna": columna, "esperado": regla["tipo"], "encontrado": tipo})
+
+        if tipo in ("entero", "decimal"):
+            valores = serie.to_numpy(dtype="float64", na_value=np.nan)
+            fuera_de_rango = ~np.isfinite(valores) & ~nulos_columna
+            if "min" in regla:
+                fuera_de_rango |= valores < regla["min"]
+            if "max" in regla:
+                fuera_de_rango |= valores > regla["max"]
+            agregar_error(errores, "rango", columna, fuera_de_rango, serie)
+
+        if regla.get("unico"):
+            agregar_error(errores, "unico", columna, serie.duplicated(keep=False).to_numpy() & ~nulos_columna, serie)
+
+    faltantes = [patron for patron, regla in esquema.items() if regla.get("unico") and not any(re.fullmatch(patron, c) for c in df.columns)]
+    for patron in faltantes:
+        errores.append({"regla": "columna", "columna": patron, "filas": 0, "ejemplos": []})
+
+    return {"filas": len(df), "errores": errores}
+
+def combinar_resultados(resultados):
+    """
+    Suma los resultados de validar varias particiones del mismo panel.
+
+    Las particiones del modo por bloques se arman por hash de 'soccerway_pk', así que una
+    llave repetida siempre queda en la misma partición y la regla de unicidad sigue siendo válida.
+
+    Parámetros:
+    resultados (list): Resultados devueltos por 'validar'.
+
+    Retorna:
+    dict: Resultado combinado.
+    """
+    combinados = {}
+    filas = 0
+    for resultado in resultados:
+        filas += resultado["filas"]
+        for error in resultado["errores"]:
+            llave = (error["regla"], error["columna"])
+            if llave not in combinados:
+                combinados[llave] = dict(error)
+            elif "filas" in error:
+                combinados[llave]["filas"] += error["filas"]
+                combinados[llave]["ejemplos"] = (combinados[llave]["ejemplos"] + error["ejemplos"])[:EJEMPLOS_POR_ERROR]
+    return {"filas": filas, "errores": list(combinados.values())}
+
+def evaluar_tasas_cruce(cruces, minimos=TASAS_CRUCE_MINIMAS):
+    """
+    Calcula la tasa de cruce de cada fuente y la compara con su mínimo.
+
+    Parámetros:
+    cruces (dict): Fuente -> {"cruzados", "total"}, posiblemente sumados entre particiones.
+    minimos (dict): Fuente -> tasa mínima.
+
+    Retorna:
+    dict: Fuente -> {"cruzados", "total", "tasa", "minimo", "valido"}.
+    """
+    tasas = {}
+    for fuente, conteo in cruces.items():
+        tasa = conteo["cruzados"] / conteo["total"] if conteo["total"] else 0.0
+        minimo = minimos.get(fuente, 0.0)
+        tasas[fuente] = {**conteo, "tasa": round(tasa, 4), "minimo": minimo, "valido": tasa >= minimo}
+    return tasas
+
+def sumar_cruces(acumulado, cruces):
+    """
+    Suma los conteos de cruce de una partición a los acumulados.
+
+    Parámetros:
+    acumulado (dict): Fuente -> {"cruzados", "total", ...} acumulados (se modifica).
+    cruces (dict): Fuente -> {"cruzados", "total", ...} de la partición.
+
+    Retorna:
+    dict: El acumulado actualizado.
+    """
+    for fuente, conteo in cruces.items():
+        total = acumulado.setdefault(fuente, {})
+        for campo, valor in conteo.items():
+            total[campo] = total.get(campo, 0) + valor
+    return acumulado
+
+def hash_archivo(archivo):
+    """
+    Calcula el hash SHA-256 del contenido de un archivo.
+
+    Parámetros:
+    archivo (str): Ruta del archivo.
+
+    Retorna:
+    str: Hash en hexadecimal.
+    """
+    sha = hashlib.sha256()
+    with open(archivo, "rb") as file:
+        for bloque in iter(lambda: file.read(1024 * 1024), b""):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+def archivo_reporte(archivo_csv):
+    """
+    Devuelve el archivo donde se guarda el reporte de validación de un CSV.
+
+    Parámetros:
+    archivo_csv (str): Archivo del panel, por ejemplo 'clean_data_final_4.csv'.
+
+    Retorna:
+    str: Archivo del reporte, por ejemplo 'clean_data_final_4.validacion.json'.
+    """
+    return re.sub(r"\.csv$", "", archivo_csv) + ".validacion.json"
+
+def escribir_reporte(resultado, tasas, archivo_csv):
+    """
+    Escribe el reporte de validación en JSON junto al CSV, con el hash del CSV validado.
+
+    Parámetros:
+    resultado (dict): Resultado de 'validar' o 'combinar_resultados'.
+    tasas (dict): Resultado de 'evaluar_tasas_cruce'.
+    archivo_csv (str): CSV del panel ya escrito.
+
+    Retorna:
+    dict: El reporte escrito.
+    """
+    valido = not resultado["errores"] and all(tasa["valido"] for tasa in tasas.values())
+    reporte = {
+        "archivo": archivo_csv,
+        "sha256": hash_archivo(archivo_csv),
+        "filas": resultado["filas"],
+        "valido": valido,
+        "errores": resultado["errores"],
+        "tasas_cruce": tasas,
+    }
+
+    with open(archivo_reporte(archivo_csv), "w", encoding="utf-8") as file:
+        json.dump(reporte, file, ensure_ascii=False, indent=2, default=str)
+
+    if valido:
+        logging.info(f"Validación correcta de {archivo_csv} ({resultado['filas']} filas).")
+    else:
+        for error in resultado["errores"]:
+            logging.error(f"Validación: regla '{error['regla']}' en columna '{error['columna']}': {error}")
+        for fuente, tasa in tasas.items():
+            if not tasa["valido"]:
+                logging.error(f"Validación: tasa de cruce con {fuente} {tasa['tasa']:.2%} bajo el mínimo {tasa['minimo']:.2%}.")
+    return reporte
+
+def verificar_reporte(archivo_csv):
+    """
+    Revisa que el CSV tenga un reporte de validación correcto y que corresponda a su contenido actual.
+
+    Parámetros:
+    archivo_csv (str): CSV del panel a publicar.
+
+    Retorna:
+    tuple: (True, "") si se puede publicar, o (False, motivo) si no.
+    """
+    try:
+        with open(archivo_reporte(archivo_csv), encoding="utf-8") as file:
+            reporte = json.load(file)
+    except FileNotFoundError:
+        return False, f"no existe el reporte de validación {archivo_reporte(archivo_csv)}"
+
+    if reporte.get("sha256") != hash_archivo(archivo_csv):
+        return False, "el CSV cambió después de ser validado"
+    if not reporte.get("valido"):
+        return False, f"la validación falló con {len(reporte.get('errores', []))} errores"
+    return True, ""
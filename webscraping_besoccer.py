@@ -1,4 +1,3 @@
-from playwright.async_api import async_playwright
 import asyncio
 import logging
 import csv
@@ -6,162 +5,236 @@ import re
 import sys
 import os
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler(),  # Log en la consola
-        logging.FileHandler("extract_players.log")  # Log en un archivo
-    ]
-)
+import captura_red
+import fallidos
+import navegador
+import registro
+import selectores
 
+# Archivo de log al ejecutarlo directamente (cada scraper usa el suyo, ver registro.py)
+ARCHIVO_LOG = "extract_players.log"
+
+
+async def scrape_player_data(player_url, sesion=None):
+    """
+    Extrae los datos de un jugador desde su página en BeSoccer.
+
+    Args:
+        player_url (str): URL del jugador.
+        sesion (navegador.SesionNavegador): Sesión a reutilizar; sin sesión se abre un navegador solo para este jugador.
+
+    Returns:
+        dict: Datos y atributos del jugador.
+    """
+    if sesion is not None:
+        page = await sesion.pagina()
+        # La captura es de la sesión: se descarta lo de la página anterior
+        sesion.datos.limpiar("besoccer_atributos")
+        await page.goto(player_url)
+        return await leer_jugador(page, sesion.datos)
+
+    from playwright.async_api import async_playwright
 
-async def scrape_player_data(player_url):
     async with async_playwright() as p:
         # Inicializa el navegador
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
+        captura = await captura_red.iniciar_captura(page, ["besoccer_atributos"])
 
         # Navega a la URL del jugador
         await page.goto(player_url)
+        datos = await leer_jugador(page, captura)
 
-        # Extrae los datos
-        full_name = await page.locator('.panel-head .panel-subtitle:nth-of-type(2)').text_content()  # Usa el segundo subtítulo
-        nationality = await page.locator('.panel-body.stat-list .stat:nth-child(1) .small-row:nth-child(4)').text_content()
-        age = await page.locator('.panel-body.stat-list .stat:nth-child(1) .big-row').text_content()
-        elo = await page.locator('.panel-body.stat-list .stat:nth-child(4) .round-row.mb5.green span').text_content()
-
-       # Extraer todo el texto relacionado con la fecha de nacimiento
-        birth_div = await page.query_selector('div.panel-body.ta-c.mh10')
-        birth_date_text = None  # Valor por defecto si no se encuentra la fecha
-        
-        if birth_div:
-            birth_date_text = await birth_div.text_content()  # Extrae todo el texto
-        
-         # Eliminar espacios en blanco y saltos de línea al principio y al final
-        birth_date_text = birth_date_text.strip() if birth_date_text else None
-        """
-# Lista de los atributos en orden de aparición en la página
-        attribute_names = ["salto","estirada","paradas","saques","colocación","reflejos","ritmo", "tiro", "pase", "regate", "defensa", "físico"]
-
-        # Para cada atributo, verificamos si el div correspondiente con la clase cl-name slice-X existe antes de intentar extraerlo
-        for idx, attribute in enumerate(attribute_names, start=1):
-            # Verificamos si el elemento del atributo existe antes de intentar extraerlo
-            attribute_locator = page.locator(f'div.cl-name.slice-{idx} .cname div')
-            value_locator = page.locator(f'div.cl-name.slice-{idx} .cvalue')
-
-            try:
-                # Si el elemento no está visible, asignamos "Desconocido" para ese atributo
-                if not await attribute_locator.is_visible() or not await value_locator.is_visible():
-                    attributes[attribute.capitalize()] = "Desconocido"
-                else:
-                    # Extraemos el nombre y el valor si está visible
-                    attribute_name = await attribute_locator.text_content()
-                    attribute_value_element = await value_locator.text_content()
-
-                    # Si el valor está presente, lo asignamos, sino asignamos "Desconocido"
-                    if attribute_value_element:
-                        attributes[attribute_name.strip().capitalize()] = attribute_value_element.strip()
-                    else:
-                        attributes[attribute_name.strip().capitalize()] = "Desconocido"
-
-            except Exception as e:
-                # Si hay un error al extraer el atributo, asignamos "Desconocido"
-                print(f"Error al extraer el atributo {attribute.capitalize()}: {e}")
-                attributes[attribute.capitalize()] = "Desconocido"
-
-        # Cierra el navegador
         await browser.close()
-        """
-         # Extraer todos los atributos disponibles
-        attributes = {}
+        return datos
 
-        # Buscar todos los elementos de atributos en la página
-        attribute_elements = await page.locator('div.cl-name').all()
+async def leer_jugador(page, captura):
+    """
+    Lee los datos de un jugador de la página ya cargada.
 
-        for element in attribute_elements:
-            try:
-                attribute_name = await element.locator('.cname div').text_content()
-                attribute_value = await element.locator('.cvalue').text_content()
+    Args:
+        page: Página de Playwright con el perfil del jugador.
+        captura (captura_red.CapturaRed): Captura de respuestas de la página.
 
-                # Limpiar texto y guardar en el diccionario
-                attributes[attribute_name.strip().capitalize()] = attribute_value.strip() if attribute_value else "Desconocido"
-            except:
-                continue  # Si falla, simplemente sigue con el siguiente atributo
+    Returns:
+        dict: Datos y atributos del jugador.
+    """
+    # Extrae los datos
+    full_name = await page.locator('.panel-head .panel-subtitle:nth-of-type(2)').text_content()  # Usa el segundo subtítulo
+    nationality = await page.locator('.panel-body.stat-list .stat:nth-child(1) .small-row:nth-child(4)').text_content()
+    age = await page.locator('.panel-body.stat-list .stat:nth-child(1) .big-row').text_content()
+    elo = await page.locator('.panel-body.stat-list .stat:nth-child(4) .round-row.mb5.green span').text_content()
 
-        await browser.close()
+   # Extraer todo el texto relacionado con la fecha de nacimiento
+    birth_div = await page.query_selector('div.panel-body.ta-c.mh10')
+    birth_date_text = None  # Valor por defecto si no se encuentra la fecha
+
+    if birth_div:
+        birth_date_text = await birth_div.text_content()  # Extrae todo el texto
+
+     # Eliminar espacios en blanco y saltos de línea al principio y al final
+    birth_date_text = birth_date_text.strip() if birth_date_text else None
+    """
+    # Lista de los atributos en orden de aparición en la página
+    attribute_names = ["salto","estirada","paradas","saques","colocación","reflejos","ritmo", "tiro", "pase", "regate", "defensa", "físico"]
+
+    # Para cada atributo, verificamos si el div correspondiente con la clase cl-name slice-X existe antes de intentar extraerlo
+    for idx, attribute in enumerate(attribute_names, start=1):
+        # Verificamos si el elemento del atributo existe antes de intentar extraerlo
+        attribute_locator = page.locator(f'div.cl-name.slice-{idx} .cname div')
+        value_locator = page.locator(f'div.cl-name.slice-{idx} .cvalue')
+
+        try:
+            # Si el elemento no está visible, asignamos "Desconocido" para ese atributo
+            if not await attribute_locator.is_visible() or not await value_locator.is_visible():
+                attributes[attribute.capitalize()] = "Desconocido"
+            else:
+                # Extraemos el nombre y el valor si está visible
+                attribute_name = await attribute_locator.text_content()
+                attribute_value_element = await value_locator.text_content()
+
+                # Si el valor está presente, lo asignamos, sino asignamos "Desconocido"
+                if attribute_value_element:
+                    attributes[attribute_name.strip().capitalize()] = attribute_value_element.strip()
+                else:
+                    attributes[attribute_name.strip().capitalize()] = "Desconocido"
+
+        except Exception as e:
+            # Si hay un error al extraer el atributo, asignamos "Desconocido"
+            logging.warning(f"Error al extraer el atributo {attribute.capitalize()}: {e}")
+            attributes[attribute.capitalize()] = "Desconocido"
 
-        # Devuelve los datos como un diccionario
-        return {
-            "Nombre completo": full_name.strip(),
-            "Nacionalidad": nationality.strip(),
-            "Edad": int(age.strip()) if age.strip().isdigit() else 0,
-            "ELO": int(elo.strip()) if elo.strip().isdigit() else 0,
-            "birth_date": birth_date_text,
-            **attributes  # Incluye los atributos con sus valores
-        }
+    # Cierra el navegador
+    await browser.close()
+    """
+     # Extraer todos los atributos disponibles
+    attributes = {}
+
+    # Si llegó el JSON de los atributos se toman de ahí; si no, del widget
+    registros = await captura.esperar("besoccer_atributos")
+    if registros:
+        attributes = {nombre: valor or "Desconocido" for nombre, valor in registros[0].items()}
+
+    # Buscar todos los elementos de atributos en la página
+    attribute_elements = await page.locator('div.cl-name').all() if not attributes else []
+
+    for element in attribute_elements:
+        try:
+            attribute_name = await element.locator('.cname div').text_content()
+            attribute_value = await element.locator('.cvalue').text_content()
+
+            # Limpiar texto y guardar en el diccionario
+            attributes[attribute_name.strip().capitalize()] = attribute_value.strip() if attribute_value else "Desconocido"
+        except:
+            continue  # Si falla, simplemente sigue con el siguiente atributo
+
+    # Devuelve los datos como un diccionario
+    return {
+        "Nombre completo": full_name.strip(),
+        "Nacionalidad": nationality.strip(),
+        "Edad": int(age.strip()) if age.strip().isdigit() else 0,
+        "ELO": int(elo.strip()) if elo.strip().isdigit() else 0,
+        "birth_date": birth_date_text,
+        **attributes  # Incluye los atributos con sus valores
+    }
     
-async def scrape_team_players(team_url):
+async def scrape_team_players(team_url, sesion=None):
     """
     Scrape the names and links of football players from a team's page on BeSoccer.
 
     Args:
         team_url (str): URL of the team's page on BeSoccer.
+        sesion (navegador.SesionNavegador): Session to reuse; without one a browser is opened just for this team.
 
     Returns:
         list of dict: A list of dictionaries, each containing 'name' and 'link' of a player.
     """
-    players = []
+    if sesion is not None:
+        page = await sesion.pagina()
+        # La captura es de la sesión: se descarta lo de la página anterior
+        sesion.datos.limpiar("besoccer_plantilla")
+        await page.goto(team_url)
+        return await read_team_players(page, sesion.datos)
+
+    from playwright.async_api import async_playwright
 
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
+        captura = await captura_red.iniciar_captura(page, ["besoccer_plantilla"])
         await page.goto(team_url)
+        players = await read_team_players(page, captura)
+        await browser.close()
 
-        # Wait for the table with players to load
-        await page.wait_for_selector("#team_performance")
+    return players
 
-        # Extract player rows from the table
-        rows = await page.query_selector_all("#team_performance .row-body")
-        for row in rows:
-            name_element = await row.query_selector(".name a")
-            if name_element:
-                name = (await name_element.inner_text()).strip()
-                link = await name_element.get_attribute("href")
-                if name and link:
-                    players.append({"name": name, "link": link})
+async def read_team_players(page, captura):
+    """
+    Read the players of a team's page that is already loaded.
 
-        await browser.close()
+    Args:
+        page: Playwright page with the team's squad.
+        captura (captura_red.CapturaRed): Response capture of the page.
+
+    Returns:
+        list of dict: A list of dictionaries, each containing 'name' and 'link' of a player.
+    """
+    # If the squad JSON arrived, use it instead of waiting for the table to render
+    registros = await captura.esperar("besoccer_plantilla")
+    if registros:
+        return [{"name": r["name"].strip(), "link": r["link"]} for r in registros if r["name"].strip() and r["link"]]
+
+    # Wait for the table with players to load
+    await page.wait_for_selector("#team_performance")
+
+    # Extract player rows from the table
+    players = []
+    rows = await page.query_selector_all("#team_performance .row-body")
+    for row in rows:
+        name_element = await row.query_selector(".name a")
+        if name_element:
+            name = (await name_element.inner_text()).strip()
+            link = await name_element.get_attribute("href")
+            if name and link:
+                players.append({"name": name, "link": link})
 
     return players
 
-async def extract_team_links_besoccer(page):
+async def extract_team_links_besoccer(page, liga=None, cache=None):
     """
-    Extrae los enlaces de los equipos de una tabla específica en Besoccer.
+    Extrae los enlaces de los equipos de la tabla de clasificación en Besoccer.
 
     Args:
         page: Instancia de la página de Playwright.
+        liga: URL de la liga, llave de la caché de selectores (por defecto la de la página).
+        cache: Caché de selectores.cargar_cache; la tabla se detecta por su estructura si no
+            está en la caché o su selector dejó de servir.
 
     Returns:
         Una lista de enlaces completos de los equipos.
-    """
-    # Selecciona la tabla de equipos por la clase
-    table = await page.query_selector(".table-body.table-custom.competition-result")
 
+    Raises:
+        fallidos.SinDatos: Si la página no tiene una tabla de clasificación reconocible; así la
+            extracción de la liga falla en lugar de dejar un archivo crudo vacío.
+    """
     try:
         # Esperar el botón de cookies y rechazar si aparece
         await page.locator("#onetrust-reject-all-handler").click(timeout=5000)
-        print("Cookies rechazadas")
+        logging.info("Cookies rechazadas")
     except:
-        print("No apareció el popup de cookies")
+        logging.debug("No apareció el popup de cookies")
+
+    # Selecciona la tabla de equipos por su estructura (filas con enlace al equipo)
+    estructura = selectores.ESTRUCTURAS["besoccer_liga"]
+    cache = selectores.cargar_cache() if cache is None else cache
+    selector = await selectores.selector_tabla(page, liga or page.url, "besoccer_liga", cache)
+    table = await page.query_selector(selector) if selector else None
 
     if not table:
-        print("Tabla específica no encontrada.")
-        return []
+        raise fallidos.SinDatos(f"No se encontró la tabla de clasificación en {page.url}")
 
     # Selecciona las filas dentro de la tabla
-    rows = await table.query_selector_all("tr.row-body")
+    rows = await table.query_selector_all(estructura["filas"])
 
     # Lista para guardar los enlaces de los equipos
     team_links = []
@@ -169,7 +242,7 @@ async def extract_team_links_besoccer(page):
     # Extrae los enlaces de cada fila
     for row in rows:
         # Busca el enlace dentro de la fila (enlace a los equipos)
-        link_element = await row.query_selector("td.name a[data-cy='team']")
+        link_element = await row.query_selector(estructura["enlaces"])
         if link_element:
             href = await link_element.get_attribute("href")
             if href:
@@ -179,7 +252,7 @@ async def extract_team_links_besoccer(page):
                 team_name = href.split("/equipo/")[1]  # El nombre del equipo
                 full_link = f"{base_url}/equipo/plantilla/{team_name}"
                 team_links.append(full_link)
-                print(f"Extrayendo link de plantilla {full_link}")
+                logging.debug(f"Extrayendo link de plantilla {full_link}")
 
     return team_links
 
@@ -199,31 +272,80 @@ def guardar_en_csv(datos, archivo):
         # Escribe los datos del jugador
         writer.writerow(complete_data)
 
-async def main(url, output_csv):
+async def main(url, output_csv, reintentar=False):
+    """
+    Extrae los jugadores de una competición de BeSoccer.
+
+    Args:
+        url (str): URL de la competición.
+        output_csv (str): Archivo CSV de salida.
+        reintentar (bool): Procesar solo los equipos y jugadores de output_csv registrados en
+            fallidos.ARCHIVO_FALLIDOS; sus jugadores se agregan al CSV (los que fallaron no
+            tienen fila).
+    """
+    from playwright.async_api import async_playwright
+
+    cola = fallidos.ColaFallidos()
+
     async with async_playwright() as p:
         # Inicializa el navegador y abre una página
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
 
-        # Accede a la URL de la competición
-        await page.goto(url)
-
-        # Llamada a la función de extracción
-        team_links = await extract_team_links_besoccer(page)
-
-        players = []
-        for link in team_links:
-            scrape_players = await scrape_team_players(link)
-            players.extend(scrape_players)
-
-        print(f"Listado de jugadores:{players}")
-
-        for player in players:
-            print(f"Extrayendo datos de: {player['name']}")
-            info_player = await scrape_player_data(player['link'])  # Asegúrate de usar await aquí
-            print(info_player)
-            # Guardamos la información de cada jugador en el archivo CSV
-            guardar_en_csv(info_player, output_csv)
+        # Extrae los equipos de la competición (al reintentar, solo los que fallaron)
+        if reintentar:
+            team_links = list(cola.pendientes(output_csv, "equipo"))
+            players = [{"name": entrada["contexto"].get("nombre", link), "link": link} for link, entrada in cola.pendientes(output_csv, "jugador").items()]
+            logging.info(f"{output_csv}: reintentando {len(team_links)} equipos y {len(players)} jugadores fallidos.")
+        else:
+            # Accede a la URL de la competición
+            await page.goto(url)
+
+            # Llamada a la función de extracción
+            team_links = await extract_team_links_besoccer(page, url)
+            players = []
+
+        # Un solo navegador para todos los equipos y jugadores; la sesión recicla el contexto
+        # cada tantas navegaciones o si la memoria crece demasiado
+        sesion = navegador.SesionNavegador(
+            browser,
+            al_abrir=lambda nueva: captura_red.iniciar_captura(nueva, ["besoccer_plantilla", "besoccer_atributos"]),
+            nombre="besoccer",
+        )
+
+        try:
+            for link in team_links:
+                try:
+                    scrape_players = await scrape_team_players(link, sesion)
+                    if not scrape_players:
+                        raise fallidos.SinDatos(f"La plantilla de {link} no tiene jugadores")
+                except Exception as e:
+                    cola.registrar(link, "besoccer", "equipo", output_csv, e)
+                    continue
+                cola.resolver(link)
+                players.extend(scrape_players)
+
+            # Al reintentar, un jugador fallido puede volver a aparecer en la plantilla de un
+            # equipo fallido: se procesa una sola vez por enlace (con el nombre de la plantilla)
+            players = list({player['link']: player for player in players}.values())
+            logging.info(f"Se encontraron {len(players)} jugadores en {len(team_links)} equipos.")
+            logging.debug(f"Listado de jugadores:{players}")
+
+            for player in players:
+                logging.debug(f"Extrayendo datos de: {player['name']}")
+                try:
+                    info_player = await scrape_player_data(player['link'], sesion)  # Asegúrate de usar await aquí
+                except Exception as e:
+                    cola.registrar(player['link'], "besoccer", "jugador", output_csv, e, nombre=player['name'])
+                    continue
+                logging.debug(info_player)
+                # Guardamos la información de cada jugador en el archivo CSV
+                guardar_en_csv(info_player, output_csv)
+                cola.resolver(player['link'])
+        finally:
+            cola.guardar()
+
+        await sesion.cerrar()
 
         # Cierra el navegador
         await browser.close()
@@ -241,6 +363,8 @@ if __name__ == "__main__":
         print("Uso: python webscraping_besoccer.py <URL> <nombre_archivo_csv>")
         sys.exit(1)
 
+    registro.configurar(ARCHIVO_LOG)
+
     url = sys.argv[1]
     output_csv = sys.argv[2]
 
@@ -1,35 +1,54 @@
-from playwright.async_api import async_playwright
 import csv
 import asyncio
+import logging
+import re
 import sys
 
-async def extract_team_links(page):
+import archivos_ligas
+import captura_red
+import fallidos
+import navegador
+import refresco
+import registro
+import selectores
+from archivos_ligas import CAMPOS_TEMPORADA, archivo_temporadas
+
+async def extract_team_links(page, liga=None, cache=None):
     """
-    Extrae los enlaces de los equipos de una tabla específica.
+    Extrae los enlaces de los equipos de la tabla de posiciones.
 
     Args:
         page: Instancia de la página de Playwright.
+        liga: URL de la liga, llave de la caché de selectores (por defecto la de la página).
+        cache: Caché de selectores.cargar_cache; la tabla se detecta por su estructura si no
+            está en la caché o su selector dejó de servir.
 
     Returns:
         Una lista de enlaces completos de los equipos.
-    """
-    # Seleccionar la tabla específica por ID
-    table = await page.query_selector("#page_competition_1_block_competition_tables_12_block_competition_league_table_1_table") #esto funciona para chile
-    #table = await page.query_selector("#page_competition_1_block_competition_tables_13_block_competition_league_table_1_table") #esto par arg
 
+    Raises:
+        fallidos.SinDatos: Si la página no tiene una tabla de posiciones reconocible; así la
+            extracción de la liga falla en lugar de dejar un archivo crudo vacío.
+    """
     try:
         # Esperar el botón y hacer clic en "Rechazarlas todas"
         await page.locator("#onetrust-reject-all-handler").click(timeout=5000)
-        print("Cookies rechazadas")
+        logging.info("Cookies rechazadas")
     except:
-        print("No apareció el popup de cookies")
+        logging.debug("No apareció el popup de cookies")
+
+    # La tabla se busca por estructura (filas 'tr.team_rank' con enlace al equipo); el id
+    # cambia según la liga
+    estructura = selectores.ESTRUCTURAS["soccerway_liga"]
+    cache = selectores.cargar_cache() if cache is None else cache
+    selector = await selectores.selector_tabla(page, liga or page.url, "soccerway_liga", cache)
+    table = await page.query_selector(selector) if selector else None
 
     if not table:
-        print("Tabla específica no encontrada.")
-        return []
+        raise fallidos.SinDatos(f"No se encontró la tabla de posiciones en {page.url}")
 
     # Selecciona las filas dentro de esa tabla
-    rows = await table.query_selector_all("tr.team_rank")
+    rows = await table.query_selector_all(estructura["filas"])
 
     # Lista para guardar los enlaces
     team_links = []
@@ -37,18 +56,18 @@ async def extract_team_links(page):
     # Extraer enlaces de cada fila
     for row in rows:
         # Busca el enlace dentro de la fila
-        link_element = await row.query_selector("td.text.team.large-link a")
+        link_element = await row.query_selector(estructura["enlaces"])
         if link_element:
             href = await link_element.get_attribute("href")
             if href:
                 # Construir el enlace completo
                 full_link = f"https://el.soccerway.com{href}"
                 team_links.append(full_link)
-                print(f"Extrayendo link {full_link}")
+                logging.debug(f"Extrayendo link {full_link}")
 
     return team_links
 
-async def extract_player_links(page, team_url):
+async def extract_player_links(page, team_url, captura=None, liga=None, cache=None):
     """
 
     Extrae los enlaces de los jugadores desde la página de un equipo.
@@ -56,40 +75,53 @@ async def extract_player_links(page, team_url):
     Args:
         page: Instancia de la página de Playwright.
         team_url: URL del equipo.
+        captura: CapturaRed de la página; si llega el JSON de la plantilla no se espera la tabla.
+        liga: URL de la liga, llave de la caché de selectores de la tabla de la plantilla.
+        cache: Caché de selectores.cargar_cache.
 
     Returns:
         Una lista de enlaces completos de los jugadores.
+
+    Raises:
+        fallidos.SinDatos: Si la plantilla no trae jugadores; también propaga los errores de carga.
     """
     try:
 
-        print(f"esperando que cargue pagina")
+        logging.debug("Esperando que cargue pagina")
         # Navegar a la página del equipo
+        if captura:
+            captura.limpiar("soccerway_plantilla")
         await page.goto(team_url)
 
-        print("Esperando que cargue la tabla de jugadores...")
-        await page.wait_for_selector("#page_team_1_block_team_squad_12-table", timeout=60000) 
-        
-        
-            
-        # Seleccionar la tabla de la plantilla (squad container)
-        squad_table = await page.query_selector("#page_team_1_block_team_squad_12-table")
-        
-        print(f"esperando que cargue tabla")
+        registros = await captura.esperar("soccerway_plantilla") if captura else None
+        if registros:
+            player_links = links_desde_registros(registros)
+            if player_links:
+                logging.info(f"Se encontraron {len(player_links)} enlaces únicos de jugadores (respuesta JSON).")
+                return player_links
+
+        logging.debug("Esperando que cargue la tabla de jugadores...")
+        estructura = selectores.ESTRUCTURAS["soccerway_plantilla"]
+        await page.wait_for_selector(estructura["enlaces"], timeout=60000)
+
+        # Seleccionar la tabla de la plantilla (por estructura, o la guardada para la liga)
+        cache = selectores.cargar_cache() if cache is None else cache
+        selector = await selectores.selector_tabla(page, liga or team_url, "soccerway_plantilla", cache)
+        squad_table = await page.query_selector(selector) if selector else None
 
         if not squad_table:
-            print(f"No se encontró la tabla de jugadores en {team_url}")
-            return []
+            raise fallidos.SinDatos(f"No se encontró la tabla de jugadores en {team_url}")
 
         # Seleccionar todas las filas dentro de la tabla
         player_rows = await squad_table.query_selector_all("tr")
 
         # Usar un `set` para almacenar solo enlaces únicos
         player_links_set = set()
-        print("Extrayendo enlaces de los jugadores...")
+        logging.debug("Extrayendo enlaces de los jugadores...")
 
         for row in player_rows:
             # Buscar todos los enlaces dentro de cada fila
-            link_elements = await row.query_selector_all("a[href^='/players/']")
+            link_elements = await row.query_selector_all(estructura["enlaces"])
             
             for link_element in link_elements:
                 href = await link_element.get_attribute("href")
@@ -100,27 +132,65 @@ async def extract_player_links(page, team_url):
         # Convertimos el `set` a una lista para retornar
         player_links = list(player_links_set)
         
-        print(f"Se encontraron {len(player_links)} enlaces únicos de jugadores.")
+        if not player_links:
+            raise fallidos.SinDatos(f"La plantilla de {team_url} no tiene enlaces de jugadores")
+        logging.info(f"Se encontraron {len(player_links)} enlaces únicos de jugadores.")
         return player_links
     
     except Exception as e:
-        print(f"Error al cargar la página {team_url}: {e}")
-        return []
+        # Quien llama registra el equipo en fallidos.py, para reintentarlo
+        logging.error(f"Error al cargar la página {team_url}: {e}")
+        raise
+
+
+
+def links_desde_registros(registros):
+    """
+    Arma los enlaces de los jugadores desde los registros del JSON de la plantilla.
+
+    Args:
+        registros: Registros del esquema "soccerway_plantilla" de captura_red.
+
+    Returns:
+        Una lista de enlaces completos únicos (solo los de '/players/').
+    """
+    player_links = []
+    for registro in registros:
+        link = registro.get("link", "")
+        link = re.sub(r"^https?://[^/]+", "", link)
+        if link.startswith("/players/"):
+            player_links.append(f"https://el.soccerway.com{link}")
+    return list(dict.fromkeys(player_links))
+
+def temporadas_desde_registros(registros, player_url):
+    """
+    Arma las temporadas de un jugador desde los registros del JSON de su carrera.
 
+    Args:
+        registros: Registros del esquema "soccerway_carrera" de captura_red.
+        player_url: URL del jugador.
 
+    Returns:
+        Una lista de temporadas con la URL del jugador y los campos de CAMPOS_TEMPORADA.
+    """
+    return [{"URL": player_url, **{campo: registro.get(campo, "") for campo in CAMPOS_TEMPORADA}} for registro in registros]
 
-async def extract_player_info(page, player_url):
+async def extract_player_info(page, player_url, captura=None):
     """
     Extrae la información de un jugador desde su página.
     
     Args:
         page: Instancia de la página de Playwright.
         player_url: URL del jugador.
+        captura: CapturaRed de la página; si llega el JSON de la carrera no se recorre la tabla.
     
     Returns:
-        Un diccionario con la información del jugador.
+        Una tupla con el diccionario de información del jugador y la lista de sus temporadas,
+        una fila por temporada con la URL del jugador y los campos de CAMPOS_TEMPORADA.
     """
     # Navegar a la página del jugador
+    if captura:
+        captura.limpiar("soccerway_carrera")
     await page.goto(player_url)
 
     # Extraer la información del jugador
@@ -156,6 +226,12 @@ async def extract_player_info(page, player_url):
     # Agregar la URL del jugador al diccionario
     player_info['URL'] = player_url
 
+    registros = await captura.esperar("soccerway_carrera") if captura else None
+    if registros:
+        return player_info, temporadas_desde_registros(registros, player_url)
+
+    temporadas = []
+
     try:
         # Seleccionar la tabla de estadísticas correcta
         stats_table = await page.query_selector("#page_player_1_block_player_career_9_table")
@@ -164,35 +240,30 @@ async def extract_player_info(page, player_url):
             # Obtener todas las filas de la tabla
             rows = await stats_table.query_selector_all("tbody tr")
 
-            # Tomar solo las dos primeras filas (temporada actual y anterior)
-            for row in rows[:2]:  
+            # Una fila por temporada de la carrera del jugador
+            for row in rows:
                 cols = await row.query_selector_all("td")
 
                 # Asegurar que hay suficientes columnas para extraer datos
                 if len(cols) >= 13:
                     team_link = await cols[1].query_selector("a")
                     league_link = await cols[2].query_selector("a")
-                    temporada = await cols[0].inner_text()
-
-                    # Agregar cada campo como una nueva clave en el diccionario
-                    player_info[f"{temporada}_Temporada"] = temporada
-                    player_info[f"{temporada}_Equipo"] = await team_link.get_attribute("title") if team_link else await cols[1].inner_text()
-                    player_info[f"{temporada}_Liga"] = await league_link.inner_text() if league_link else await cols[2].inner_text()
-                    player_info[f"{temporada}_Minutos Jugados"] = await cols[3].inner_text()
-                    player_info[f"{temporada}_Apariciones"] = await cols[4].inner_text()
-                    player_info[f"{temporada}_Alineaciones"] = await cols[5].inner_text()
-                    player_info[f"{temporada}_Entra"] = await cols[6].inner_text()
-                    player_info[f"{temporada}_Sale"] = await cols[7].inner_text()
-                    player_info[f"{temporada}_Comenzó de suplente"] = await cols[8].inner_text()
-                    player_info[f"{temporada}_Gol"] = await cols[9].inner_text()
-                    player_info[f"{temporada}_Amarilla"] = await cols[10].inner_text()
-                    player_info[f"{temporada}_Segunda Amarilla"] = await cols[11].inner_text()
-                    player_info[f"{temporada}_Roja"] = await cols[12].inner_text()
+
+                    temporada = {'URL': player_url}
+                    temporada["Temporada"] = await cols[0].inner_text()
+                    temporada["Equipo"] = await team_link.get_attribute("title") if team_link else await cols[1].inner_text()
+                    temporada["Liga"] = await league_link.inner_text() if league_link else await cols[2].inner_text()
+
+                    # Los campos numéricos van desde la cuarta columna en adelante
+                    for campo, col in zip(CAMPOS_TEMPORADA[3:], cols[3:13]):
+                        temporada[campo] = await col.inner_text()
+
+                    temporadas.append(temporada)
 
     except Exception as e:
         logging.warning(f"No se pudieron extraer las temporadas de {player_url}: {e}")
 
-    return player_info
+    return player_info, temporadas
 
 # Función para guardar los datos en un archivo CSV
 def guardar_en_csv(datos, archivo):
@@ -206,12 +277,37 @@ def guardar_en_csv(datos, archivo):
         # Escribe los datos del jugador
         writer.writerow(datos)
 
+async def main(url, output_csv, presupuesto=None, archivo_panel=None, reintentar=False):
+    """
+    Extrae los jugadores de una competición de Soccerway.
+
+    Args:
+        url: URL de la competición.
+        output_csv: Archivo CSV de salida.
+        presupuesto: refresco.Presupuesto; si se indica, los perfiles se visitan por prioridad
+            hasta que se acabe el tiempo, se reemplazan sus filas en el CSV y los demás quedan
+            pendientes en refresco.ARCHIVO_ESTADO.
+        archivo_panel: CSV del panel para calcular la prioridad (por defecto archivos_ligas.archivo_csv).
+        reintentar: Procesar solo los equipos y jugadores de output_csv registrados en
+            fallidos.ARCHIVO_FALLIDOS y reemplazar sus filas en el CSV.
+    """
+    from playwright.async_api import async_playwright
+
+    cola = fallidos.ColaFallidos()
+    # Con presupuesto o al reintentar, las filas nuevas reemplazan a las de la extracción anterior
+    reemplazar = presupuesto is not None or reintentar
 
-async def main(url, output_csv):
     async with async_playwright() as playwright:
         browser = await playwright.chromium.launch(headless=False)  # Cambia a False si quieres ver el navegador
-        context = await browser.new_context()
-        page = await context.new_page()
+
+        # La página se recicla cada tantas navegaciones o si la memoria pasa el límite (navegador.py);
+        # cada página nueva vuelve a capturar las respuestas JSON
+        sesion = navegador.SesionNavegador(
+            browser,
+            al_abrir=lambda page: captura_red.iniciar_captura(page, ["soccerway_plantilla", "soccerway_carrera"]),
+            nombre="soccerway",
+        )
+        page = await sesion.pagina()
 
         # Navega a la página
         await page.goto(url)
@@ -219,32 +315,79 @@ async def main(url, output_csv):
         try:
             # Intentar cerrar el popup de cookies si existe
             await page.locator("#onetrust-reject-all-handler").click(timeout=5000)
-            print("Cookies rechazadas")
+            logging.info("Cookies rechazadas")
         except:
-            print("No apareció el popup de cookies")
-
-        # Extraer enlaces de los equipos
-        team_links = await extract_team_links(page)
-
-        all_player_links = []
-        for team_url in team_links:
-            player_links = await extract_player_links(page, team_url)
-            all_player_links.extend(player_links)
-
-        print(f"Se extrajeron {len(all_player_links)} jugadores")
-
-        # Guardar los datos de los jugadores en un archivo CSV
-        for player_url in all_player_links:
-            try:
-                print(f"Extrayendo información de: {player_url}")
-                player_info = await extract_player_info(page, player_url)
-                if player_info:  # Verifica que la extracción fue exitosa
-                    guardar_en_csv(player_info, output_csv)
-                else:
-                    print(f"⚠️ No se pudo extraer información de {player_url}")
-            except Exception as e:
-                print(f"❌ Error al procesar {player_url}: {e}")
-
+            logging.debug("No apareció el popup de cookies")
+
+        # Selectores de las tablas de esta liga, detectados en una ejecución anterior
+        cache = selectores.cargar_cache()
+
+        # Extraer enlaces de los equipos (al reintentar, solo los que fallaron)
+        if reintentar:
+            team_links = list(cola.pendientes(output_csv, "equipo"))
+            all_player_links = list(cola.pendientes(output_csv, "jugador"))
+            logging.info(f"{output_csv}: reintentando {len(team_links)} equipos y {len(all_player_links)} jugadores fallidos.")
+        else:
+            team_links = await extract_team_links(page, url, cache)
+            all_player_links = []
+
+        jugadores, temporadas_jugadores, visitados = [], [], 0
+        estado = refresco.cargar_estado()
+        try:
+            for team_url in team_links:
+                page = await sesion.pagina()
+                try:
+                    player_links = await extract_player_links(page, team_url, sesion.datos, url, cache)
+                except Exception as e:
+                    cola.registrar(team_url, "soccerway", "equipo", output_csv, e)
+                    continue
+                cola.resolver(team_url)
+                all_player_links.extend(player_links)
+
+            logging.info(f"Se extrajeron {len(all_player_links)} jugadores")
+
+            if presupuesto is not None:
+                panel = refresco.datos_panel(archivo_panel or archivos_ligas.archivo_csv)
+                all_player_links = refresco.ordenar_por_prioridad(all_player_links, panel, estado)
+            elif reintentar:
+                all_player_links = list(dict.fromkeys(all_player_links))
+
+            # Guardar los datos de los jugadores en un archivo CSV
+            for player_url in all_player_links:
+                if presupuesto is not None and presupuesto.agotado():
+                    break
+                visitados += 1
+                try:
+                    logging.debug(f"Extrayendo información de: {player_url}")
+                    page = await sesion.pagina()
+                    player_info, temporadas = await extract_player_info(page, player_url, sesion.datos)
+                    if player_info:  # Verifica que la extracción fue exitosa
+                        if reemplazar:
+                            # Las filas se reemplazan al final, para no duplicar las de la extracción anterior
+                            jugadores.append(player_info)
+                            temporadas_jugadores.extend(temporadas)
+                        else:
+                            guardar_en_csv(player_info, output_csv)
+                            for temporada in temporadas:
+                                guardar_en_csv(temporada, archivo_temporadas(output_csv))
+                        refresco.marcar_refrescado(estado, player_url)
+                        cola.resolver(player_url)
+                    else:
+                        cola.registrar(player_url, "soccerway", "jugador", output_csv, fallidos.SinDatos("Perfil sin datos"))
+                except Exception as e:
+                    cola.registrar(player_url, "soccerway", "jugador", output_csv, e)
+        finally:
+            if reemplazar:
+                refresco.reemplazar_filas(output_csv, jugadores)
+                refresco.reemplazar_filas(archivo_temporadas(output_csv), temporadas_jugadores)
+            if presupuesto is not None:
+                restantes = all_player_links[visitados:]
+                refresco.marcar_pendientes(estado, restantes)
+                logging.info(f"{output_csv}: {len(jugadores)} perfiles refrescados por prioridad; {len(restantes)} quedan pendientes.")
+            refresco.guardar_estado(estado)
+            cola.guardar()
+
+        await sesion.cerrar()
         await browser.close()
 
 # Manejo de argumentos
@@ -255,7 +398,8 @@ if __name__ == "__main__":
 
     url = sys.argv[1]
     output_csv = sys.argv[2]
+    registro.configurar(archivo=None)
 
     # Ejecutar main con los parámetros recibidos
     asyncio.run(main(url, output_csv))
-    print("Programa finalizado")
\ No newline at end of file
+    logging.info("Programa finalizado")
\ No newline at end of file
@@ -1,30 +1,355 @@
-from playwright.async_api import async_playwright
 import asyncio
 import csv
-import sys
-
-BASE_URL = "https://www.transfermarkt.es"
-
+import json
 import logging
-from playwright.async_api import async_playwright
+import os
+import re
+import sys
+from datetime import date
 
-# Configuración de logging
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.StreamHandler()
-    ]
-)
+import fallidos
+import navegador
+import refresco
+import registro
 
 BASE_URL = "https://www.transfermarkt.es"
 
-async def extract_players_from_club(club_url, club_name):
+# Modo de extracción de cada club:
+# - "detalle": lee la vista detallada de la plantilla (una página por club, con fecha de
+#   nacimiento, pie, fichado y contrato) y solo abre el perfil de un jugador para los datos
+#   que la plantilla no trae (nombre completo, posición secundaria, agente) cuando no están
+#   en la caché de perfiles o ya vencieron.
+# - "perfiles": abre el perfil de cada jugador en cada ejecución (modo anterior).
+MODO_EXTRACCION = "detalle"
+
+# Caché de los datos que solo están en el perfil, por link del jugador
+ARCHIVO_PERFILES = "perfiles_transfermarkt.json"
+DIAS_VIGENCIA_PERFIL = 90
+CAMPOS_PERFIL = ["full_name", "secondary_position", "agente"]
+
+# Columnas de la vista detallada -> inicio del texto de su encabezado (en orden de búsqueda:
+# "F. Nacim./Edad" se reconoce antes que "Nac.")
+ENCABEZADOS_DETALLE = {
+    "birth_date": ["f. nacim", "nacim"],
+    "nationality": ["nac"],
+    "pie": ["pie"],
+    "fichado": ["fichado"],
+    "contrato_hasta": ["contrato"],
+    "market_value": ["valor de mercado", "valor"],
+}
+
+COLUMNAS_CSV = ["Nombre Jugador", "Fecha Nacimiento", "Posicion", "Posicion Secundaria", "Equipo", "Link Jugador", "Valor de Mercado", "Nacionalidad", "Pie", "Agente", "Fichado", "Contrato Hasta"]
+CAMPOS_CSV = ["full_name", "birth_date", "position", "secondary_position", "club_name", "player_link", "market_value", "nationality", "pie", "agente", "fichado", "contrato_hasta"]
+
+# Lee la tabla de la plantilla en una sola llamada al navegador, en lugar de un query por celda
+JS_TABLA_PLANTILLA = """
+() => {
+    const tabla = document.querySelector("#yw1 table.items");
+    if (!tabla) return {encabezados: [], filas: []};
+    const encabezados = [];
+    for (const th of tabla.querySelectorAll(":scope > thead > tr > th")) {
+        for (let i = 0; i < (th.colSpan || 1); i++) encabezados.push(th.innerText.trim());
+    }
+    const filas = [];
+    for (const tr of tabla.querySelectorAll(":scope > tbody > tr")) {
+        const enlace = tr.querySelector("td.posrela table.inline-table tr:nth-child(1) td:nth-child(2) a");
+        if (!enlace) continue;
+        const posicion = tr.querySelector("td.posrela table.inline-table tr:nth-child(2) td:nth-child(1)");
+        const celdas = [...tr.querySelectorAll(":scope > td")];
+        filas.push({
+            nombre: enlace.innerText.trim(),
+            link: enlace.getAttribute("href") || "",
+            posicion: posicion ? posicion.innerText.trim() : "",
+            textos: celdas.map(td => td.innerText.trim()),
+            banderas: celdas.map(td => [...td.querySelectorAll("img")].map(img => img.title || img.alt || "").filter(t => t)),
+        });
+    }
+    return {encabezados, filas};
+}
+"""
+
+def url_plantilla_detallada(club_url):
+    """
+    Convierte la URL de un club (…/startseite/verein/ID/…) en la de su plantilla detallada
+    (…/kader/verein/ID/…/plus/1).
+
+    Args:
+        club_url (str): URL del club tomada de la tabla de la liga.
+
+    Returns:
+        str: URL de la plantilla detallada.
+    """
+    url = re.sub(r"/startseite/verein/", "/kader/verein/", club_url.rstrip("/"))
+    url = re.sub(r"/plus/\d+$", "", url)
+    return url + "/plus/1"
+
+def indices_por_encabezado(encabezados):
+    """
+    Ubica cada dato en las columnas de la plantilla detallada según el texto del encabezado,
+    así el orden de las columnas puede variar entre temporadas.
+
+    Args:
+        encabezados (list): Texto de cada columna (repetido si ocupa varias).
+
+    Returns:
+        dict: Dato -> índice de columna, solo para los datos encontrados.
+    """
+    indices = {}
+    usados = set()
+    for campo, prefijos in ENCABEZADOS_DETALLE.items():
+        for i, encabezado in enumerate(encabezados):
+            if i not in usados and any(encabezado.lower().startswith(prefijo) for prefijo in prefijos):
+                indices[campo] = i
+                usados.add(i)
+                break
+    return indices
+
+def fila_a_jugador(fila, indices, club_name):
+    """
+    Arma los datos de un jugador desde una fila de la plantilla detallada. Los datos que la
+    plantilla no trae quedan en None para completarlos desde el perfil.
+
+    Args:
+        fila (dict): Fila leída con JS_TABLA_PLANTILLA.
+        indices (dict): Resultado de 'indices_por_encabezado'.
+        club_name (str): Nombre del club.
+
+    Returns:
+        dict: Datos del jugador con las mismas claves que el modo "perfiles".
+    """
+    def texto(campo):
+        i = indices.get(campo)
+        if i is None or i >= len(fila["textos"]) or not fila["textos"][i]:
+            return None
+        return fila["textos"][i]
+
+    nacionalidad = None
+    if "nationality" in indices and indices["nationality"] < len(fila["banderas"]):
+        banderas = fila["banderas"][indices["nationality"]]
+        nacionalidad = banderas[0] if banderas else None
+
+    return {
+        "full_name": None,
+        "birth_date": texto("birth_date"),
+        "position": fila["posicion"] or "Sin posición",
+        "secondary_position": None,
+        "market_value": texto("market_value") or "Sin valor",
+        "nationality": nacionalidad,
+        "club_name": club_name,
+        "pie": texto("pie"),
+        "agente": None,
+        "player_link": BASE_URL + fila["link"] if fila["link"] else "Sin link",
+        "fichado": texto("fichado"),
+        "contrato_hasta": texto("contrato_hasta"),
+        "display_name": fila["nombre"],
+    }
+
+def cargar_perfiles(archivo=ARCHIVO_PERFILES):
+    """
+    Carga la caché de datos de perfil.
+
+    Args:
+        archivo (str): Archivo JSON de la caché.
+
+    Returns:
+        dict: Link del jugador -> {"fecha": AAAA-MM-DD, "campos": {...}}.
+    """
+    try:
+        with open(archivo, encoding="utf-8") as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+def guardar_perfiles(perfiles, archivo=ARCHIVO_PERFILES):
+    """
+    Guarda la caché de datos de perfil de forma atómica.
+
+    Args:
+        perfiles (dict): Caché a guardar.
+        archivo (str): Archivo JSON de la caché.
+    """
+    temporal = archivo + ".tmp"
+    with open(temporal, "w", encoding="utf-8") as file:
+        json.dump(perfiles, file, ensure_ascii=False, indent=1)
+    os.replace(temporal, archivo)
+
+def perfil_vigente(perfiles, player_link, hoy=None):
+    """
+    Devuelve los datos de perfil guardados de un jugador si están completos y no vencieron.
+
+    Args:
+        perfiles (dict): Caché de perfiles.
+        player_link (str): Link del jugador.
+        hoy (date): Fecha de referencia; por defecto hoy.
+
+    Returns:
+        dict: Campos de CAMPOS_PERFIL, o None si hay que visitar el perfil.
+    """
+    guardado = perfiles.get(player_link)
+    if not guardado or not all(campo in guardado.get("campos", {}) for campo in CAMPOS_PERFIL):
+        return None
+    hoy = hoy or date.today()
+    if (hoy - date.fromisoformat(guardado["fecha"])).days > DIAS_VIGENCIA_PERFIL:
+        return None
+    return guardado["campos"]
+
+async def leer_perfil(page, player_name, position, club_name):
+    """
+    Lee los datos del perfil de un jugador ya abierto en una página.
+
+    Args:
+        page: Página de Playwright con el perfil cargado.
+        player_name (str): Nombre del jugador en la plantilla (para los mensajes).
+        position (str): Posición principal (valor por defecto de la secundaria).
+        club_name (str): Club de la plantilla (valor por defecto del club actual).
+
+    Returns:
+        dict: full_name (None si no se encontró), secondary_position, birth_date, pie, agente,
+        club_actual, fichado y contrato_hasta.
+    """
+    perfil = {
+        "full_name": None,
+        "secondary_position": position,
+        "birth_date": "Sin fecha",
+        "pie": "Desconocido",
+        "agente": "Desconocido",
+        "club_actual": club_name,
+        "fichado": "Desconocido",
+        "contrato_hasta": "Desconocido",
+    }
+
+    try:
+        # Espera a que la sección del nombre completo esté disponible
+        await page.wait_for_selector("span.info-table__content.info-table__content--bold", timeout=5000)
+
+        # Extrae el nombre completo desde el selector
+        full_name_element = await page.query_selector("span.info-table__content.info-table__content--bold")
+        if full_name_element:
+            perfil["full_name"] = await full_name_element.inner_text()  # Extrae el nombre completo
+            logging.debug(f"Nombre completo extraído: {perfil['full_name']}")
+        else:
+            logging.warning(f"Nombre completo no encontrado para {player_name}. Usando el nombre encontrado en la lista.")
+    except Exception as e:
+        logging.error(f"Error al obtener el nombre completo para {player_name}: {e}")
+
+    # Extraer los detalles del jugador como posición secundaria, pie, agente, etc.
+    try:
+        await page.wait_for_selector(".detail-position", timeout=5000)  # Espera por el selector
+        secondary_position_element = await page.query_selector(
+            "div.detail-position__box div.detail-position__position:nth-child(2) dd.detail-position__position"
+        )
+        if secondary_position_element:
+            perfil["secondary_position"] = (await secondary_position_element.inner_text()).strip()
+            logging.debug(f"Posición secundaria detectada para {player_name}: {perfil['secondary_position']}")
+
+        # Fecha de nacimiento
+        birth_date_element = await page.query_selector('span:has-text("F. Nacim./Edad:") + span')
+        perfil["birth_date"] = await birth_date_element.inner_text() if birth_date_element else "Sin fecha"
+
+        # Pie
+        pie_element = await page.query_selector('span:has-text("Pie:") + span')
+        perfil["pie"] = await pie_element.inner_text() if pie_element else "Desconocido"
+
+        # Agente
+        agente_element = await page.query_selector('span:has-text("Agente:") + span')
+        perfil["agente"] = await agente_element.inner_text() if agente_element else "Desconocido"
+
+        # Club Actual
+        club_actual_element = await page.query_selector('span:has-text("Club actual:") + a')
+        perfil["club_actual"] = await club_actual_element.inner_text() if club_actual_element else club_name
+
+        # Fichado
+        fichado_element = await page.query_selector('span.info-table__content--regular:has-text("Fichado:") + span')
+        perfil["fichado"] = (await fichado_element.inner_text()).strip() if fichado_element else "Desconocido"
+
+        # Contrato hasta
+        contrato_hasta_element = await page.query_selector('span:has-text("Contrato hasta:") + span')
+        perfil["contrato_hasta"] = (await contrato_hasta_element.inner_text()).strip() if contrato_hasta_element else "Desconocido"
+    except Exception as e:
+        logging.error(f"Error al obtener detalles para {player_name}: {e}")
+
+    return perfil
+
+async def extract_players_from_club_detalle(sesion, club_url, club_name, perfiles, cola=None, archivo=None):
+    """
+    Extrae los jugadores de un club desde su plantilla detallada (una página) y abre el perfil
+    solo de los jugadores a los que les falta algún dato: los de CAMPOS_PERFIL que no están
+    vigentes en la caché, o una columna que la plantilla no trajo.
+
+    Args:
+        sesion (navegador.SesionNavegador): Sesión con la página a usar (se recicla sola).
+        club_url (str): URL del club.
+        club_name (str): Nombre del club.
+        perfiles (dict): Caché de perfiles (se actualiza).
+        cola (fallidos.ColaFallidos): Registro de los perfiles que no se pudieron abrir.
+        archivo (str): Archivo crudo de la extracción, para el registro de fallidos.
+
+    Returns:
+        list: Jugadores con las mismas claves que 'extract_players_from_club'.
+    """
+    page = await sesion.pagina()
+    url = url_plantilla_detallada(club_url)
+    logging.info(f"Iniciando extracción para el club: {club_name} ({url})")
+    await page.goto(url)
+    await page.wait_for_selector("#yw1 .items")
+    tabla = await page.evaluate(JS_TABLA_PLANTILLA)
+
+    indices = indices_por_encabezado(tabla["encabezados"])
+    faltantes = [campo for campo in ENCABEZADOS_DETALLE if campo not in indices]
+    if faltantes:
+        logging.warning(f"La plantilla de {club_name} no trae las columnas {faltantes}; se leerán del perfil.")
+
+    players = []
+    visitas = 0
+    for fila in tabla["filas"]:
+        player = fila_a_jugador(fila, indices, club_name)
+        nombre = player.pop("display_name")
+        link = player["player_link"]
+
+        guardado = perfil_vigente(perfiles, link) if link != "Sin link" else None
+        if guardado:
+            player.update(guardado)
+
+        necesita_perfil = [campo for campo, valor in player.items() if valor is None]
+        if necesita_perfil and link != "Sin link":
+            visitas += 1
+            page = await sesion.pagina()
+            try:
+                await page.goto(link)
+                perfil = await leer_perfil(page, nombre, player["position"], club_name)
+            except Exception as e:
+                logging.error(f"Error al abrir el perfil de {nombre}: {e}")
+                if cola is not None:
+                    cola.registrar(link, "transfermarkt", "jugador", archivo, e, club_url=club_url, club_name=club_name)
+                perfil = None
+
+            if perfil:
+                perfil["full_name"] = perfil["full_name"] or nombre
+                for campo in necesita_perfil:
+                    if campo in perfil:
+                        player[campo] = perfil[campo]
+                perfiles[link] = {"fecha": date.today().isoformat(), "campos": {campo: perfil[campo] for campo in CAMPOS_PERFIL}}
+
+        # Lo que no se pudo completar queda con los mismos valores por defecto del modo "perfiles"
+        player["full_name"] = player["full_name"] or nombre
+        player["secondary_position"] = player["secondary_position"] or player["position"]
+        player["birth_date"] = player["birth_date"] or "Sin fecha"
+        player["nationality"] = player["nationality"] or "Sin nacionalidad"
+        for campo in ["pie", "agente", "fichado", "contrato_hasta"]:
+            player[campo] = player[campo] or "Desconocido"
+        players.append(player)
+
+    logging.info(f"{club_name}: {len(players)} jugadores desde la plantilla, {visitas} perfiles visitados.")
+    return players
+
+async def extract_players_from_club(club_url, club_name, cola=None, archivo=None):
+    from playwright.async_api import async_playwright
+
     async with async_playwright() as p:
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
 
-        print(f"Iniciando extracción para el club: {club_name}")
+        logging.info(f"Iniciando extracción para el club: {club_name}")
 
         # Accede a la URL del club
         await page.goto(club_url)
@@ -34,19 +359,20 @@ async def extract_players_from_club(club_url, club_name):
 
         # Extrae las filas de la tabla de jugadores que están dentro de #yw1
         player_rows = await page.query_selector_all("#yw1 .items tbody tr")
-        print(f"Total de filas en la tabla de jugadores: {len(player_rows)}")
+        logging.debug(f"Total de filas en la tabla de jugadores: {len(player_rows)}")
 
         # Filtra filas válidas que contengan información
         valid_rows = [
             row for row in player_rows if await row.query_selector("td.posrela table.inline-table tr:nth-child(1) td:nth-child(2) a")
         ]
-        print(f"Filas válidas con jugadores detectadas: {len(valid_rows)}")
+        logging.debug(f"Filas válidas con jugadores detectadas: {len(valid_rows)}")
 
         # Extrae la información de cada jugador
         players = []
         for index, player_row in enumerate(valid_rows):
+            player_link = None
             try:
-                print(f"Procesando jugador {index + 1}/{len(valid_rows)} del club {club_name}")
+                logging.debug(f"Procesando jugador {index + 1}/{len(valid_rows)} del club {club_name}")
                 
                 # Nombre del jugador
                 player_name_element = await player_row.query_selector("td.hauptlink a")
@@ -55,7 +381,7 @@ async def extract_players_from_club(club_url, club_name):
                 # Link al perfil del jugador
                 player_link = await player_name_element.get_attribute("href") if player_name_element else ""
                 player_link = BASE_URL + player_link if player_link else "Sin link"
-                print(f"Jugador detectado: {player_name} - Link: {player_link}")
+                logging.debug(f"Jugador detectado: {player_name} - Link: {player_link}")
                 
                 
                 # Posición principal
@@ -82,63 +408,20 @@ async def extract_players_from_club(club_url, club_name):
 
                 # Solo accedemos al perfil del jugador si el enlace es válido
                 if player_link != "Sin link":
-                    print(f"Accediendo al perfil del jugador: {player_name}")
+                    logging.debug(f"Accediendo al perfil del jugador: {player_name}")
                     new_page = await browser.new_page()  # Abrir una nueva página
                     await new_page.goto(player_link)
 
                     try:
-                        # Espera a que la sección del nombre completo esté disponible
-                        await new_page.wait_for_selector("span.info-table__content.info-table__content--bold", timeout=5000)
-                        
-                        # Extrae el nombre completo desde el selector
-                        full_name_element = await new_page.query_selector("span.info-table__content.info-table__content--bold")
-                        if full_name_element:
-                            full_name = await full_name_element.inner_text()  # Extrae el nombre completo
-                            print(f"Nombre completo extraído: {full_name}")
-                        else:
-                            logging.warning(f"Nombre completo no encontrado para {player_name}. Usando el nombre encontrado en la lista.")
-                    except Exception as e:
-                        logging.error(f"Error al obtener el nombre completo para {player_name}: {e}")
-
-                    # Extraer los detalles del jugador como posición secundaria, pie, agente, etc.
-                    try:
-                        await new_page.wait_for_selector(".detail-position", timeout=5000)  # Espera por el selector
-                        secondary_position_element = await new_page.query_selector(
-                            "div.detail-position__box div.detail-position__position:nth-child(2) dd.detail-position__position"
-                        )
-                        secondary_position = position  # Por defecto, igual a la posición principal
-                        if secondary_position_element:
-                            secondary_position = await secondary_position_element.inner_text()
-                            secondary_position = secondary_position.strip()
-                            print(f"Posición secundaria detectada para {player_name}: {secondary_position}")
-                        
-                        # Fecha de nacimiento
-                        birth_date_element = await new_page.query_selector('span:has-text("F. Nacim./Edad:") + span')
-                        birth_date = await birth_date_element.inner_text() if birth_date_element else "Sin fecha"
-
-                        # Pie
-                        pie_element = await new_page.query_selector('span:has-text("Pie:") + span')
-                        pie = await pie_element.inner_text() if pie_element else "Desconocido"
-
-                        # Agente
-                        agente_element = await new_page.query_selector('span:has-text("Agente:") + span')
-                        agente = await agente_element.inner_text() if agente_element else "Desconocido"
-
-                        # Club Actual
-                        club_actual_element = await new_page.query_selector('span:has-text("Club actual:") + a')
-                        club_actual = await club_actual_element.inner_text() if club_actual_element else club_name
-
-                        # Fichado
-                        fichado_element = await new_page.query_selector('span.info-table__content--regular:has-text("Fichado:") + span')
-                        fichado = await fichado_element.inner_text() if fichado_element else "Desconocido"
-                        fichado = fichado.strip()  # Eliminar posibles espacios extra
-
-                        # Contrato hasta
-                        contrato_hasta_element = await new_page.query_selector('span:has-text("Contrato hasta:") + span')
-                        contrato_hasta = await contrato_hasta_element.inner_text() if contrato_hasta_element else "Desconocido"
-                        contrato_hasta = contrato_hasta.strip()  # Eliminar posibles espacios extra
-                    except Exception as e:
-                        logging.error(f"Error al obtener detalles para {player_name}: {e}")
+                        perfil = await leer_perfil(new_page, player_name, position, club_name)
+                        full_name = perfil["full_name"] or full_name
+                        secondary_position = perfil["secondary_position"]
+                        birth_date = perfil["birth_date"]
+                        pie = perfil["pie"]
+                        agente = perfil["agente"]
+                        club_actual = perfil["club_actual"]
+                        fichado = perfil["fichado"]
+                        contrato_hasta = perfil["contrato_hasta"]
                     finally:
                         await new_page.close()
 
@@ -160,6 +443,12 @@ async def extract_players_from_club(club_url, club_name):
 
             except Exception as e:
                 logging.error(f"Error al procesar jugador {index + 1}: {e}")
+                if cola is not None:
+                    # Sin el link del jugador se reintenta el club completo
+                    if player_link and player_link != "Sin link":
+                        cola.registrar(player_link, "transfermarkt", "jugador", archivo, e, club_url=club_url, club_name=club_name)
+                    else:
+                        cola.registrar(club_url, "transfermarkt", "equipo", archivo, e, club_name=club_name)
 
         await browser.close()
 
@@ -168,65 +457,126 @@ async def extract_players_from_club(club_url, club_name):
 
     
 
-async def extract_table(url, output_csv):
+def clubes_fallidos(cola, archivo):
+    """
+    Clubes a reintentar de un archivo: los que fallaron y los de los jugadores que fallaron.
+
+    Args:
+        cola (fallidos.ColaFallidos): Registro de fallidos.
+        archivo (str): Archivo crudo de la extracción.
+
+    Returns:
+        dict: URL del club -> nombre del club.
+    """
+    clubes = {}
+    for url, entrada in cola.pendientes(archivo).items():
+        if entrada["tipo"] == "equipo":
+            clubes[url] = entrada["contexto"].get("club_name", "Sin equipo")
+        else:
+            clubes[entrada["contexto"]["club_url"]] = entrada["contexto"].get("club_name", "Sin equipo")
+    return clubes
+
+async def extract_table(url, output_csv, modo=None, reintentar=False):
+    """
+    Extrae los jugadores de todos los clubes de una liga y los guarda en un CSV.
+
+    Args:
+        url (str): URL de la liga en Transfermarkt.
+        output_csv (str): Archivo CSV de salida.
+        modo (str): "detalle" o "perfiles"; por defecto MODO_EXTRACCION.
+        reintentar (bool): Volver a extraer solo los clubes de output_csv con equipos o
+            jugadores registrados en fallidos.ARCHIVO_FALLIDOS; sus jugadores reemplazan a los
+            del CSV con el mismo link.
+    """
+    from playwright.async_api import async_playwright
+
+    modo = modo or MODO_EXTRACCION
+    perfiles = cargar_perfiles() if modo == "detalle" else None
+    cola = fallidos.ColaFallidos()
+
     async with async_playwright() as p:
         # Abre un navegador Chromium
         browser = await p.chromium.launch(headless=False)
         page = await browser.new_page()
 
-        # Accede a la URL de Transfermarkt
-        await page.goto(url)
-
-        # Espera que la tabla esté cargada
-        await page.wait_for_selector("#yw1")
-
-        # Extrae las filas de la tabla
-        rows = await page.query_selector_all("#yw1 .items tbody tr")
-
-        # Abre el archivo CSV para escribir los datos
-        with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
-            writer = csv.writer(file)
-            writer.writerow(["Nombre Jugador", "Fecha Nacimiento", "Posicion","Posicion Secundaria", "Equipo", "Link Jugador", "Valor de Mercado", "Nacionalidad","Pie","Agente","Fichado","Contrato Hasta"])  # Cabecera
-
-            # Itera sobre cada club (en este caso, limita a los primeros N clubes si se necesita)
-            for row in rows:
-                club_name_element = await row.query_selector("td.hauptlink.no-border-links a")
-                club_name = await club_name_element.inner_text() if club_name_element else "Sin equipo"
-                club_url_element = await row.query_selector("td.hauptlink.no-border-links a")
-                club_url = await club_url_element.get_attribute('href') if club_url_element else ""
-                club_url = BASE_URL + club_url if club_url else ""
-
-                # Extrae jugadores de cada club
-                players = await extract_players_from_club(club_url, club_name)
-
-                # Guarda los jugadores en el CSV
-                for player in players:
-                    writer.writerow([
-                        player['full_name'],
-                        player['birth_date'],
-                        player['position'],
-                        player['secondary_position'],
-                        player['club_name'],
-                        player['player_link'],
-                        player['market_value'],
-                        player['nationality'],
-                        player['pie'],
-                        player['agente'],
-                        player['fichado'],
-                        player['contrato_hasta']
-                    ])
+        # Plantillas y perfiles del modo "detalle" en una página que se recicla (navegador.py)
+        sesion = navegador.SesionNavegador(browser, nombre="transfermarkt")
+
+        async def jugadores_del_club(club_url, club_name):
+            # Un error en un club se registra y se sigue con el siguiente
+            try:
+                if modo == "detalle":
+                    players = await extract_players_from_club_detalle(sesion, club_url, club_name, perfiles, cola, output_csv)
+                    # Se guarda por club para no perder los perfiles visitados si la extracción se corta
+                    guardar_perfiles(perfiles)
+                else:
+                    players = await extract_players_from_club(club_url, club_name, cola, output_csv)
+            except Exception as e:
+                cola.registrar(club_url, "transfermarkt", "equipo", output_csv, e, club_name=club_name)
+                return []
+
+            cola.resolver(club_url)
+            for link, entrada in cola.pendientes(output_csv, "jugador").items():
+                if entrada["contexto"].get("club_url") == club_url:
+                    cola.resolver(link)
+            return players
+
+        try:
+            if reintentar:
+                clubes = clubes_fallidos(cola, output_csv)
+                logging.info(f"{output_csv}: reintentando {len(clubes)} clubes con fallas.")
+                filas = []
+                for club_url, club_name in clubes.items():
+                    for player in await jugadores_del_club(club_url, club_name):
+                        filas.append({columna: player[campo] for columna, campo in zip(COLUMNAS_CSV, CAMPOS_CSV)})
+                refresco.reemplazar_filas(output_csv, filas, columna="Link Jugador")
+            else:
+                # Accede a la URL de Transfermarkt
+                await page.goto(url)
+
+                # Espera que la tabla esté cargada
+                await page.wait_for_selector("#yw1")
+
+                # Extrae las filas de la tabla
+                rows = await page.query_selector_all("#yw1 .items tbody tr")
+
+                # Abre el archivo CSV para escribir los datos
+                with open(output_csv, mode='w', newline='', encoding='utf-8') as file:
+                    writer = csv.writer(file)
+                    writer.writerow(COLUMNAS_CSV)  # Cabecera
+
+                    # Itera sobre cada club (en este caso, limita a los primeros N clubes si se necesita)
+                    for row in rows:
+                        club_name_element = await row.query_selector("td.hauptlink.no-border-links a")
+                        club_name = await club_name_element.inner_text() if club_name_element else "Sin equipo"
+                        club_url_element = await row.query_selector("td.hauptlink.no-border-links a")
+                        club_url = await club_url_element.get_attribute('href') if club_url_element else ""
+                        club_url = BASE_URL + club_url if club_url else ""
+
+                        # Extrae jugadores de cada club
+                        players = await jugadores_del_club(club_url, club_name)
+
+                        # Guarda los jugadores en el CSV
+                        for player in players:
+                            writer.writerow([player[campo] for campo in CAMPOS_CSV])
+        finally:
+            cola.guardar()
 
         # Cierra el navegador
+        if sesion.page is not None:
+            await sesion.cerrar()
         await browser.close()
 
 # Manejo de argumentos
 if __name__ == "__main__":
-    if len(sys.argv) != 3:
-        print("Uso: python webscraping_transfermarkt.py <URL> <nombre_archivo_csv>")
+    if len(sys.argv) not in (3, 4) or (len(sys.argv) == 4 and sys.argv[3] not in ("detalle", "perfiles")):
+        print("Uso: python webscraping_transfermarkt.py <URL> <nombre_archivo_csv> [detalle|perfiles]")
         sys.exit(1)
 
     url = sys.argv[1]
     output_csv = sys.argv[2]
+    modo = sys.argv[3] if len(sys.argv) == 4 else None
+    registro.configurar(archivo=None)
 
     # Ejecutar la función con los argumentos recibidos
-    asyncio.run(extract_table(url, output_csv))
\ No newline at end of file
+    asyncio.run(extract_table(url, output_csv, modo))
\ No newline at end of file